@@ -0,0 +1,230 @@
+"""
+事件-行政区空间连接与Choropleth预聚合脚本
+将 events.geojson 中的全部事件点通过STRtree（预编译几何）一次性连接到
+Natural Earth一级行政区，并按周/月输出每个区域的兵力与伤亡聚合表，
+/api/statistics/regions 只需按行查表，无需逐请求做点面判断
+"""
+
+import sys
+import json
+from pathlib import Path
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import shapely
+
+from clip_natural_earth import BOUNDARIES_DIR, LAYERS, project_bounds, read_zipped_layer
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+EVENTS_FILE = DATA_DIR / "geojson" / "events.geojson"
+PROVINCES_ZIP = BOUNDARIES_DIR / LAYERS['provinces']['file']
+OUTPUT_DIR = DATA_DIR / "statistics"
+OUTPUT_FILE = OUTPUT_DIR / "region_aggregates.json"
+
+# 聚合阵营
+FACTIONS = ["french", "russian", "austrian"]
+
+# 落在区域边界外（如河流渡口）的事件，按最近区域归属的最大距离（度）
+NEAREST_MAX_DEGREES = 0.1
+
+# 面积计算用的等积投影（欧洲LAEA）
+EQUAL_AREA_CRS = 3035
+
+PERIODS = ["week", "month"]
+
+
+def load_regions(zip_path: Path = PROVINCES_ZIP):
+    """
+    读取项目区域内的一级行政区（直接读zip，不裁剪几何以保证面积准确）
+
+    Returns:
+        GeoDataFrame，含 region_id / area_km2
+    """
+    regions = read_zipped_layer(zip_path, project_bounds(), LAYERS['provinces']['columns'], clip=False)
+
+    ids = regions['adm1_code'] if 'adm1_code' in regions else regions['iso_3166_2']
+    regions['region_id'] = ids.fillna(regions['name']).astype(str)
+    regions['area_km2'] = regions.geometry.to_crs(epsg=EQUAL_AREA_CRS).area / 1e6
+    return regions
+
+
+def assign_regions(lons: np.ndarray, lats: np.ndarray, geometries) -> np.ndarray:
+    """
+    批量点面连接
+
+    Args:
+        lons, lats: 事件坐标
+        geometries: 区域几何数组
+
+    Returns:
+        每个点所在区域的下标，无匹配为-1
+    """
+    geometries = np.asarray(geometries)
+    shapely.prepare(geometries)
+    tree = shapely.STRtree(geometries)
+    points = shapely.points(lons, lats)
+
+    result = np.full(len(points), -1, dtype=np.int64)
+    point_idx, region_idx = tree.query(points, predicate="intersects")
+    # 同一点落在多个区域边界上时取第一个
+    first = np.unique(point_idx, return_index=True)[1]
+    result[point_idx[first]] = region_idx[first]
+
+    missing = np.flatnonzero(result < 0)
+    if len(missing):
+        near_point, near_region = tree.query_nearest(points[missing], max_distance=NEAREST_MAX_DEGREES)
+        result[missing[near_point]] = near_region
+    return result
+
+
+def period_start(day: str, period: str) -> str:
+    """日期所在周（周一）或月（1日）的起始日期"""
+    d = date.fromisoformat(day)
+    if period == "week":
+        return (d - timedelta(days=d.weekday())).isoformat()
+    if period == "month":
+        return d.replace(day=1).isoformat()
+    raise ValueError(f"未知的聚合周期: {period}")
+
+
+def event_troops(props: dict) -> dict:
+    """各阵营兵力；奥地利列与伤亡一致，按联军（奥地利 + 萨克森）总数计"""
+    troops = {faction: int(props.get(f"{faction}_troops") or 0) for faction in FACTIONS}
+    coalition = sum(props.get(f"coalition_{part}") or 0 for part in ("austrian", "saxon"))
+    troops['austrian'] = max(troops['austrian'], int(coalition))
+    return troops
+
+
+def event_casualties(props: dict) -> dict:
+    """各阵营伤亡数（有total用total，否则累加分项）"""
+    def total(prefix: str, parts: list) -> int:
+        value = props.get(f"{prefix}_casualties_total")
+        if value is None:
+            value = sum(props.get(f"{prefix}_{part}") or 0 for part in parts)
+        return int(value or 0)
+
+    return {
+        "french": total("french", ["killed", "wounded", "captured", "dead"]),
+        "russian": total("russian", ["killed", "wounded"]),
+        "austrian": total("coalition", []),
+    }
+
+
+def aggregate(features: list, region_of: np.ndarray, regions, period: str) -> list:
+    """
+    按 (区域, 周期) 聚合
+
+    兵力取周期内出现过的最大值（兵力是存量，不能相加），伤亡为累加；
+    troop_density 为各阵营兵力之和 / 区域面积（人/km²）
+
+    Returns:
+        按 (period_start, region) 排序的行列表，列顺序见 columns()
+    """
+    cells = {}
+    for feature, idx in zip(features, region_of):
+        if idx < 0:
+            continue
+        props = feature['properties']
+        key = (period_start(props['date'], period), regions['region_id'].iat[idx])
+        cell = cells.setdefault(key, {"events": 0, "area_km2": regions['area_km2'].iat[idx],
+                                      "troops": dict.fromkeys(FACTIONS, 0),
+                                      "casualties": dict.fromkeys(FACTIONS, 0)})
+        cell['events'] += 1
+        for faction, count in event_troops(props).items():
+            cell['troops'][faction] = max(cell['troops'][faction], count)
+        for faction, count in event_casualties(props).items():
+            cell['casualties'][faction] += count
+
+    rows = []
+    for (start, region_id), cell in sorted(cells.items()):
+        density = float(sum(cell['troops'].values()) / cell['area_km2']) if cell['area_km2'] else 0.0
+        rows.append([region_id, start, cell['events']]
+                    + [cell['troops'][f] for f in FACTIONS]
+                    + [cell['casualties'][f] for f in FACTIONS]
+                    + [round(density, 2)])
+    return rows
+
+
+def columns() -> list:
+    return (["region", "period_start", "events"]
+            + [f"{f}_troops" for f in FACTIONS]
+            + [f"{f}_casualties" for f in FACTIONS]
+            + ["troop_density"])
+
+
+def build_region_aggregates(events_geojson: dict, regions) -> dict:
+    """
+    构建聚合表
+
+    Returns:
+        {"columns", "periods": {周期: 行列表}, "regions": {id: 元数据}, "event_regions": {事件id: 区域id}}
+    """
+    features = [f for f in events_geojson.get('features', [])
+                if f['geometry']['coordinates'][0] is not None]
+    coords = np.array([f['geometry']['coordinates'] for f in features], dtype=np.float64)
+    region_of = assign_regions(coords[:, 0], coords[:, 1], regions.geometry.values)
+
+    matched = sorted(set(region_of[region_of >= 0].tolist()))
+    region_meta = {}
+    for idx in matched:
+        row = regions.iloc[idx]
+        region_meta[row['region_id']] = {
+            "name": row.get('name'),
+            "name_zh": row.get('name_zh'),
+            "admin": row.get('admin'),
+            "area_km2": round(float(row['area_km2']), 1),
+        }
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "source": PROVINCES_ZIP.stem,
+        "columns": columns(),
+        "periods": {period: aggregate(features, region_of, regions, period) for period in PERIODS},
+        "regions": region_meta,
+        "event_regions": {f['properties']['id']: (regions['region_id'].iat[i] if i >= 0 else None)
+                          for f, i in zip(features, region_of)},
+    }
+
+
+def save_region_aggregates(aggregates: dict, output_file: Path = OUTPUT_FILE):
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(aggregates, f, ensure_ascii=False, separators=(',', ':'))
+
+    unmatched = sum(1 for r in aggregates['event_regions'].values() if r is None)
+    print(f"✅ 区域聚合表已保存: {output_file.name} ({output_file.stat().st_size / 1024:.1f} KB, "
+          f"{len(aggregates['regions'])} 个区域, {unmatched} 个事件未匹配)")
+
+
+def main():
+    print("=" * 70)
+    print("事件-行政区空间连接与Choropleth预聚合")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        if not PROVINCES_ZIP.exists():
+            print(f"\n⚠️  未找到一级行政区数据: {PROVINCES_ZIP}")
+            print("请先运行 download_geodata.py")
+            return
+
+        with open(EVENTS_FILE, 'r', encoding='utf-8') as f:
+            events_geojson = json.load(f)
+
+        regions = load_regions()
+        print(f"\n项目区域内一级行政区: {len(regions)} 个")
+        save_region_aggregates(build_region_aggregates(events_geojson, regions))
+
+    except FileNotFoundError as e:
+        print(f"\n❌ 错误: 找不到输入文件 {e.filename}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+历史地图深度缩放瓦片构建脚本
+1. DZI: 将 Minard.png 等大图切成金字塔瓦片（进程池并行），浏览器只加载可见瓦片
+2. XYZ: 对带地面控制点（GCP）的历史地图扫描件进行配准，
+   重投影到与DEM/矢量瓦片一致的Web Mercator z/x/y 网格
+"""
+
+import sys
+import json
+import math
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from raster_utils import tile_bounds_3857, tiles_covering
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+MAPS_DIR = DATA_DIR / "historical_maps"
+OUTPUT_DIR = DATA_DIR / "tiles"
+DZI_DIR = OUTPUT_DIR / "deepzoom"
+XYZ_DIR = OUTPUT_DIR / "xyz"
+
+# 需要切DZI的大图
+DZI_SOURCES = [MAPS_DIR / "Minard.png"]
+
+# DZI参数（OpenSeadragon默认）
+DZI_TILE_SIZE = 254
+DZI_OVERLAP = 1
+DZI_FORMAT = "webp"
+
+# XYZ参数
+XYZ_TILE_SIZE = 256
+XYZ_ZOOMS = range(4, 11)
+
+# 子进程内缓存的源图（进程初始化时加载一次）
+_worker_image = None
+_worker_georef = None
+
+
+# ---------------------------------------------------------------------------
+# DZI
+# ---------------------------------------------------------------------------
+
+def dzi_levels(width: int, height: int) -> list:
+    """返回每一级的 (level, 宽, 高)，最高级为原图尺寸"""
+    max_level = math.ceil(math.log2(max(width, height)))
+    levels = []
+    for level in range(max_level + 1):
+        scale = 2 ** (max_level - level)
+        levels.append((level, math.ceil(width / scale), math.ceil(height / scale)))
+    return levels
+
+
+def _init_dzi_worker(source: str):
+    global _worker_image
+    from PIL import Image
+
+    Image.MAX_IMAGE_PIXELS = None
+    _worker_image = Image.open(source).convert("RGB")
+
+
+def _render_dzi_level(level: int, width: int, height: int, output_dir: str,
+                      tile_size: int, overlap: int, fmt: str) -> int:
+    """生成一级的全部瓦片（在子进程中运行），返回瓦片数"""
+    from PIL import Image
+
+    image = _worker_image
+    if (width, height) != image.size:
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+
+    level_dir = Path(output_dir) / str(level)
+    level_dir.mkdir(parents=True, exist_ok=True)
+
+    count = 0
+    for col in range(math.ceil(width / tile_size)):
+        for row in range(math.ceil(height / tile_size)):
+            x0 = max(col * tile_size - overlap, 0)
+            y0 = max(row * tile_size - overlap, 0)
+            x1 = min((col + 1) * tile_size + overlap, width)
+            y1 = min((row + 1) * tile_size + overlap, height)
+            image.crop((x0, y0, x1, y1)).save(level_dir / f"{col}_{row}.{fmt}", quality=85)
+            count += 1
+    return count
+
+
+def build_dzi(source: Path, output_dir: Path = DZI_DIR, tile_size: int = DZI_TILE_SIZE,
+              overlap: int = DZI_OVERLAP, fmt: str = DZI_FORMAT, workers: int | None = None) -> Path:
+    """
+    生成DZI金字塔
+
+    Returns:
+        .dzi描述文件路径
+    """
+    from PIL import Image
+
+    Image.MAX_IMAGE_PIXELS = None
+    with Image.open(source) as image:
+        width, height = image.size
+
+    name = source.stem
+    files_dir = output_dir / f"{name}_files"
+    levels = dzi_levels(width, height)
+    print(f"\n切分DZI: {source.name} ({width}x{height}, {len(levels)} 级)")
+
+    # 按像素量从大到小提交，重负载的高分辨率级别先开始
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_dzi_worker,
+                             initargs=(str(source),)) as pool:
+        futures = [pool.submit(_render_dzi_level, level, w, h, str(files_dir), tile_size, overlap, fmt)
+                   for level, w, h in sorted(levels, key=lambda l: -(l[1] * l[2]))]
+        total = sum(f.result() for f in futures)
+
+    dzi_file = output_dir / f"{name}.dzi"
+    dzi_file.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" Format="{fmt}" '
+        f'Overlap="{overlap}" TileSize="{tile_size}">\n'
+        f'  <Size Width="{width}" Height="{height}"/>\n'
+        '</Image>\n',
+        encoding='utf-8',
+    )
+    print(f"✅ DZI完成: {dzi_file.name} ({total} 个瓦片)")
+    return dzi_file
+
+
+# ---------------------------------------------------------------------------
+# GCP配准 + XYZ
+# ---------------------------------------------------------------------------
+
+def load_gcps(gcp_file: Path) -> tuple:
+    """
+    读取控制点文件（<图名>.gcps.json）
+
+    格式: {"image": "map.jpg", "gcps": [{"col": 0, "row": 0, "lon": 20.0, "lat": 60.0}, ...]}
+
+    Returns:
+        (源图路径, rasterio GroundControlPoint列表)
+    """
+    from rasterio.control import GroundControlPoint
+
+    with open(gcp_file, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    if len(spec['gcps']) < 3:
+        raise ValueError(f"{gcp_file.name}: 至少需要3个控制点")
+
+    gcps = [GroundControlPoint(row=p['row'], col=p['col'], x=p['lon'], y=p['lat'])
+            for p in spec['gcps']]
+    return gcp_file.parent / spec['image'], gcps
+
+
+def _init_xyz_worker(source: str, gcps: list):
+    global _worker_image, _worker_georef
+    from PIL import Image
+
+    Image.MAX_IMAGE_PIXELS = None
+    rgb = np.asarray(Image.open(source).convert("RGB"))
+    alpha = np.full(rgb.shape[:2] + (1,), 255, dtype=np.uint8)
+    _worker_image = np.moveaxis(np.concatenate([rgb, alpha], axis=2), 2, 0)
+    _worker_georef = gcps
+
+
+def _render_xyz_tiles(tiles: list, output_dir: str, tile_size: int) -> int:
+    """将源图按GCP重投影到若干XYZ瓦片（在子进程中运行），返回非空瓦片数"""
+    from PIL import Image
+    from rasterio.crs import CRS
+    from rasterio.transform import from_bounds
+    from rasterio.warp import Resampling, reproject
+
+    written = 0
+    for z, x, y in tiles:
+        destination = np.zeros((4, tile_size, tile_size), dtype=np.uint8)
+        reproject(
+            source=_worker_image,
+            destination=destination,
+            gcps=_worker_georef,
+            src_crs=CRS.from_epsg(4326),
+            dst_transform=from_bounds(*tile_bounds_3857(z, x, y), tile_size, tile_size),
+            dst_crs=CRS.from_epsg(3857),
+            resampling=Resampling.bilinear,
+            src_nodata=None,
+            dst_nodata=0,
+        )
+        if not destination[3].any():
+            continue
+
+        tile_path = Path(output_dir) / str(z) / str(x) / f"{y}.png"
+        tile_path.parent.mkdir(parents=True, exist_ok=True)
+        Image.fromarray(np.moveaxis(destination, 0, 2)).save(tile_path, optimize=True)
+        written += 1
+    return written
+
+
+def build_georeferenced_xyz(gcp_file: Path, output_dir: Path = XYZ_DIR, zooms=XYZ_ZOOMS,
+                            tile_size: int = XYZ_TILE_SIZE, workers: int | None = None,
+                            batch_size: int = 32) -> Path:
+    """
+    按控制点配准历史地图并切成XYZ瓦片
+
+    Returns:
+        瓦片目录（{z}/{x}/{y}.png）
+    """
+    from PIL import Image
+    from rasterio.transform import from_gcps
+
+    source, gcps = load_gcps(gcp_file)
+    with Image.open(source) as image:
+        width, height = image.size
+
+    # 由控制点拟合的仿射变换估算覆盖范围
+    transform = from_gcps(gcps)
+    corners = np.array([transform @ (c, r) for c, r in [(0, 0), (width, 0), (0, height), (width, height)]])
+    bounds = (corners[:, 0].min(), corners[:, 1].min(), corners[:, 0].max(), corners[:, 1].max())
+
+    tiles = [(z, x, y) for z in zooms for x, y in tiles_covering(bounds, z)]
+    batches = [tiles[i:i + batch_size] for i in range(0, len(tiles), batch_size)]
+    target = output_dir / source.stem
+    print(f"\n配准并切分XYZ: {source.name} ({len(gcps)} 个控制点, {len(tiles)} 个候选瓦片)")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_xyz_worker,
+                             initargs=(str(source), gcps)) as pool:
+        written = sum(pool.map(_render_xyz_tiles, batches,
+                               [str(target)] * len(batches), [tile_size] * len(batches)))
+
+    print(f"✅ XYZ完成: {target} ({written} 个非空瓦片)")
+    return target
+
+
+def main():
+    print("=" * 70)
+    print("历史地图深度缩放瓦片构建工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        for source in DZI_SOURCES:
+            if source.exists():
+                build_dzi(source)
+            else:
+                print(f"⚠️  未找到: {source}")
+
+        gcp_files = sorted(MAPS_DIR.rglob("*.gcps.json"))
+        if not gcp_files:
+            print("\n未找到控制点文件 (*.gcps.json)，跳过配准")
+        for gcp_file in gcp_files:
+            build_georeferenced_xyz(gcp_file)
+
+        print(f"\n输出目录: {OUTPUT_DIR}")
+
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+"""
+行军边捆绑（edge bundling）预计算脚本
+planA: "生成bundling预计算数据（权重、方向）"
+把时间线导出的行军段（每条阵营路线相邻节点之间一条边）以及航点文件中的部队级路点
+（带 "unit" 的航点按 阵营×部队 各自串成一条路线，每对相邻路点一条边）
+用核密度边捆绑（KDEEB, Hurter et al. 2012）收拢为束状折线:
+1. 每条边按弧长重采样为固定数量的点，全部边组成一个 (边数, 点数, 2) 数组
+2. 每轮迭代: 把全部采样点按边权重（兵力）累加到密度网格（bincount），FFT高斯模糊，
+   所有内部点一次性沿密度梯度上升一步，再沿边做拉普拉斯平滑；核带宽逐轮收缩，束由粗到细形成
+3. 有向模式下进军/撤退各自一张密度图，只被同方向的边吸引，往返路线不会被捆到一起
+每轮开销只与采样点数和网格大小有关，没有逐边/逐边对的Python循环，可以处理数千条部队级行军边；
+结果按输入边 + 参数的哈希缓存在 data/cache/bundling/，参数不变时重复运行直接读取
+"""
+
+import sys
+import json
+import hashlib
+from pathlib import Path
+from datetime import date, datetime
+from dataclasses import dataclass, asdict
+
+import numpy as np
+
+from generate_movements import FACTION_ALIASES, collect_route_points, load_waypoints
+from build_flow_bands import ADVANCE_HEADING, route_troop_samples, split_directions, troops_at
+from project import KM_PER_DEGREE, SERIES_START
+from raster_utils import bilinear_sample, gaussian_blur
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+INPUT_FILE = DATA_DIR / "1812_campaign_timeline.json"
+OUTPUT_FILE = DATA_DIR / "geojson" / "movements_bundled.geojson"
+CACHE_DIR = DATA_DIR / "cache" / "bundling"
+
+DIRECTIONS = ("advance", "retreat")
+
+
+@dataclass(frozen=True)
+class BundlingParameters:
+    """KDEEB参数（长度以密度网格像素为单位）"""
+    grid_size: int = 512
+    samples: int = 48
+    iterations: int = 30
+    sigma: float = 24.0
+    sigma_decay: float = 0.9
+    min_sigma: float = 2.0
+    step: float = 0.25
+    smoothing: float = 0.5
+    resample_every: int = 5
+    directed: bool = True
+
+
+def to_planar(lonlat: np.ndarray) -> np.ndarray:
+    """经纬度 → 等距矩形平面坐标（公里，经度按平均纬度余弦缩放）"""
+    cos_lat = np.cos(np.radians(lonlat[..., 1].mean()))
+    return lonlat * np.array([cos_lat * KM_PER_DEGREE, KM_PER_DEGREE])
+
+
+def from_planar(planar: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    cos_lat = np.cos(np.radians(reference[..., 1].mean()))
+    return planar / np.array([cos_lat * KM_PER_DEGREE, KM_PER_DEGREE])
+
+
+def subdivide(points: np.ndarray, count: int) -> np.ndarray:
+    """
+    按弧长把每条折线重采样为 count 个内部细分点（端点保留）
+
+    Args:
+        points: (E, K, 2) 折线
+        count: 内部点数
+
+    Returns:
+        (E, count + 2, 2)
+    """
+    segment = np.linalg.norm(np.diff(points, axis=1), axis=-1)
+    cumulative = np.concatenate([np.zeros((len(points), 1)), np.cumsum(segment, axis=1)], axis=1)
+    total = np.maximum(cumulative[:, -1:], 1e-12)
+    normalized = cumulative / total
+
+    targets = np.linspace(0.0, 1.0, count + 2)
+    # 每个目标位置落在哪一段: (E, T)
+    index = np.clip((normalized[:, None, :] <= targets[None, :, None]).sum(-1) - 1, 0, points.shape[1] - 2)
+    rows = np.arange(len(points))[:, None]
+    left, right = normalized[rows, index], normalized[rows, index + 1]
+    fraction = np.where(right > left, (targets[None, :] - left) / np.maximum(right - left, 1e-12), 0.0)
+    result = points[rows, index] + fraction[..., None] * (points[rows, index + 1] - points[rows, index])
+    result[:, 0], result[:, -1] = points[:, 0], points[:, -1]
+    return result
+
+
+def bilinear(grid: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """在像素坐标 (x, y) 处双线性采样网格（坐标截断到网格内）"""
+    height, width = grid.shape
+    return bilinear_sample(grid, np.clip(y, 0, height - 1), np.clip(x, 0, width - 1))
+
+
+def density_gradient(points: np.ndarray, weights: np.ndarray, shape: tuple, sigma: float) -> tuple:
+    """
+    采样点的核密度梯度（在各采样点处）
+
+    Args:
+        points: (N, 2) 像素坐标
+        weights: (N,) 点权重
+        shape: 网格 (行, 列)
+        sigma: 核带宽（像素）
+
+    Returns:
+        (gx, gy)，各为 (N,)
+    """
+    height, width = shape
+    cols = np.clip(np.rint(points[:, 0]).astype(np.int64), 0, width - 1)
+    rows = np.clip(np.rint(points[:, 1]).astype(np.int64), 0, height - 1)
+    density = np.bincount(rows * width + cols, weights=weights, minlength=height * width).reshape(shape)
+    density = gaussian_blur(density, sigma)
+    grad_y, grad_x = np.gradient(density)
+    return bilinear(grad_x, points[:, 0], points[:, 1]), bilinear(grad_y, points[:, 0], points[:, 1])
+
+
+def bundle_edges(edges: np.ndarray, weights: np.ndarray | None = None, groups: np.ndarray | None = None,
+                 params: BundlingParameters = BundlingParameters()) -> np.ndarray:
+    """
+    核密度边捆绑
+
+    Args:
+        edges: (E, 2, 2) 平面坐标的起点/终点
+        weights: (E,) 边权重（兵力），None时等权
+        groups: (E,) 整数分组（方向），只有同组的边互相吸引；None时全部同组
+        params: 捆绑参数
+
+    Returns:
+        (E, samples, 2) 捆绑后的折线，与输入同一坐标系，端点不动
+    """
+    edges = np.asarray(edges, dtype=np.float64)
+    count = len(edges)
+    weights = np.ones(count) if weights is None else np.asarray(weights, dtype=np.float64)
+    if weights.max() <= 0:
+        weights = np.ones(count)
+    relative = weights / weights.max()
+    groups = np.zeros(count, dtype=np.int64) if groups is None else np.asarray(groups)
+
+    # 平面坐标 → 网格像素（长边 grid_size，四周留出初始核带宽）
+    margin = params.sigma * 2
+    low = edges.reshape(-1, 2).min(axis=0)
+    extent = max(float((edges.reshape(-1, 2).max(axis=0) - low).max()), 1e-9)
+    scale = (params.grid_size - 2 * margin) / extent
+    pixels = (edges - low) * scale + margin
+    span = np.ceil((edges.reshape(-1, 2).max(axis=0) - low) * scale + 2 * margin).astype(int) + 1
+    shape = (int(span[1]), int(span[0]))
+
+    points = subdivide(pixels, params.samples - 2)
+    point_weights = np.repeat(relative, params.samples)
+    point_groups = np.repeat(groups, params.samples)
+    labels = np.unique(groups)
+
+    sigma = params.sigma
+    for iteration in range(params.iterations):
+        flat = points.reshape(-1, 2)
+        gx, gy = np.zeros(len(flat)), np.zeros(len(flat))
+        for label in labels:
+            member = point_groups == label
+            gx[member], gy[member] = density_gradient(flat[member], point_weights[member], shape, sigma)
+
+        # 沿归一化梯度移动（步长与当前核带宽成比例），端点固定
+        gradient = np.stack([gx, gy], axis=1).reshape(points.shape)
+        norm = np.linalg.norm(gradient, axis=-1, keepdims=True)
+        move = np.where(norm > 1e-12, gradient / np.maximum(norm, 1e-12), 0.0) * params.step * sigma
+        points[:, 1:-1] += move[:, 1:-1]
+
+        # 拉普拉斯平滑
+        points[:, 1:-1] = ((1 - params.smoothing) * points[:, 1:-1]
+                           + params.smoothing * (points[:, :-2] + points[:, 2:]) / 2)
+
+        if params.resample_every and (iteration + 1) % params.resample_every == 0:
+            points = subdivide(points, params.samples - 2)
+        sigma = max(sigma * params.sigma_decay, params.min_sigma)
+
+    return (points - margin) / scale + low
+
+
+def collect_unit_routes(waypoints: list) -> dict:
+    """
+    部队级路点按 (阵营, 部队) 分组并按日期排序
+
+    Returns:
+        {(阵营, 部队id): [{"date", "lon", "lat", "event_id", "troops"}, ...]}，只保留至少两个路点的部队
+    """
+    units = {}
+    for waypoint in waypoints or []:
+        if not waypoint.get('unit'):
+            continue
+        faction = FACTION_ALIASES.get(waypoint['faction'], waypoint['faction'])
+        units.setdefault((faction, waypoint['unit']), []).append({
+            "date": waypoint['date'],
+            "lon": waypoint['lon'],
+            "lat": waypoint['lat'],
+            "event_id": waypoint.get('event_id'),
+            "troops": waypoint.get('troops'),
+        })
+    return {key: sorted(points, key=lambda p: p['date']) for key, points in units.items() if len(points) >= 2}
+
+
+def unit_troops(route: list) -> np.ndarray | None:
+    """部队兵力: 按日期在该部队自身带 troops 的路点间线性插值（首/末之外保持端点值），没有任何兵力时返回None"""
+    known = [(p['date'], p['troops']) for p in route if p.get('troops') is not None]
+    if not known:
+        return None
+    start = date.fromisoformat(SERIES_START)
+    offsets = [(date.fromisoformat(d) - start).days for d, _ in known]
+    targets = [(date.fromisoformat(p['date']) - start).days for p in route]
+    return np.interp(targets, offsets, [t for _, t in known]).astype(np.float64)
+
+
+def route_edges(route: list, faction: str, troops: np.ndarray | None, unit: str | None = None) -> list:
+    """一条路线的行军边，进军/撤退按 split_directions 划分（与兵力流带一致）"""
+    lonlat = np.array([[p['lon'], p['lat']] for p in route], dtype=np.float64)
+    edges = []
+    for direction, first, last in split_directions(lonlat, ADVANCE_HEADING.get(faction, 1)):
+        for i in range(first, last):
+            p, q = route[i], route[i + 1]
+            edges.append({
+                "faction": faction,
+                "unit": unit,
+                "direction": direction,
+                "weight": float(troops[i]) if troops is not None else 0.0,
+                "start": (p['lon'], p['lat']),
+                "end": (q['lon'], q['lat']),
+                "start_date": p['date'],
+                "end_date": q['date'],
+                "from": p['event_id'],
+                "to": q['event_id'],
+            })
+    return edges
+
+
+def collect_edges(timeline_data: dict, waypoints: list = None) -> list:
+    """
+    导出行军边: 每条阵营路线相邻节点一条，加上每个部队（带 "unit" 的航点）相邻路点一条
+
+    阵营路线的兵力取 route_troop_samples（主力与南翼互不混入），部队边的兵力取其自身路点的 troops
+
+    Returns:
+        [{"faction", "unit", "direction", "weight", "start", "end", "start_date", "end_date", "from", "to"}]
+    """
+    routes = collect_route_points(timeline_data, waypoints)
+    samples = route_troop_samples(timeline_data)
+
+    edges = []
+    for faction, route in sorted(routes.items()):
+        edges += route_edges(route, faction, troops_at(samples, faction, [p['date'] for p in route]))
+
+    for (faction, unit), route in sorted(collect_unit_routes(waypoints).items()):
+        troops = unit_troops(route)
+        if troops is None:
+            print(f"  ⚠️ 部队 {unit} 的路点没有兵力，边权重按0计")
+        edges += route_edges(route, faction, troops, unit)
+    return edges
+
+
+def cache_key(lonlat: np.ndarray, weights: np.ndarray, groups: np.ndarray, params: BundlingParameters) -> str:
+    """缓存键: 边坐标 + 权重 + 分组 + 参数"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(lonlat, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(weights, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(groups, dtype=np.int64).tobytes())
+    digest.update(json.dumps(asdict(params), sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def cached_bundles(lonlat: np.ndarray, weights: np.ndarray, groups: np.ndarray,
+                   params: BundlingParameters = BundlingParameters(), cache_dir: Path = CACHE_DIR) -> tuple:
+    """
+    捆绑结果（经纬度），按输入与参数缓存为 .npy
+
+    Returns:
+        ((E, samples, 2) 经纬度折线, 缓存键, 是否命中缓存)
+    """
+    key = cache_key(lonlat, weights, groups, params)
+    cache_file = cache_dir / f"bundles_{key}.npy"
+    if cache_file.exists():
+        return np.load(cache_file), key, True
+
+    bundled = from_planar(bundle_edges(to_planar(lonlat), weights, groups, params), lonlat)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    np.save(cache_file, bundled)
+    return bundled, key, False
+
+
+def build_bundled_geojson(timeline_data: dict, waypoints: list = None,
+                          params: BundlingParameters = BundlingParameters()) -> dict:
+    """生成捆绑后的行军边GeoJSON（每条边一条LineString）"""
+    print("\n生成行军边捆绑...")
+    edges = collect_edges(timeline_data, waypoints)
+    if not edges:
+        raise ValueError("时间线中没有可用的行军边")
+
+    lonlat = np.array([[e['start'], e['end']] for e in edges], dtype=np.float64)
+    weights = np.array([e['weight'] for e in edges], dtype=np.float64)
+    if params.directed:
+        groups = np.array([DIRECTIONS.index(e['direction']) for e in edges], dtype=np.int64)
+    else:
+        groups = np.zeros(len(edges), dtype=np.int64)
+    bundled, key, cached = cached_bundles(lonlat, weights, groups, params)
+    print(f"  - {len(edges)} 条边, 每条 {bundled.shape[1]} 个顶点"
+          f"{'（缓存命中）' if cached else ''}, 缓存键 {key}")
+
+    features = []
+    for i, (edge, line) in enumerate(zip(edges, bundled)):
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": np.round(line, 5).tolist()},
+            "properties": {
+                "id": f"bundle_{i:05d}",
+                "faction": edge['faction'],
+                "unit": edge['unit'],
+                "direction": edge['direction'],
+                "weight": round(edge['weight']),
+                "start_date": edge['start_date'],
+                "end_date": edge['end_date'],
+                "from_event": edge['from'],
+                "to_event": edge['to'],
+            }
+        })
+
+    return {
+        "type": "FeatureCollection",
+        "metadata": {
+            "title": "Napoleon's 1812 Russian Campaign - Bundled movements",
+            "title_zh": "1812年拿破仑东征俄罗斯 - 行军边捆绑",
+            "generated_at": datetime.now().isoformat(),
+            "coordinate_system": "WGS84",
+            "algorithm": "KDEEB (Hurter et al. 2012), weighted" + (", directed" if params.directed else ""),
+            "parameters": asdict(params),
+            "cache_key": key,
+            "schema": {
+                "geometry": "LineString",
+                "properties": {
+                    "faction": "string - french|russian|austrian",
+                    "unit": "string|null - Unit id for unit-level waypoint edges, null for faction routes",
+                    "direction": "string - advance|retreat",
+                    "weight": "number - Troops at the start of the edge",
+                    "start_date": "string - ISO8601",
+                    "end_date": "string - ISO8601",
+                }
+            }
+        },
+        "features": features
+    }
+
+
+def main():
+    print("=" * 70)
+    print("行军边捆绑预计算工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+            timeline_data = json.load(f)
+
+        geojson = build_bundled_geojson(timeline_data, load_waypoints())
+        OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(geojson, f, ensure_ascii=False, separators=(',', ':'))
+
+        size_kb = OUTPUT_FILE.stat().st_size / 1024
+        print(f"✅ 保存成功: {OUTPUT_FILE.name} ({size_kb:.1f} KB, {len(geojson['features'])} 条边)")
+
+    except FileNotFoundError:
+        print(f"\n❌ 错误: 找不到输入文件 {INPUT_FILE}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
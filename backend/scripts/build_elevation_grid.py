@@ -0,0 +1,115 @@
+"""
+原始高程网格构建脚本
+把 merged_dem_cropped.tif 按行块解码为int16（米）的 .npy（行主序，与DEM像元一一对应），
+并写出元数据JSON；API启动时以内存映射方式打开，
+点高程/剖面查询只读取命中的页面，请求路径上不再解码GeoTIFF
+"""
+
+import sys
+import json
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+DEM_FILE = DATA_DIR / "dem" / "processed" / "merged_dem_cropped.tif"
+GRID_FILE = DATA_DIR / "dem" / "processed" / "elevation_grid.npy"
+META_FILE = DATA_DIR / "dem" / "processed" / "elevation_grid.json"
+
+# int16无数据值（AW3D30高程为整数米，int16足够）
+GRID_NODATA = -32768
+
+# 每次解码的行数
+BLOCK_ROWS = 1024
+
+
+def build_elevation_grid(dem_file: Path = DEM_FILE, grid_file: Path = GRID_FILE,
+                         block_rows: int = BLOCK_ROWS) -> dict:
+    """
+    按行块把DEM写入内存映射的int16 .npy（不在内存中保留整幅栅格）
+
+    Args:
+        dem_file: 裁剪后的DEM
+        grid_file: 输出 .npy
+        block_rows: 每块行数
+
+    Returns:
+        元数据字典
+    """
+    import rasterio
+    from rasterio.windows import Window
+
+    with rasterio.open(dem_file) as src:
+        height, width = src.height, src.width
+        res_x, res_y = src.res
+        if abs(res_x - res_y) > 1e-12 or src.transform.b or src.transform.d:
+            raise ValueError("仅支持无旋转、正方形像元的经纬度栅格")
+        print(f"\n构建高程网格: {width}x{height}, 像元 {res_x}°, 块 {block_rows} 行")
+
+        grid_file.parent.mkdir(parents=True, exist_ok=True)
+        grid = np.lib.format.open_memmap(grid_file, mode='w+', dtype=np.int16, shape=(height, width))
+        minimum, maximum = np.inf, -np.inf
+        for row0 in range(0, height, block_rows):
+            rows = min(block_rows, height - row0)
+            block = src.read(1, window=Window(0, row0, width, rows)).astype(np.float64)
+            invalid = np.isnan(block)
+            if src.nodata is not None:
+                invalid |= block == src.nodata
+            values = np.clip(np.rint(block), GRID_NODATA + 1, 32767)
+            values[invalid] = GRID_NODATA
+            grid[row0:row0 + rows] = values.astype(np.int16)
+            if not invalid.all():
+                minimum = min(minimum, float(block[~invalid].min()))
+                maximum = max(maximum, float(block[~invalid].max()))
+        grid.flush()
+        del grid
+
+        stat = dem_file.stat()
+        return {
+            "file": grid_file.name,
+            "shape": [height, width],
+            "dtype": "int16",
+            "nodata": GRID_NODATA,
+            "bounds": list(src.bounds),
+            "resolution": res_x,
+            "elevation_min": minimum if np.isfinite(minimum) else None,
+            "elevation_max": maximum if np.isfinite(maximum) else None,
+            "source": {"file": dem_file.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+            "generated_at": datetime.now().isoformat(),
+        }
+
+
+def save_metadata(metadata: dict, meta_file: Path = META_FILE):
+    with open(meta_file, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+    size = (meta_file.parent / metadata['file']).stat().st_size / 1024 / 1024
+    print(f"✅ 高程网格: {metadata['file']} ({size:.1f} MB), 元数据 {meta_file.name}")
+    print(f"   高程范围: {metadata['elevation_min']} ~ {metadata['elevation_max']} m")
+
+
+def main():
+    print("=" * 70)
+    print("原始高程网格构建工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        if not DEM_FILE.exists():
+            print(f"\n❌ 未找到DEM: {DEM_FILE}")
+            print("请先运行 process_dem.py")
+            return 1
+
+        save_metadata(build_elevation_grid(DEM_FILE, GRID_FILE))
+
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
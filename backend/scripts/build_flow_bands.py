@@ -0,0 +1,290 @@
+"""
+米纳德式兵力流带几何构建脚本
+从时间线按日期串联的行军节点（与 generate_movements.py 相同）和 participants.*.troops，
+为每个阵营按方向（进军/撤退）与LOD预计算带宽随兵力变化的偏移带（ribbon）三角网：
+1. 按东西向航向把路线切成进军/撤退段（法军向东为进军，俄军向西为进军）
+2. 每段按 LOD_TOLERANCES 做Douglas-Peucker简化，节点兵力按日期插值
+3. 带状多边形在中心线行进方向的左侧展开，宽度在节点间线性变化，
+   段间拐角用斜接（miter，超过上限时截断）预先连好，往返同路时进军/撤退带并排而不重叠
+4. 全部顶点写入一个交错float32缓冲区 + 索引缓冲区（bands.bin），
+   清单（manifest.json）给出属性布局和每个 阵营×方向×LOD 的绘制区间，前端可直接上传GPU
+"""
+
+import sys
+import json
+from pathlib import Path
+from datetime import date, datetime
+
+import numpy as np
+
+from generate_movements import (FACTION_ALIASES, FLANK_ROUTES, LOD_TOLERANCES, collect_route_points,
+                                douglas_peucker, load_waypoints)
+from generate_troop_series import extract_troop_samples
+from project import KM_PER_DEGREE, SERIES_START
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+INPUT_FILE = DATA_DIR / "1812_campaign_timeline.json"
+OUTPUT_DIR = DATA_DIR / "tiles" / "flow"
+BUFFER_FILE = OUTPUT_DIR / "bands.bin"
+MANIFEST_FILE = OUTPUT_DIR / "manifest.json"
+
+# 进军方向的经度符号（+1: 向东为进军）；未列出的阵营按入侵方处理
+ADVANCE_HEADING = {
+    "french": 1,
+    "austrian": 1,
+    "russian": -1,
+}
+
+# 带宽: 全部阵营中的最大兵力对应 MAX_WIDTH_KM，最细不小于 MIN_WIDTH_KM
+MAX_WIDTH_KM = 60.0
+MIN_WIDTH_KM = 1.0
+
+# 斜接长度上限（相对带宽），超过时截断，避免急转弯处出现尖刺
+MITER_LIMIT = 4.0
+
+# 顶点属性（交错float32）: 经纬度、日期（相对SERIES_START的天数）、兵力、边（0=中心线，1=外缘）
+VERTEX_ATTRIBUTES = [("position", 2), ("day", 1), ("troops", 1), ("edge", 1)]
+VERTEX_COMPONENTS = sum(n for _, n in VERTEX_ATTRIBUTES)
+
+
+def route_troop_samples(timeline_data: dict) -> dict:
+    """
+    各路线的兵力采样点: 主力路线只用主力序列，南翼路线（FLANK_ROUTES）只用南翼行动中的兵力
+
+    两者混在一起时，南翼某日的俄军兵力会被当作主力俄军的采样点，在主力路线上插出一天的"进军"段
+    """
+    samples = extract_troop_samples(timeline_data)
+    flank_events = timeline_data.get('schwarzenberg_operations', {}).get('events', [])
+    for faction, sample in extract_troop_samples({"events": flank_events}).items():
+        samples.setdefault(FLANK_ROUTES.get(faction, faction), sample)
+    return samples
+
+
+def troops_at(samples: dict, faction: str, dates: list) -> np.ndarray | None:
+    """按日期线性插值阵营兵力（首/末采样点之外保持端点值），没有兵力数据时返回None"""
+    keys = [key for key, alias in FACTION_ALIASES.items() if alias == faction] + [faction]
+    sample = next((samples[key] for key in keys if key in samples), None)
+    if sample is None:
+        return None
+    start = date.fromisoformat(SERIES_START)
+    offsets = np.array([(date.fromisoformat(d) - start).days for d in sample['dates']], dtype=np.float64)
+    targets = np.array([(date.fromisoformat(d) - start).days for d in dates], dtype=np.float64)
+    return np.interp(targets, offsets, sample['troops'].astype(np.float64))
+
+
+def split_directions(lonlat: np.ndarray, heading: int = 1) -> list:
+    """
+    按每段的东西向分量把折线切成同方向的连续段
+
+    Returns:
+        [(direction, start_index, end_index)]，相邻段共享端点；纯南北向的段沿用前一段方向
+    """
+    signs = np.sign(np.diff(lonlat[:, 0])) * heading
+    directions = []
+    current = "advance"
+    for sign in signs:
+        if sign > 0:
+            current = "advance"
+        elif sign < 0:
+            current = "retreat"
+        directions.append(current)
+
+    runs = []
+    start = 0
+    for i in range(1, len(directions) + 1):
+        if i == len(directions) or directions[i] != directions[start]:
+            runs.append((directions[start], start, i))
+            start = i
+    return runs
+
+
+def ribbon(lonlat: np.ndarray, widths_km: np.ndarray) -> np.ndarray:
+    """
+    中心线左侧的偏移带外缘（斜接连接，向量化）
+
+    Args:
+        lonlat: (N, 2) 中心线，N >= 2，相邻点不重合
+        widths_km: (N,) 各节点带宽（公里）
+
+    Returns:
+        (N, 2) 外缘经纬度
+    """
+    cos_lat = np.cos(np.radians(lonlat[:, 1].mean()))
+    scale = np.array([cos_lat * KM_PER_DEGREE, KM_PER_DEGREE])
+    planar = lonlat * scale
+
+    tangents = np.diff(planar, axis=0)
+    tangents /= np.linalg.norm(tangents, axis=1, keepdims=True)
+    normals = np.column_stack([-tangents[:, 1], tangents[:, 0]])
+
+    # 端点用所在段的法线，内部节点用相邻两段法线的角平分线
+    before = np.vstack([normals[:1], normals])
+    after = np.vstack([normals, normals[-1:]])
+    miter = before + after
+    length = np.linalg.norm(miter, axis=1, keepdims=True)
+    # 180°折返时角平分线退化，退回前一段法线
+    reverse = length[:, 0] < 1e-9
+    miter[reverse] = before[reverse]
+    length[reverse] = np.linalg.norm(before[reverse], axis=1, keepdims=True)
+    miter /= length
+
+    cosine = np.abs(np.einsum('ij,ij->i', miter, before))
+    stretch = np.minimum(1.0 / np.maximum(cosine, 1e-9), MITER_LIMIT)
+    outer = planar + miter * (widths_km * stretch)[:, None]
+    return outer / scale
+
+
+def band_geometry(lonlat: np.ndarray, days: np.ndarray, troops: np.ndarray, widths_km: np.ndarray,
+                  vertex_base: int = 0) -> tuple:
+    """
+    单段流带的顶点与三角形索引（每个节点两个顶点: 中心线 + 外缘）
+
+    Returns:
+        (vertices (2N, VERTEX_COMPONENTS) float32, indices (6(N-1),) int64，已加 vertex_base)
+    """
+    n = len(lonlat)
+    outer = ribbon(lonlat, widths_km)
+
+    vertices = np.empty((2 * n, VERTEX_COMPONENTS), dtype=np.float32)
+    vertices[0::2, 0:2] = lonlat
+    vertices[1::2, 0:2] = outer
+    vertices[:, 2] = np.repeat(days, 2)
+    vertices[:, 3] = np.repeat(troops, 2)
+    vertices[0::2, 4] = 0.0
+    vertices[1::2, 4] = 1.0
+
+    i = vertex_base + 2 * np.arange(n - 1)
+    indices = np.column_stack([i, i + 1, i + 2, i + 1, i + 3, i + 2]).ravel()
+    return vertices, indices
+
+
+def build_flow_bands(timeline_data: dict, waypoints: list = None, lod_tolerances: dict = LOD_TOLERANCES) -> tuple:
+    """
+    构建全部阵营 × 方向 × LOD 的流带
+
+    Returns:
+        (缓冲区字节, 清单字典)
+    """
+    print("\n生成兵力流带...")
+    routes = collect_route_points(timeline_data, waypoints)
+    samples = route_troop_samples(timeline_data)
+    start = date.fromisoformat(SERIES_START)
+
+    prepared = {}
+    for faction, route in sorted(routes.items()):
+        troops = troops_at(samples, faction, [p['date'] for p in route])
+        if troops is None:
+            print(f"  ⚠️ {faction}: 没有兵力数据，跳过")
+            continue
+        lonlat = np.array([[p['lon'], p['lat']] for p in route], dtype=np.float64)
+        days = np.array([(date.fromisoformat(p['date']) - start).days for p in route], dtype=np.float64)
+        prepared[faction] = (lonlat, days, troops)
+
+    max_troops = max((float(t.max()) for _, _, t in prepared.values()), default=0.0)
+    if max_troops <= 0:
+        raise ValueError("时间线中没有可用的兵力数据")
+
+    vertex_blocks, index_blocks, draws = [], [], []
+    vertex_count = index_count = 0
+    for lod, tolerance in sorted(lod_tolerances.items()):
+        for faction, (lonlat, days, troops) in prepared.items():
+            heading = ADVANCE_HEADING.get(faction, 1)
+            for direction, first, last in split_directions(lonlat, heading):
+                part = slice(first, last + 1)
+                run_lonlat, run_days, run_troops = lonlat[part], days[part], troops[part]
+                cos_lat = np.cos(np.radians(run_lonlat[:, 1].mean()))
+                keep = douglas_peucker(run_lonlat * [cos_lat, 1.0], tolerance)
+                widths = np.maximum(run_troops[keep] / max_troops * MAX_WIDTH_KM, MIN_WIDTH_KM)
+
+                vertices, indices = band_geometry(run_lonlat[keep], run_days[keep], run_troops[keep],
+                                                  widths, vertex_count)
+                draws.append({
+                    "faction": faction,
+                    "direction": direction,
+                    "lod": lod,
+                    "vertex_offset": vertex_count,
+                    "vertex_count": len(vertices),
+                    "index_offset": index_count,
+                    "index_count": len(indices),
+                    "start_day": float(run_days[0]),
+                    "end_day": float(run_days[-1]),
+                    "troops": [round(float(run_troops[0])), round(float(run_troops[-1]))],
+                })
+                vertex_blocks.append(vertices)
+                index_blocks.append(indices)
+                vertex_count += len(vertices)
+                index_count += len(indices)
+
+    vertex_data = np.concatenate(vertex_blocks)
+    index_dtype = np.uint16 if vertex_count <= np.iinfo(np.uint16).max else np.uint32
+    index_data = np.concatenate(index_blocks).astype(index_dtype)
+
+    vertex_bytes = vertex_data.tobytes()
+    index_offset = len(vertex_bytes)
+    buffer = vertex_bytes + index_data.tobytes()
+
+    stride = VERTEX_COMPONENTS * 4
+    attributes, offset = [], 0
+    for name, components in VERTEX_ATTRIBUTES:
+        attributes.append({"name": name, "components": components, "type": "float32", "offset": offset})
+        offset += components * 4
+
+    for lod in sorted(lod_tolerances):
+        counts = [d for d in draws if d['lod'] == lod]
+        print(f"  - LOD{lod}: {len(counts)} 段, {sum(d['vertex_count'] for d in counts)} 个顶点, "
+              f"{sum(d['index_count'] for d in counts) // 3} 个三角形")
+
+    manifest = {
+        "file": BUFFER_FILE.name,
+        "byte_length": len(buffer),
+        "vertices": {"byte_offset": 0, "byte_length": index_offset, "count": vertex_count,
+                     "stride": stride, "attributes": attributes},
+        "indices": {"byte_offset": index_offset, "byte_length": len(buffer) - index_offset,
+                    "count": index_count, "type": np.dtype(index_dtype).name, "primitive": "triangles"},
+        "day_origin": SERIES_START,
+        "width": {"max_km": MAX_WIDTH_KM, "min_km": MIN_WIDTH_KM, "max_troops": max_troops,
+                  "side": "left of travel", "miter_limit": MITER_LIMIT},
+        "heading": {faction: ADVANCE_HEADING.get(faction, 1) for faction in prepared},
+        "lod_levels": {str(lod): {"tolerance": tolerance} for lod, tolerance in sorted(lod_tolerances.items())},
+        "draws": draws,
+        "generated_at": datetime.now().isoformat(),
+    }
+    return buffer, manifest
+
+
+def save_flow_bands(buffer: bytes, manifest: dict, output_dir: Path = OUTPUT_DIR):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / manifest['file'], 'wb') as f:
+        f.write(buffer)
+    with open(output_dir / MANIFEST_FILE.name, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"✅ 流带缓冲区: {manifest['file']} ({len(buffer) / 1024:.1f} KB), 清单 {MANIFEST_FILE.name}")
+
+
+def main():
+    print("=" * 70)
+    print("米纳德兵力流带构建工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+            timeline_data = json.load(f)
+
+        buffer, manifest = build_flow_bands(timeline_data, load_waypoints())
+        save_flow_bands(buffer, manifest, OUTPUT_DIR)
+
+    except FileNotFoundError:
+        print(f"\n❌ 错误: 找不到输入文件 {INPUT_FILE}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
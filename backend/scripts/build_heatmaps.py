@@ -0,0 +1,247 @@
+"""
+伤亡/兵力密度热力图瓦片预计算脚本
+从 events.geojson 的 *_casualties_total / *_troops 字段出发，按周与缩放级别：
+1. 把事件权重累加到与XYZ瓦片对齐的Web Mercator像素网格
+2. 用可分离高斯核做FFT卷积（纯NumPy向量化）得到核密度（每平方公里）
+3. 按指标在全部周内的最大值量化为8位灰度PNG瓦片，并写出清单（manifest.json）
+内容相同的周（累计指标在无新事件时）共用同一组瓦片，前端回放只需切换纹理
+"""
+
+import sys
+import json
+import math
+import shutil
+from pathlib import Path
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from project import BBOX, SERIES_START, SERIES_END
+from raster_utils import gaussian_blur, tiles_covering, world_pixels
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+EVENTS_FILE = DATA_DIR / "geojson" / "events.geojson"
+OUTPUT_DIR = DATA_DIR / "tiles" / "heatmap"
+MANIFEST_FILE = OUTPUT_DIR / "manifest.json"
+
+# 指标: 事件属性 + 是否按时间累计（伤亡沿路线累积，兵力只反映当周位置）
+METRICS = {
+    "french_casualties": {"property": "french_casualties_total", "cumulative": True},
+    "russian_casualties": {"property": "russian_casualties_total", "cumulative": True},
+    "french_troops": {"property": "french_troops", "cumulative": False},
+    "russian_troops": {"property": "russian_troops", "cumulative": False},
+}
+
+# 瓦片级别与尺寸（核带宽远大于高级别像元，z8以上不再增加信息）
+HEATMAP_ZOOMS = range(4, 8)
+TILE_SIZE = 256
+
+# 高斯核带宽（地面公里）
+KERNEL_SIGMA_KM = 20.0
+
+EARTH_CIRCUMFERENCE_M = 40075016.686
+
+
+def week_buckets(start: str = SERIES_START, end: str = SERIES_END) -> list:
+    """时间范围内的全部周（周一起始，与aggregate_regions.py一致）"""
+    first = date.fromisoformat(start)
+    first -= timedelta(days=first.weekday())
+    last = date.fromisoformat(end)
+    buckets = []
+    while first <= last:
+        buckets.append((first.isoformat(), (first + timedelta(days=6)).isoformat()))
+        first += timedelta(days=7)
+    return buckets
+
+
+def metric_samples(features: list, prop: str) -> list:
+    """[(日期, 经度, 纬度, 权重)]，跳过空值/非正值"""
+    samples = []
+    for feature in features:
+        value = feature['properties'].get(prop)
+        day = feature['properties'].get('date')
+        if not value or value <= 0 or not day or feature.get('geometry') is None:
+            continue
+        lon, lat = feature['geometry']['coordinates'][:2]
+        samples.append((day, lon, lat, float(value)))
+    return sorted(samples)
+
+
+def bucket_samples(samples: list, buckets: list, cumulative: bool) -> list:
+    """每周的采样点元组（可哈希，用于识别内容相同的周）"""
+    return [tuple((lon, lat, w) for day, lon, lat, w in samples
+                  if (cumulative or day >= start) and day <= end)
+            for start, end in buckets]
+
+
+def zoom_grid(z: int, bbox: dict = BBOX, tile_size: int = TILE_SIZE) -> tuple:
+    """
+    覆盖bbox的瓦片范围
+
+    Returns:
+        (x0, y0, 列瓦片数, 行瓦片数)
+    """
+    tiles = tiles_covering((bbox['west'], bbox['south'], bbox['east'], bbox['north']), z)
+    xs = [x for x, _ in tiles]
+    ys = [y for _, y in tiles]
+    return min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1
+
+
+def density_window(points: tuple, z: int, tile_size: int = TILE_SIZE,
+                   sigma_km: float = KERNEL_SIGMA_KM) -> tuple:
+    """
+    一组加权点在z级瓦片网格上的核密度（每平方公里）
+
+    只在点的外包框外扩3σ的窗口内卷积（窗口外密度为0），避免对整个项目区做FFT
+
+    Returns:
+        (窗口首行, 窗口首列, float32密度数组)，行列为z级瓦片网格内的像素坐标
+    """
+    x0, y0, cols, rows = zoom_grid(z, tile_size=tile_size)
+    height, width = rows * tile_size, cols * tile_size
+
+    # 以项目区中心纬度换算核带宽
+    center_lat = (BBOX['south'] + BBOX['north']) / 2
+    pixel_m = EARTH_CIRCUMFERENCE_M / (tile_size * 2 ** z)
+    sigma_px = sigma_km * 1000 / (pixel_m * math.cos(math.radians(center_lat)))
+    radius = int(math.ceil(3 * sigma_px))
+
+    lons, lats, weights = (np.array(v) for v in zip(*points))
+    px, py = world_pixels(lons, lats, z, tile_size)
+    col = np.clip((px - x0 * tile_size).astype(np.int64), 0, width - 1)
+    row = np.clip((py - y0 * tile_size).astype(np.int64), 0, height - 1)
+
+    row0, row1 = max(int(row.min()) - radius, 0), min(int(row.max()) + radius + 1, height)
+    col0, col1 = max(int(col.min()) - radius, 0), min(int(col.max()) + radius + 1, width)
+    grid = np.zeros((row1 - row0, col1 - col0), dtype=np.float64)
+    np.add.at(grid, (row - row0, col - col0), weights)
+    density = gaussian_blur(grid, sigma_px)
+
+    # 像元面积按行纬度计算
+    world_y = (y0 * tile_size + row0 + np.arange(row1 - row0) + 0.5) / (tile_size * 2 ** z)
+    row_lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * world_y))))
+    pixel_km2 = (pixel_m * np.cos(np.radians(row_lats)) / 1000) ** 2
+    return row0, col0, density / pixel_km2[:, None].astype(np.float32)
+
+
+def write_tiles(window: tuple, maximum: float, z: int, directory: Path,
+                tile_size: int = TILE_SIZE) -> list:
+    """量化为8位灰度并切出窗口覆盖的瓦片，跳过全零瓦片，返回写出的 [x, y]"""
+    from PIL import Image
+
+    x0, y0, _, _ = zoom_grid(z, tile_size=tile_size)
+    row0, col0, density = window
+    quantized = np.rint(np.clip(density / maximum, 0, 1) * 255).astype(np.uint8)
+
+    written = []
+    for ty in range(row0 // tile_size, (row0 + density.shape[0] - 1) // tile_size + 1):
+        for tx in range(col0 // tile_size, (col0 + density.shape[1] - 1) // tile_size + 1):
+            tile = np.zeros((tile_size, tile_size), dtype=np.uint8)
+            top, left = ty * tile_size - row0, tx * tile_size - col0
+            part = quantized[max(top, 0):top + tile_size, max(left, 0):left + tile_size]
+            tile[max(-top, 0):max(-top, 0) + part.shape[0], max(-left, 0):max(-left, 0) + part.shape[1]] = part
+            if not tile.any():
+                continue
+            path = directory / str(z) / str(x0 + tx) / f"{y0 + ty}.png"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            Image.fromarray(tile).save(path, optimize=True)
+            written.append([x0 + tx, y0 + ty])
+    return written
+
+
+def build_heatmaps(events_geojson: dict, output_dir: Path = OUTPUT_DIR, zooms=HEATMAP_ZOOMS,
+                   start: str = SERIES_START, end: str = SERIES_END) -> dict:
+    """
+    构建全部指标/周/级别的热力图瓦片
+
+    每个指标先对内容不同的周求全局最大密度（量化比例在回放中保持一致），再量化写瓦片
+
+    Returns:
+        清单字典
+    """
+    features = events_geojson.get('features', [])
+    buckets = week_buckets(start, end)
+    print(f"\n构建热力图: {len(METRICS)} 个指标 × {len(buckets)} 周 × 级别 {list(zooms)}")
+
+    manifest_metrics = {}
+    bucket_sources = {key: {} for key, _ in buckets}
+    for name, spec in METRICS.items():
+        samples = metric_samples(features, spec['property'])
+        per_bucket = bucket_samples(samples, buckets, spec['cumulative'])
+
+        # 相同内容的周共用首次出现的周的瓦片
+        sources = {}
+        for (key, _), points in zip(buckets, per_bucket):
+            if points:
+                sources.setdefault(points, key)
+                bucket_sources[key][name] = sources[points]
+            else:
+                bucket_sources[key][name] = None
+        if not sources:
+            print(f"  - {name}: 无数据，跳过")
+            continue
+
+        # 清理上次构建的瓦片（周的划分或数据变化后旧瓦片不会被覆盖）
+        shutil.rmtree(output_dir / name, ignore_errors=True)
+        windows = {(key, z): density_window(points, z) for points, key in sources.items() for z in zooms}
+        maxima = {z: max(float(windows[key, z][2].max()) for key in sources.values()) for z in zooms}
+        tiles = {key: {z: write_tiles(windows[key, z], maxima[z], z, output_dir / name / key) for z in zooms}
+                 for key in sources.values()}
+        manifest_metrics[name] = {
+            "property": spec['property'],
+            "cumulative": spec['cumulative'],
+            "max": {z: round(m, 6) for z, m in maxima.items()},
+            "tiles": tiles,
+        }
+        print(f"  - {name}: {len(samples)} 个事件, {len(sources)} 组不同内容, "
+              f"{sum(len(t) for z_tiles in tiles.values() for t in z_tiles.values())} 个瓦片")
+
+    return {
+        "url": "heatmap/{metric}/{source}/{z}/{x}/{y}.png",
+        "tile_size": TILE_SIZE,
+        "zooms": list(zooms),
+        "encoding": "png-gray8",
+        "units": "per_km2",
+        "decode": "value = pixel / 255 * max[z]",
+        "kernel_sigma_km": KERNEL_SIGMA_KM,
+        "bounds": [BBOX['west'], BBOX['south'], BBOX['east'], BBOX['north']],
+        "buckets": [{"start": key, "end": bucket_end, "sources": bucket_sources[key]}
+                    for key, bucket_end in buckets],
+        "metrics": manifest_metrics,
+        "generated_at": datetime.now().isoformat(),
+    }
+
+
+def main():
+    print("=" * 70)
+    print("密度热力图瓦片构建工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        with open(EVENTS_FILE, 'r', encoding='utf-8') as f:
+            events_geojson = json.load(f)
+
+        manifest = build_heatmaps(events_geojson)
+        MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
+        total = sum(1 for _ in OUTPUT_DIR.rglob("*.png"))
+        size = sum(p.stat().st_size for p in OUTPUT_DIR.rglob("*.png")) / 1024
+        print(f"\n✅ 热力图瓦片: {OUTPUT_DIR} ({total} 个, {size:.1f} KB)")
+        print(f"✅ 清单: {MANIFEST_FILE.name}")
+
+    except FileNotFoundError:
+        print(f"\n❌ 错误: 找不到 {EVENTS_FILE}，请先运行 generate_events_geojson.py")
+        return 1
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
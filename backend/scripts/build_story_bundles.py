@@ -0,0 +1,306 @@
+"""
+Story Mode章节包构建脚本
+为 chapters.json 中的每个章节生成一个紧凑的数据包：
+相关事件（每个事件只属于一个章节）、镜头参数、KEY_LOCATIONS 周边地形窗口、
+配图（复用 optimize_images.py 的WebP变体，不重复编码），
+并生成预加载清单（manifest），前端播放第N章时即可预取第N+1章
+"""
+
+import sys
+import os
+import json
+import hashlib
+from bisect import bisect_right
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+CHAPTERS_FILE = DATA_DIR / "chapters.json"
+EVENTS_FILE = DATA_DIR / "geojson" / "events.geojson"
+DEM_FILE = DATA_DIR / "dem" / "processed" / "merged_dem_cropped.tif"
+STORY_IMAGES_DIR = DATA_DIR / "historical_maps" / "story"
+IMAGES_DIR = DATA_DIR / "images"
+OUTPUT_DIR = DATA_DIR / "story"
+
+# 配图最大尺寸（planA: 统一1920x1080），从optimize_images的WebP变体中选取不超过该尺寸的最大一档
+IMAGE_MAX_SIZE = (1920, 1080)
+IMAGE_FORMAT = "webp"
+
+# 地形窗口: 中心点周围半宽（度）与输出边长（像素）
+TERRAIN_HALF_SIZE = 0.5
+TERRAIN_RESOLUTION = 256
+
+# 默认镜头参数
+DEFAULT_CAMERA = {"zoom": 8, "pitch": 45, "bearing": 0}
+
+
+def resolve_center(chapter: dict, events_by_id: dict, key_locations: list) -> list:
+    """章节中心点: 优先使用KEY_LOCATIONS条目，否则使用首个关键事件的坐标"""
+    name = chapter.get('key_location')
+    for location in key_locations:
+        if location['name'] == name:
+            return [location['lon'], location['lat']]
+
+    for event_id in chapter.get('event_ids', []):
+        feature = events_by_id.get(event_id)
+        if feature:
+            return feature['geometry']['coordinates']
+
+    raise ValueError(f"章节 {chapter['id']} 无法确定中心点")
+
+
+def assign_events(chapters: list, features: list) -> dict:
+    """
+    把每个事件分配给唯一的章节
+
+    章节 event_ids 中列出的事件归该章节；其余事件归其日期当天已生效的章节，
+    即半开日期区间 [本章节日期, 下一章节日期)，早于第一章的事件归第一章
+
+    Returns:
+        {章节id: [feature, ...]}（保持features的顺序）
+    """
+    chapters = sorted(chapters, key=lambda c: c.get('order', 0))
+    owner = {}
+    for chapter in chapters:
+        for event_id in chapter.get('event_ids', []):
+            owner.setdefault(event_id, chapter['id'])
+
+    dates = [chapter['date'] for chapter in chapters]
+    assigned = {chapter['id']: [] for chapter in chapters}
+    for feature in features:
+        props = feature['properties']
+        chapter_id = owner.get(props['id'])
+        if chapter_id is None:
+            chapter_id = chapters[max(bisect_right(dates, props['date']) - 1, 0)]['id']
+        assigned[chapter_id].append(feature)
+    return assigned
+
+
+def render_terrain_window(dem_file: Path, center: list, output_png: Path,
+                          half_size: float = TERRAIN_HALF_SIZE,
+                          resolution: int = TERRAIN_RESOLUTION) -> dict | None:
+    """
+    读取中心点周围的DEM窗口并保存为灰度heightmap
+
+    Returns:
+        地形元数据（bbox、高程范围），DEM不存在时返回None
+    """
+    if not dem_file.exists():
+        return None
+
+    import rasterio
+    from rasterio.enums import Resampling
+    from rasterio.windows import from_bounds
+    from PIL import Image
+
+    bbox = [center[0] - half_size, center[1] - half_size, center[0] + half_size, center[1] + half_size]
+    with rasterio.open(dem_file) as src:
+        window = from_bounds(*bbox, transform=src.transform)
+        data = src.read(1, window=window, out_shape=(resolution, resolution),
+                        resampling=Resampling.bilinear).astype(np.float32)
+        if src.nodata is not None:
+            data[data == src.nodata] = np.nan
+
+    lo = float(np.nanmin(data)) if not np.all(np.isnan(data)) else 0.0
+    hi = float(np.nanmax(data)) if not np.all(np.isnan(data)) else 0.0
+    scaled = np.nan_to_num((data - lo) / ((hi - lo) or 1.0) * 255.0, nan=0.0)
+    Image.fromarray(scaled.astype(np.uint8)).save(output_png, format="PNG", optimize=True)
+
+    return {"bbox": bbox, "elevation_min": round(lo, 1), "elevation_max": round(hi, 1),
+            "resolution": resolution}
+
+
+def load_image_variants(names: list, images_dir: Path = IMAGES_DIR) -> dict:
+    """
+    读取optimize_images的变体清单；有配图尚未生成时先运行一次（按内容哈希缓存，已生成的图片直接跳过）
+
+    Returns:
+        {配图文件名: [{"width", "height", "url", "bytes"}, ...]}（只含IMAGE_FORMAT格式）
+    """
+    from optimize_images import MANIFEST_FILE, find_sources, optimize_images
+
+    def read_manifest() -> dict:
+        manifest_file = images_dir / MANIFEST_FILE.name
+        if not manifest_file.exists():
+            return {}
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def rel(name: str) -> str:
+        return (STORY_IMAGES_DIR / name).relative_to(DATA_DIR).as_posix()
+
+    wanted = [name for name in names if (STORY_IMAGES_DIR / name).exists()]
+    manifest = read_manifest()
+    if any(rel(name) not in manifest for name in wanted):
+        print("  配图变体缺失，运行 optimize_images...")
+        optimize_images(find_sources(), images_dir)
+        manifest = read_manifest()
+
+    return {name: manifest.get(rel(name), {}).get(IMAGE_FORMAT, []) for name in wanted}
+
+
+def pick_variant(variants: list, max_size: tuple = IMAGE_MAX_SIZE) -> dict | None:
+    """不超过max_size的最大变体；都超过时取最小的一档"""
+    if not variants:
+        return None
+    fitting = [v for v in variants if v['width'] <= max_size[0] and v['height'] <= max_size[1]]
+    if fitting:
+        return max(fitting, key=lambda v: v['width'])
+    return min(variants, key=lambda v: v['width'])
+
+
+def relative_url(path: Path, root: Path) -> str:
+    """相对root的URL，root之外的资源（如 images/ 下的配图变体）以 ../ 开头"""
+    return Path(os.path.relpath(path, root)).as_posix()
+
+
+def file_entry(path: Path, root: Path) -> dict:
+    """清单条目: 相对路径、字节数、内容哈希"""
+    raw = path.read_bytes()
+    return {
+        "url": relative_url(path, root),
+        "bytes": len(raw),
+        "sha256": hashlib.sha256(raw).hexdigest()[:16],
+    }
+
+
+def build_chapter_bundle(chapter: dict, events: list, events_by_id: dict, key_locations: list,
+                         image_variants: dict, output_dir: Path, images_dir: Path = IMAGES_DIR) -> list:
+    """
+    构建单个章节包
+
+    Returns:
+        该章节所有资源的清单条目（第一项为章节JSON）
+    """
+    chapter_dir = output_dir / chapter['id']
+    chapter_dir.mkdir(parents=True, exist_ok=True)
+
+    center = resolve_center(chapter, events_by_id, key_locations)
+    camera = {"center": center, **DEFAULT_CAMERA, **chapter.get('camera', {})}
+
+    assets = []
+    terrain = render_terrain_window(DEM_FILE, center, chapter_dir / "terrain.png")
+    if terrain:
+        terrain['url'] = f"{chapter['id']}/terrain.png"
+        assets.append(chapter_dir / "terrain.png")
+    else:
+        print(f"  ⚠️  DEM不存在，{chapter['id']} 跳过地形窗口")
+
+    images = []
+    for name in chapter.get('images', []):
+        variant = pick_variant(image_variants.get(name, []))
+        if variant is None:
+            print(f"  ⚠️  配图不存在: {name}")
+            continue
+        path = images_dir / variant['url']
+        srcset = [{"url": relative_url(images_dir / v['url'], output_dir), "width": v['width']}
+                  for v in image_variants[name]]
+        images.append({"source": name, "url": relative_url(path, output_dir),
+                       "width": variant['width'], "height": variant['height'], "srcset": srcset})
+        assets.append(path)
+
+    bundle = {
+        "id": chapter['id'],
+        "order": chapter.get('order'),
+        "title": chapter.get('title'),
+        "title_zh": chapter.get('title_zh'),
+        "date": chapter['date'],
+        "event_ids": chapter.get('event_ids', []),
+        "camera": camera,
+        "terrain": terrain,
+        "images": images,
+        "events": {"type": "FeatureCollection", "features": events},
+    }
+
+    bundle_file = output_dir / f"{chapter['id']}.json"
+    with open(bundle_file, 'w', encoding='utf-8') as f:
+        json.dump(bundle, f, ensure_ascii=False, separators=(',', ':'))
+
+    entries = [file_entry(bundle_file, output_dir)] + [file_entry(a, output_dir) for a in assets]
+    total_kb = sum(e['bytes'] for e in entries) / 1024
+    print(f"  - {chapter['id']} {chapter.get('title_zh', '')}: {len(events)} 个事件, "
+          f"{len(images)} 张配图, {total_kb:.1f} KB")
+    return entries
+
+
+def build_story_bundles(chapters: list, events_geojson: dict, key_locations: list,
+                        output_dir: Path = OUTPUT_DIR, images_dir: Path = IMAGES_DIR) -> dict:
+    """
+    构建全部章节包与预加载清单
+
+    Returns:
+        manifest字典
+    """
+    print("\n构建章节包...")
+
+    features = sorted(events_geojson.get('features', []), key=lambda f: f['properties']['date'])
+    events_by_id = {f['properties']['id']: f for f in features}
+    chapters = sorted(chapters, key=lambda c: c.get('order', 0))
+
+    assigned = assign_events(chapters, features)
+    image_variants = load_image_variants([name for c in chapters for name in c.get('images', [])], images_dir)
+
+    manifest_chapters = []
+    for chapter in chapters:
+        entries = build_chapter_bundle(chapter, assigned[chapter['id']], events_by_id, key_locations,
+                                       image_variants, output_dir, images_dir)
+        manifest_chapters.append({
+            "id": chapter['id'],
+            "date": chapter['date'],
+            "bundle": entries[0],
+            "assets": entries[1:],
+            "bytes": sum(e['bytes'] for e in entries),
+        })
+
+    # 第N章播放时预取第N+1章的全部资源
+    for current, following in zip(manifest_chapters, manifest_chapters[1:] + [None]):
+        current['prefetch'] = ([following['bundle']['url']] + [a['url'] for a in following['assets']]
+                               if following else [])
+
+    manifest = {
+        "generated_at": datetime.now().isoformat(),
+        "total_bytes": sum(c['bytes'] for c in manifest_chapters),
+        "chapters": manifest_chapters,
+    }
+
+    with open(output_dir / "manifest.json", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"✅ 章节包完成: {len(manifest_chapters)} 个章节, "
+          f"共 {manifest['total_bytes'] / 1024 / 1024:.2f} MB")
+    return manifest
+
+
+def main():
+    print("=" * 70)
+    print("Story Mode章节包构建工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        with open(CHAPTERS_FILE, 'r', encoding='utf-8') as f:
+            chapters = json.load(f)['chapters']
+        with open(EVENTS_FILE, 'r', encoding='utf-8') as f:
+            events_geojson = json.load(f)
+
+        from process_dem import KEY_LOCATIONS
+
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        build_story_bundles(chapters, events_geojson, KEY_LOCATIONS, OUTPUT_DIR)
+        print(f"输出目录: {OUTPUT_DIR}")
+
+    except FileNotFoundError as e:
+        print(f"\n❌ 错误: 找不到输入文件 {e.filename}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
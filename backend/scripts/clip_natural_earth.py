@@ -0,0 +1,169 @@
+"""
+Natural Earth图层裁剪脚本
+直接从下载的 .zip 读取全球1:10m Shapefile（无需解压），
+用空间索引筛选并裁剪到项目区域（北纬50-60°，东经20-45°），
+按缩放级别简化后输出紧凑的GeoJSON，供前端边界/河流图层使用
+"""
+
+import sys
+from pathlib import Path
+
+from project import BBOX
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+BOUNDARIES_DIR = DATA_DIR / "boundaries"
+OUTPUT_DIR = DATA_DIR / "geojson" / "basemap"
+
+# 项目区域四周外扩一点，避免边界处要素被截得过紧
+BBOX_MARGIN = 0.5
+
+# 图层 → 源文件与保留字段（字段名统一转为小写后匹配）
+LAYERS = {
+    "countries": {
+        "file": "ne_10m_admin_0_countries.zip",
+        "columns": ["name", "name_zh", "iso_a3"],
+    },
+    "provinces": {
+        "file": "ne_10m_admin_1_states_provinces.zip",
+        "columns": ["name", "name_zh", "admin", "iso_3166_2", "adm1_code"],
+    },
+    "places": {
+        "file": "ne_10m_populated_places.zip",
+        "columns": ["name", "name_zh", "pop_max", "scalerank"],
+    },
+    "rivers": {
+        "file": "ne_10m_rivers_lake_centerlines.zip",
+        "columns": ["name", "name_zh", "scalerank"],
+    },
+}
+
+# 缩放级别 → (简化容差（度）, 坐标小数位数)
+ZOOM_LEVELS = {
+    4: (0.05, 3),
+    6: (0.01, 4),
+    8: (0.002, 5),
+}
+
+
+def project_bounds(bbox: dict = BBOX, margin: float = BBOX_MARGIN) -> tuple:
+    """(west, south, east, north)，含外扩边距"""
+    return (bbox['west'] - margin, bbox['south'] - margin,
+            bbox['east'] + margin, bbox['north'] + margin)
+
+
+def read_zipped_layer(zip_path: Path, bounds: tuple, columns: list, clip: bool = True):
+    """
+    直接从zip中读取Shapefile并裁剪到项目区域
+
+    先由OGR按外包框过滤读取（避免把全球数据全部载入），
+    再用STRtree空间索引做精确相交筛选，最后按矩形裁剪几何
+
+    Args:
+        zip_path: Natural Earth zip路径
+        bounds: (west, south, east, north)
+        columns: 保留字段
+        clip: 是否裁剪几何（做面积统计时需保留完整多边形）
+
+    Returns:
+        GeoDataFrame（EPSG:4326，仅保留指定字段）
+    """
+    import geopandas as gpd
+    import shapely
+    from shapely.geometry import box
+
+    gdf = gpd.read_file(f"zip://{zip_path}", bbox=bounds)
+    gdf = gdf.rename(columns=str.lower).to_crs(epsg=4326)
+    gdf = gdf[[c for c in columns if c in gdf.columns] + ['geometry']]
+
+    area = box(*bounds)
+    gdf = gdf.iloc[gdf.sindex.query(area, predicate="intersects")].copy()
+    if not clip:
+        return gdf.sort_index().reset_index(drop=True)
+
+    # 点要素已在范围内，只对线/面做裁剪
+    is_point = gdf.geom_type.isin(["Point", "MultiPoint"])
+    gdf.loc[~is_point, 'geometry'] = shapely.clip_by_rect(gdf.geometry[~is_point].values, *bounds)
+    gdf = gdf[~gdf.geometry.is_empty]
+    return gdf.sort_index().reset_index(drop=True)
+
+
+def simplify_layer(gdf, tolerance: float):
+    """按容差简化线/面（保持拓扑），丢弃简化后为空的要素"""
+    simplified = gdf.copy()
+    simplified['geometry'] = gdf.geometry.simplify(tolerance, preserve_topology=True)
+    return simplified[~simplified.geometry.is_empty]
+
+
+def clip_layer(name: str, spec: dict, boundaries_dir: Path = BOUNDARIES_DIR,
+               output_dir: Path = OUTPUT_DIR, zoom_levels: dict = ZOOM_LEVELS) -> dict | None:
+    """
+    裁剪并按缩放级别输出单个图层
+
+    Returns:
+        {"source_bytes", "features", "outputs": {缩放级别: 字节数}}，源文件不存在时返回None
+    """
+    zip_path = boundaries_dir / spec['file']
+    if not zip_path.exists():
+        print(f"  ⚠️  未找到: {zip_path.name}")
+        return None
+
+    gdf = read_zipped_layer(zip_path, project_bounds(), spec['columns'])
+    outputs = {}
+    for zoom, (tolerance, precision) in sorted(zoom_levels.items()):
+        layer = simplify_layer(gdf, tolerance)
+        output = output_dir / f"{name}_z{zoom}.geojson"
+        output.unlink(missing_ok=True)
+        layer.to_file(output, driver="GeoJSON", COORDINATE_PRECISION=precision, RFC7946="YES")
+        outputs[zoom] = output.stat().st_size
+
+    sizes = ", ".join(f"z{z}: {b / 1024:.1f} KB" for z, b in outputs.items())
+    print(f"  - {name}: {len(gdf)} 个要素 ({zip_path.stat().st_size / 1024 / 1024:.1f} MB → {sizes})")
+    return {"source_bytes": zip_path.stat().st_size, "features": len(gdf), "outputs": outputs}
+
+
+def clip_natural_earth(boundaries_dir: Path = BOUNDARIES_DIR, output_dir: Path = OUTPUT_DIR) -> dict:
+    """
+    裁剪全部Natural Earth图层
+
+    Returns:
+        {图层名: clip_layer结果}
+    """
+    print("\n裁剪Natural Earth图层到项目区域...")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    for name, spec in LAYERS.items():
+        result = clip_layer(name, spec, boundaries_dir, output_dir)
+        if result:
+            results[name] = result
+
+    if results:
+        source = sum(r['source_bytes'] for r in results.values())
+        largest = sum(max(r['outputs'].values()) for r in results.values())
+        print(f"✅ 裁剪完成: 源数据 {source / 1024 / 1024:.1f} MB → "
+              f"最高精度图层合计 {largest / 1024 / 1024:.2f} MB")
+    return results
+
+
+def main():
+    print("=" * 70)
+    print("Natural Earth图层裁剪工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        if not clip_natural_earth():
+            print("\n⚠️  未找到任何Natural Earth数据，请先运行 download_geodata.py")
+            return
+        print(f"\n输出目录: {OUTPUT_DIR}")
+
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
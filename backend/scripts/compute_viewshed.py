@@ -0,0 +1,282 @@
+"""
+战场视域（viewshed）分析脚本
+为博罗季诺、斯摩棱斯克、小雅罗斯拉韦茨等战场的观察点计算可视范围：
+在裁剪后的DEM上以观察点为中心做向量化径向扫描（向窗口边界每个像元发射一条射线，
+沿射线用累积最大值求地平线角），多个观察点由进程池并行计算，
+输出1bit压缩GeoTIFF掩膜与简化后的可视区多边形GeoJSON
+"""
+
+import sys
+import json
+import math
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from raster_utils import EARTH_RADIUS_KM
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+DEM_FILE = DATA_DIR / "dem" / "processed" / "merged_dem_cropped.tif"
+EVENTS_FILE = DATA_DIR / "geojson" / "events.geojson"
+RASTER_DIR = DATA_DIR / "dem" / "processed" / "viewshed"
+OUTPUT_FILE = DATA_DIR / "geojson" / "viewsheds.geojson"
+
+# 分析半径（米）
+VIEWSHED_RADIUS = 20000
+
+# 观察者离地高度（骑马/土垒上的指挥官）与目标高度（站立的部队），米
+OBSERVER_HEIGHT = 10.0
+TARGET_HEIGHT = 2.0
+
+# 地球曲率与大气折射
+EARTH_RADIUS = EARTH_RADIUS_KM * 1000.0
+REFRACTION_COEFFICIENT = 0.13
+
+# 每度经/纬度对应的米数（纬度方向近似为常数）
+METERS_PER_DEGREE = 111320.0
+
+# 参与分析的事件类型
+OBSERVER_EVENT_TYPES = {"battle"}
+
+
+def collect_observers(events_geojson: dict | None, key_locations: list,
+                      height: float = OBSERVER_HEIGHT) -> list:
+    """
+    观察点: KEY_LOCATIONS + 战斗事件坐标（同名或相距<1km的只保留一个）
+
+    Returns:
+        [{"name", "lon", "lat", "height"}]
+    """
+    candidates = [{"name": loc['name'], "lon": loc['lon'], "lat": loc['lat']} for loc in key_locations]
+    for feature in (events_geojson or {}).get('features', []):
+        props = feature['properties']
+        if props.get('type') in OBSERVER_EVENT_TYPES:
+            lon, lat = feature['geometry']['coordinates']
+            candidates.append({"name": props.get('location_name') or props['id'], "lon": lon, "lat": lat})
+
+    observers = []
+    for candidate in candidates:
+        duplicate = any(
+            o['name'] == candidate['name']
+            or math.hypot((o['lon'] - candidate['lon']) * math.cos(math.radians(o['lat'])),
+                          o['lat'] - candidate['lat']) * METERS_PER_DEGREE < 1000
+            for o in observers
+        )
+        if not duplicate:
+            observers.append({**candidate, "height": height})
+    return observers
+
+
+def slugify(name: str) -> str:
+    return "".join(c.lower() if c.isalnum() else "_" for c in name).strip("_")
+
+
+def read_observer_window(src, lon: float, lat: float, radius_m: float) -> tuple:
+    """
+    读取观察点周围的DEM窗口（与数据集范围求交）
+
+    Returns:
+        (高程数组（NaN为无数据）, 窗口, 观察点行号, 观察点列号)
+    """
+    from rasterio.windows import Window
+
+    res_x, res_y = abs(src.transform.a), abs(src.transform.e)
+    half_cols = int(math.ceil(radius_m / (res_x * METERS_PER_DEGREE * math.cos(math.radians(lat)))))
+    half_rows = int(math.ceil(radius_m / (res_y * METERS_PER_DEGREE)))
+
+    row, col = src.index(lon, lat)
+    window = Window(col - half_cols, row - half_rows, 2 * half_cols + 1, 2 * half_rows + 1)
+    window = window.intersection(Window(0, 0, src.width, src.height))
+
+    data = src.read(1, window=window).astype(np.float32)
+    if src.nodata is not None:
+        data[data == src.nodata] = np.nan
+    return data, window, row - window.row_off, col - window.col_off
+
+
+def radial_viewshed(dem: np.ndarray, row0: int, col0: int, cell_x: float, cell_y: float,
+                    observer_height: float = OBSERVER_HEIGHT, target_height: float = TARGET_HEIGHT,
+                    radius_m: float = VIEWSHED_RADIUS) -> np.ndarray:
+    """
+    向量化径向视域
+
+    从观察点向窗口边界的每个像元发射射线，所有射线同时以相同步数采样（最近邻），
+    地形仰角沿射线做 np.maximum.accumulate 得到前方遮挡的最大仰角，
+    目标（地面+target_height）仰角不低于该值即可见；一个像元只要被任一射线判为可见即为可见
+
+    Args:
+        dem: 高程窗口（米），NaN为无数据
+        row0, col0: 观察点在窗口中的位置
+        cell_x, cell_y: 像元在东西/南北方向的边长（米）
+
+    Returns:
+        uint8掩膜（1可见，0不可见）
+    """
+    height, width = dem.shape
+    z0 = dem[row0, col0]
+    mask = np.zeros(dem.shape, dtype=np.uint8)
+    if np.isnan(z0):
+        return mask
+    z0 = z0 + observer_height
+
+    # 窗口边界上的全部像元作为射线终点
+    border_rows = np.concatenate([np.zeros(width), np.full(width, height - 1),
+                                  np.arange(height), np.arange(height)])
+    border_cols = np.concatenate([np.arange(width), np.arange(width),
+                                  np.zeros(height), np.full(height, width - 1)])
+
+    steps = max(height, width)
+    t = np.arange(1, steps + 1, dtype=np.float64) / steps
+    rows = np.rint(row0 + (border_rows[:, None] - row0) * t).astype(np.int64)
+    cols = np.rint(col0 + (border_cols[:, None] - col0) * t).astype(np.int64)
+
+    distance = np.hypot((rows - row0) * cell_y, (cols - col0) * cell_x)
+    distance[distance == 0] = np.nan
+    curvature = distance ** 2 * (1 - REFRACTION_COEFFICIENT) / (2 * EARTH_RADIUS)
+
+    ground = dem[rows, cols] - curvature
+    terrain_angle = (ground - z0) / distance
+    target_angle = (ground + target_height - z0) / distance
+
+    # 前方（更靠近观察点）的最大地形仰角；无数据/观察点自身不遮挡
+    blocking = np.nan_to_num(terrain_angle, nan=-np.inf)
+    horizon = np.maximum.accumulate(blocking, axis=1)
+    horizon = np.concatenate([np.full((len(rows), 1), -np.inf), horizon[:, :-1]], axis=1)
+
+    visible = (target_angle >= horizon) & (distance <= radius_m)
+    mask[rows[visible], cols[visible]] = 1
+    mask[row0, col0] = 1
+    return mask
+
+
+def mask_polygons(mask: np.ndarray, transform, tolerance: float):
+    """可视区多边形（合并并按像元大小简化）"""
+    import shapely
+    from rasterio.features import shapes
+    from shapely.geometry import shape
+    from shapely.ops import unary_union
+
+    polygons = [shape(geom) for geom, value in shapes(mask, mask=mask.astype(bool), transform=transform)
+                if value == 1]
+    merged = unary_union(polygons).simplify(tolerance, preserve_topology=True)
+    # 坐标保留到约1米
+    return shapely.set_precision(merged, 1e-5)
+
+
+def compute_observer(dem_file: str, observer: dict, raster_dir: str,
+                     radius_m: float = VIEWSHED_RADIUS, target_height: float = TARGET_HEIGHT) -> dict:
+    """
+    计算单个观察点的视域（在子进程中运行）: 写出压缩掩膜，返回可视区Feature
+
+    Returns:
+        GeoJSON Feature
+    """
+    import rasterio
+    from shapely.geometry import mapping
+
+    with rasterio.open(dem_file) as src:
+        dem, window, row0, col0 = read_observer_window(src, observer['lon'], observer['lat'], radius_m)
+        transform = src.window_transform(window)
+        crs = src.crs
+
+    cell_x = abs(transform.a) * METERS_PER_DEGREE * math.cos(math.radians(observer['lat']))
+    cell_y = abs(transform.e) * METERS_PER_DEGREE
+    mask = radial_viewshed(dem, row0, col0, cell_x, cell_y, observer['height'], target_height, radius_m)
+
+    raster_path = Path(raster_dir) / f"{slugify(observer['name'])}.tif"
+    raster_path.parent.mkdir(parents=True, exist_ok=True)
+    with rasterio.open(raster_path, 'w', driver='GTiff', width=mask.shape[1], height=mask.shape[0],
+                       count=1, dtype='uint8', crs=crs, transform=transform,
+                       compress='deflate', nbits=1, tiled=True) as dst:
+        dst.write(mask, 1)
+
+    rows, cols = np.indices(dem.shape)
+    in_range = ~np.isnan(dem) & (np.hypot((rows - row0) * cell_y, (cols - col0) * cell_x) <= radius_m)
+    visible_km2 = float(mask.sum()) * cell_x * cell_y / 1e6
+    geometry = mask_polygons(mask, transform, abs(transform.a))
+    return {
+        "type": "Feature",
+        "geometry": mapping(geometry),
+        "properties": {
+            "name": observer['name'],
+            "observer": [observer['lon'], observer['lat']],
+            "observer_height": observer['height'],
+            "target_height": target_height,
+            "radius_m": radius_m,
+            "visible_km2": round(visible_km2, 2),
+            "visible_fraction": round(float(mask[in_range].mean()) if in_range.any() else 0.0, 4),
+            "raster": raster_path.name,
+        },
+    }
+
+
+def compute_viewsheds(dem_file: Path, observers: list, raster_dir: Path = RASTER_DIR,
+                      radius_m: float = VIEWSHED_RADIUS, workers: int | None = None) -> dict:
+    """
+    并行计算全部观察点的视域
+
+    Returns:
+        FeatureCollection
+    """
+    print(f"\n计算视域: {len(observers)} 个观察点, 半径 {radius_m / 1000:.0f} km")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(compute_observer, str(dem_file), observer, str(raster_dir), radius_m)
+                   for observer in observers]
+        features = []
+        for future in futures:
+            feature = future.result()
+            props = feature['properties']
+            print(f"  - {props['name']}: 可见 {props['visible_km2']:.1f} km² "
+                  f"({props['visible_fraction'] * 100:.1f}%)")
+            features.append(feature)
+
+    return {
+        "type": "FeatureCollection",
+        "features": features,
+        "metadata": {
+            "radius_m": radius_m,
+            "observer_height": OBSERVER_HEIGHT,
+            "target_height": TARGET_HEIGHT,
+            "refraction_coefficient": REFRACTION_COEFFICIENT,
+        },
+    }
+
+
+def main():
+    print("=" * 70)
+    print("战场视域分析工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        if not DEM_FILE.exists():
+            print(f"\n❌ 未找到DEM: {DEM_FILE}")
+            print("请先运行 process_dem.py")
+            return 1
+
+        events_geojson = None
+        if EVENTS_FILE.exists():
+            with open(EVENTS_FILE, 'r', encoding='utf-8') as f:
+                events_geojson = json.load(f)
+
+        from process_dem import KEY_LOCATIONS
+
+        observers = collect_observers(events_geojson, KEY_LOCATIONS)
+        collection = compute_viewsheds(DEM_FILE, observers)
+
+        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(collection, f, ensure_ascii=False, separators=(',', ':'))
+        print(f"\n✅ 视域多边形: {OUTPUT_FILE} ({OUTPUT_FILE.stat().st_size / 1024:.1f} KB)")
+        print(f"✅ 视域掩膜: {RASTER_DIR}")
+
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
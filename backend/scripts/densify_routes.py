@@ -0,0 +1,252 @@
+"""
+行军路线地形加密脚本
+将 movements.geojson 中每段事件间路线按固定间距加密，
+一次性批量从 merged_dem_cropped.tif 采样全部顶点高程，
+输出三维坐标及每段的累计距离/累计爬升剖面，前端无需再自行采样heightmap
+"""
+
+import sys
+import json
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+
+from raster_utils import bilinear_sample, haversine_km
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+GEOJSON_DIR = DATA_DIR / "geojson"
+DEM_FILE = DATA_DIR / "dem" / "processed" / "merged_dem_cropped.tif"
+MOVEMENTS_FILE = GEOJSON_DIR / "movements.geojson"
+OUTPUT_FILE = GEOJSON_DIR / "movements_3d.geojson"
+
+# 默认加密间距（km），DEM分辨率约100m
+DEFAULT_SPACING_KM = 1.0
+
+# 按块读取DEM时的块大小（像素）
+READ_BLOCK_SIZE = 512
+
+
+def densify_segment(start: tuple, end: tuple, spacing_km: float = DEFAULT_SPACING_KM) -> np.ndarray:
+    """
+    在两点之间按间距线性插值
+
+    Args:
+        start: (lon, lat)
+        end: (lon, lat)
+        spacing_km: 最大顶点间距
+
+    Returns:
+        (N, 2) 经纬度数组，包含首尾两点
+    """
+    distance = float(haversine_km(start[0], start[1], end[0], end[1]))
+    steps = max(1, int(np.ceil(distance / spacing_km)))
+    t = np.linspace(0.0, 1.0, steps + 1)[:, None]
+    return (1 - t) * np.asarray(start, dtype=np.float64) + t * np.asarray(end, dtype=np.float64)
+
+
+def sample_dem(dem_file: Path, lons: np.ndarray, lats: np.ndarray,
+               block_size: int = READ_BLOCK_SIZE) -> np.ndarray:
+    """
+    批量双线性采样DEM高程
+
+    所有点一次性换算为像素坐标，按所在块分组，每个块只读取一次窗口，块内采样完全向量化；
+    无数据像元不参与加权（与API的点高程服务使用同一个采样函数）。
+
+    Args:
+        dem_file: DEM GeoTIFF路径
+        lons, lats: 经纬度数组
+        block_size: 读取块大小（像素）
+
+    Returns:
+        高程数组（米），超出范围或无数据处为NaN
+    """
+    import rasterio
+    from rasterio.windows import Window
+
+    lons = np.asarray(lons, dtype=np.float64)
+    lats = np.asarray(lats, dtype=np.float64)
+    elevations = np.full(lons.shape, np.nan)
+
+    with rasterio.open(dem_file) as src:
+        inverse = ~src.transform
+        cols = inverse.a * lons + inverse.b * lats + inverse.c - 0.5
+        rows = inverse.d * lons + inverse.e * lats + inverse.f - 0.5
+
+        inside = (cols >= -0.5) & (rows >= -0.5) & (cols <= src.width - 0.5) & (rows <= src.height - 0.5)
+        col0 = np.minimum(np.floor(np.clip(cols, 0, src.width - 1)).astype(np.int64), max(src.width - 2, 0))
+        row0 = np.minimum(np.floor(np.clip(rows, 0, src.height - 1)).astype(np.int64), max(src.height - 2, 0))
+
+        blocks_x = -(-src.width // block_size)
+        block_keys = (row0 // block_size) * blocks_x + (col0 // block_size)
+
+        for key in np.unique(block_keys[inside]):
+            mask = inside & (block_keys == key)
+            r_off = int(key // blocks_x) * block_size
+            c_off = int(key % blocks_x) * block_size
+            window = Window(c_off, r_off,
+                            min(block_size + 1, src.width - c_off),
+                            min(block_size + 1, src.height - r_off))
+            data = src.read(1, window=window)
+            elevations[mask] = bilinear_sample(data, rows[mask] - r_off, cols[mask] - c_off, src.nodata)
+
+    return elevations
+
+
+def elevation_profile(lonlat: np.ndarray, elevations: np.ndarray) -> dict:
+    """
+    计算单段路线的累计距离与累计爬升/下降剖面
+
+    Returns:
+        {"distance_km": [...], "gain_m": [...], "loss_m": [...]} 与顶点一一对应
+    """
+    steps = haversine_km(lonlat[:-1, 0], lonlat[:-1, 1], lonlat[1:, 0], lonlat[1:, 1])
+    distance = np.concatenate([[0.0], np.cumsum(steps)])
+
+    # 与无数据（NaN）顶点相邻的差值不计入爬升/下降，避免把缺口当作0米
+    diffs = np.diff(np.asarray(elevations, dtype=np.float64))
+    gain = np.concatenate([[0.0], np.nancumsum(np.clip(diffs, 0, None))])
+    loss = np.concatenate([[0.0], np.nancumsum(np.clip(-diffs, 0, None))])
+
+    return {
+        "distance_km": np.round(distance, 3).tolist(),
+        "gain_m": np.round(gain, 1).tolist(),
+        "loss_m": np.round(loss, 1).tolist(),
+    }
+
+
+def collect_segments(movements: dict, lod: int = 1) -> list:
+    """从movements GeoJSON中按指定LOD拆出事件间路段"""
+    segments = []
+    for feature in movements.get('features', []):
+        props = feature['properties']
+        if props.get('lod') != lod:
+            continue
+        coords = feature['geometry']['coordinates']
+        dates = props.get('dates', [])
+        event_ids = props.get('event_ids', [])
+        for i in range(len(coords) - 1):
+            segments.append({
+                "faction": props['faction'],
+                "index": i,
+                "start": tuple(coords[i]),
+                "end": tuple(coords[i + 1]),
+                "from_event": event_ids[i] if i < len(event_ids) else None,
+                "to_event": event_ids[i + 1] if i + 1 < len(event_ids) else None,
+                "from_date": dates[i] if i < len(dates) else None,
+                "to_date": dates[i + 1] if i + 1 < len(dates) else None,
+            })
+    return segments
+
+
+def build_terrain_routes(movements: dict, dem_file: Path = DEM_FILE,
+                         spacing_km: float = DEFAULT_SPACING_KM, lod: int = 1) -> dict:
+    """
+    生成带高程的加密路线GeoJSON
+
+    Args:
+        movements: movements GeoJSON
+        dem_file: DEM路径
+        spacing_km: 加密间距
+        lod: 使用的路线LOD级别
+
+    Returns:
+        GeoJSON FeatureCollection，每个路段一条三维LineString
+    """
+    print(f"\n加密路线 (间距 {spacing_km} km, LOD{lod})...")
+
+    segments = collect_segments(movements, lod)
+    densified = [densify_segment(s['start'], s['end'], spacing_km) for s in segments]
+    if not densified:
+        print("⚠️  没有可处理的路段")
+        return {"type": "FeatureCollection", "features": []}
+
+    # 所有顶点一次性批量采样
+    all_points = np.concatenate(densified)
+    print(f"批量采样高程: {len(all_points)} 个顶点, {len(segments)} 个路段")
+    all_elevations = sample_dem(dem_file, all_points[:, 0], all_points[:, 1])
+    split_at = np.cumsum([len(d) for d in densified])[:-1]
+    elevations = np.split(all_elevations, split_at)
+
+    features = []
+    for segment, lonlat, elev in zip(segments, densified, elevations):
+        profile = elevation_profile(lonlat, elev)
+        coords = np.column_stack([np.round(lonlat, 5), np.round(elev, 1)])
+        features.append({
+            "type": "Feature",
+            "geometry": {
+                "type": "LineString",
+                "coordinates": [[x, y, None if np.isnan(z) else z] for x, y, z in coords.tolist()]
+            },
+            "properties": {
+                "id": f"segment_{segment['faction']}_{segment['index']:03d}",
+                "faction": segment['faction'],
+                "from_event": segment['from_event'],
+                "to_event": segment['to_event'],
+                "from_date": segment['from_date'],
+                "to_date": segment['to_date'],
+                "vertex_count": len(lonlat),
+                "distance_km": profile['distance_km'][-1],
+                "elevation_gain_m": profile['gain_m'][-1],
+                "elevation_loss_m": profile['loss_m'][-1],
+                "elevation_min_m": None if np.all(np.isnan(elev)) else round(float(np.nanmin(elev)), 1),
+                "elevation_max_m": None if np.all(np.isnan(elev)) else round(float(np.nanmax(elev)), 1),
+                "profile": profile,
+            }
+        })
+
+    print(f"✅ 加密完成: {len(features)} 个路段")
+
+    return {
+        "type": "FeatureCollection",
+        "metadata": {
+            "title": "Napoleon's 1812 Russian Campaign - Terrain-aware Movements",
+            "title_zh": "1812年拿破仑东征俄罗斯 - 地形贴合行军路线",
+            "source_dem": dem_file.name,
+            "spacing_km": spacing_km,
+            "lod": lod,
+            "total_vertices": int(len(all_points)),
+            "generated_at": datetime.now().isoformat(),
+            "coordinate_system": "WGS84 + elevation (m)",
+        },
+        "features": features
+    }
+
+
+def main():
+    print("=" * 70)
+    print("行军路线地形加密工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    if not MOVEMENTS_FILE.exists():
+        print(f"\n❌ 错误: 找不到 {MOVEMENTS_FILE}")
+        print("请先运行 generate_movements.py")
+        return 1
+    if not DEM_FILE.exists():
+        print(f"\n❌ 错误: 找不到 {DEM_FILE}")
+        print("请先运行 process_dem.py")
+        return 1
+
+    try:
+        with open(MOVEMENTS_FILE, 'r', encoding='utf-8') as f:
+            movements = json.load(f)
+
+        geojson = build_terrain_routes(movements, DEM_FILE)
+
+        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(geojson, f, ensure_ascii=False, separators=(',', ':'))
+
+        size_kb = OUTPUT_FILE.stat().st_size / 1024
+        print(f"✅ 保存成功: {OUTPUT_FILE.name} ({size_kb:.1f} KB)")
+
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+共享下载客户端
+download_geodata.py 与 download_jaxa_aw3d30.py 共用：
+连接池复用的Session、指数退避+抖动重试、断点续传、可配置超时、
+自适应块大小以及限频的进度输出
+"""
+
+import random
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+# 默认超时（连接, 读取），单位秒
+DEFAULT_TIMEOUT = (10, 60)
+
+# 重试参数
+DEFAULT_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+# 需要重试的HTTP状态码
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# 自适应块大小范围（字节）
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+# 进度输出最小间隔（秒）
+PROGRESS_INTERVAL = 0.5
+
+
+class DownloadError(Exception):
+    """下载失败（重试耗尽或不可重试的错误）"""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _RetryableStatus(Exception):
+    """可重试的HTTP状态码（5xx/429等）"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """指数退避 + 全抖动（full jitter）: [0, min(cap, base * 2^attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class DownloadClient:
+    """带连接池的下载客户端，同一实例可在多次下载间复用keep-alive连接"""
+
+    def __init__(self, timeout: tuple = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                 pool_size: int = 8, backoff_base: float = BACKOFF_BASE,
+                 progress_interval: float = PROGRESS_INTERVAL, session: requests.Session | None = None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.progress_interval = progress_interval
+
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def download(self, url: str, output_path: Path, timeout: tuple | None = None) -> Path:
+        """
+        下载文件（先写入 .part，完成后原子替换）
+
+        重试时若服务器支持Range则从已下载位置续传
+
+        Args:
+            url: 下载链接
+            output_path: 保存路径
+            timeout: 本次下载的超时（默认使用客户端设置）
+
+        Returns:
+            output_path
+
+        Raises:
+            DownloadError: 不可重试的HTTP错误或重试次数耗尽
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = output_path.with_name(output_path.name + ".part")
+        part_path.unlink(missing_ok=True)
+
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = backoff_delay(attempt - 1, self.backoff_base)
+                print(f"\n重试 {attempt}/{self.retries}，{delay:.1f} 秒后... ({last_error})")
+                time.sleep(delay)
+
+            try:
+                self._fetch(url, part_path, timeout or self.timeout)
+                part_path.replace(output_path)
+                return output_path
+            except DownloadError:
+                raise
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError, _RetryableStatus) as e:
+                last_error = e
+
+        raise DownloadError(f"重试 {self.retries} 次后仍失败: {last_error}",
+                            getattr(last_error, 'status_code', None))
+
+    def _fetch(self, url: str, part_path: Path, timeout: tuple):
+        """单次请求，写入/续写 part_path"""
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        with self.session.get(url, stream=True, timeout=timeout, headers=headers) as response:
+            if response.status_code in RETRY_STATUS:
+                raise _RetryableStatus(response.status_code)
+            if response.status_code >= 400:
+                raise DownloadError(f"HTTP {response.status_code}: {url}", response.status_code)
+
+            if offset and response.status_code != 206:
+                # 服务器不支持续传，从头开始
+                offset = 0
+            # 压缩传输时content-length是压缩后大小，无法与写入字节数比较
+            length = 0 if response.headers.get('content-encoding') else int(response.headers.get('content-length', 0))
+            total = length + offset if length else 0
+
+            mode = 'ab' if offset else 'wb'
+            with open(part_path, mode) as f:
+                self._copy(response, f, offset, total)
+
+            if total and part_path.stat().st_size < total:
+                raise requests.exceptions.ChunkedEncodingError(
+                    f"连接中断: {part_path.stat().st_size}/{total} 字节")
+
+    def _copy(self, response, f, downloaded: int, total: int):
+        """按自适应块大小读取响应体并限频输出进度"""
+        chunk_size = MIN_CHUNK_SIZE
+        last_report = 0.0
+        raw = response.raw
+        raw.decode_content = True
+
+        while True:
+            started = time.perf_counter()
+            # 直接读取raw时urllib3异常不会被requests转换，这里按iter_content的方式转换
+            try:
+                chunk = raw.read(chunk_size)
+            except ProtocolError as e:
+                raise requests.exceptions.ChunkedEncodingError(e)
+            except ReadTimeoutError as e:
+                raise requests.exceptions.ConnectionError(e)
+            if not chunk:
+                break
+            f.write(chunk)
+            downloaded += len(chunk)
+
+            # 读取很快说明带宽充足，加大块以减少循环开销；很慢则减小块以保持进度响应
+            elapsed = time.perf_counter() - started
+            if elapsed < 0.05 and len(chunk) == chunk_size:
+                chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
+            elif elapsed > 1.0:
+                chunk_size = max(chunk_size // 2, MIN_CHUNK_SIZE)
+
+            now = time.monotonic()
+            if now - last_report >= self.progress_interval:
+                last_report = now
+                print_progress(downloaded, total)
+
+        print_progress(downloaded, total)
+
+
+def print_progress(downloaded: int, total: int):
+    mb_downloaded = downloaded / 1024 / 1024
+    if total:
+        percent = downloaded / total * 100
+        print(f"\r进度: {percent:.1f}% ({mb_downloaded:.1f}/{total / 1024 / 1024:.1f} MB)", end='')
+    else:
+        print(f"\r已下载: {mb_downloaded:.1f} MB", end='')
+
+
+_default_client = None
+
+
+def get_client() -> DownloadClient:
+    """进程内共享的默认客户端（复用连接池）"""
+    global _default_client
+    if _default_client is None:
+        _default_client = DownloadClient()
+    return _default_client
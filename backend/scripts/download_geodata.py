@@ -4,41 +4,23 @@
 包括：SRTM DEM、历史地图、行政区划边界
 """
 
-import os
-import requests
+import sys
 from pathlib import Path
-import zipfile
-import tarfile
 
-# 创建数据目录
+# 数据目录（在写入时创建，导入本模块没有副作用）
 DATA_DIR = Path(__file__).parent.parent / "data"
 DEM_DIR = DATA_DIR / "dem"
 BOUNDARIES_DIR = DATA_DIR / "boundaries"
 MAPS_DIR = DATA_DIR / "historical_maps"
 
-for dir_path in [DEM_DIR, BOUNDARIES_DIR, MAPS_DIR]:
-    dir_path.mkdir(parents=True, exist_ok=True)
 
-
-def download_file(url: str, output_path: Path, chunk_size: int = 8192):
-    """下载文件并显示进度"""
+def download_file(url: str, output_path: Path):
+    """下载文件并显示进度（共享连接池，失败自动重试）"""
     print(f"正在下载: {url}")
     print(f"保存至: {output_path}")
 
-    response = requests.get(url, stream=True)
-    response.raise_for_status()
-
-    total_size = int(response.headers.get('content-length', 0))
-    downloaded = 0
-
-    with open(output_path, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=chunk_size):
-            if chunk:
-                f.write(chunk)
-                downloaded += len(chunk)
-                if total_size:
-                    percent = (downloaded / total_size) * 100
-                    print(f"\r进度: {percent:.1f}%", end='')
+    from download_client import get_client
+    get_client().download(url, output_path)
 
     print("\n下载完成！")
     return output_path
@@ -85,6 +67,7 @@ def download_srtm_dem():
 
     # 保存瓦片列表
     tile_list_file = DEM_DIR / "dem_tiles_list.txt"
+    DEM_DIR.mkdir(parents=True, exist_ok=True)
     with open(tile_list_file, 'w', encoding='utf-8') as f:
         f.write("# SRTM DEM瓦片下载列表\n")
         f.write("# 覆盖区域: 北纬50-60°，东经20-45°\n\n")
@@ -133,18 +116,14 @@ def download_natural_earth_data():
         try:
             download_file(dataset['url'], output_path)
 
-            # 解压
-            print("正在解压...")
-            with zipfile.ZipFile(output_path, 'r') as zip_ref:
-                extract_dir = BOUNDARIES_DIR / dataset['file'].replace('.zip', '')
-                extract_dir.mkdir(exist_ok=True)
-                zip_ref.extractall(extract_dir)
-            print(f"解压完成: {extract_dir}")
-
         except Exception as e:
             print(f"下载失败: {e}")
             print(f"请手动下载: {dataset['url']}")
 
+    # 不解压全球数据，直接从zip裁剪出项目区域的分级图层
+    from clip_natural_earth import clip_natural_earth
+    clip_natural_earth(BOUNDARIES_DIR)
+
 
 def download_osm_data():
     """
@@ -308,7 +287,10 @@ curl -O https://naciscdn.org/naturalearth/10m/cultural/ne_10m_populated_places.z
 
 下载完成后，按以下顺序处理：
 
-1. **解压所有.zip文件**
+1. **裁剪Natural Earth图层**（直接读取.zip，无需解压）
+   ```bash
+   python scripts/clip_natural_earth.py
+   ```
 2. **GDAL裁剪DEM到项目区域**
    ```bash
    gdalwarp -te 20 50 45 60 -tr 0.001 0.001 input.tif output.tif
@@ -415,4 +397,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
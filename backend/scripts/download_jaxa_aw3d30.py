@@ -3,14 +3,13 @@ JAXA AW3D30 DEM数据自动下载脚本
 用于1812年拿破仑东征项目
 """
 
-import requests
+import sys
 import os
 from pathlib import Path
 import time
 
-# 数据保存目录
+# 数据保存目录（下载时创建）
 DEM_DIR = Path(__file__).parent.parent / "data" / "dem" / "jaxa_aw3d30"
-DEM_DIR.mkdir(parents=True, exist_ok=True)
 
 # JAXA AW3D30 基础URL
 BASE_URL = "https://www.eorc.jaxa.jp/ALOS/aw3d30/data/release_v2404/"
@@ -51,49 +50,29 @@ def download_file(url: str, output_path: Path, timeout: int = 300) -> bool:
     Args:
         url: 下载链接
         output_path: 保存路径
-        timeout: 超时时间（秒）
+        timeout: 读取超时时间（秒）
 
     Returns:
         bool: 是否下载成功
     """
+    # requests只在真正下载时加载
+    from download_client import DownloadError, get_client
+
     try:
         print(f"\n正在下载: {output_path.name}")
         print(f"URL: {url}")
 
-        # 发送请求
-        response = requests.get(url, stream=True, timeout=timeout)
-        response.raise_for_status()
-
-        # 获取文件大小
-        total_size = int(response.headers.get('content-length', 0))
-        downloaded = 0
-
-        # 写入文件
-        with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
-
-                    # 显示进度
-                    if total_size:
-                        percent = (downloaded / total_size) * 100
-                        mb_downloaded = downloaded / 1024 / 1024
-                        mb_total = total_size / 1024 / 1024
-                        print(f"\r进度: {percent:.1f}% ({mb_downloaded:.1f}/{mb_total:.1f} MB)", end='')
+        client = get_client()
+        client.download(url, output_path, timeout=(client.timeout[0], timeout))
 
         print(f"\n✅ 下载完成: {output_path.name}")
         return True
 
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 404:
+    except DownloadError as e:
+        if e.status_code == 404:
             print(f"\n⚠️  瓦片不存在 (404): {output_path.name}")
         else:
-            print(f"\n❌ HTTP错误 ({e.response.status_code}): {e}")
-        return False
-
-    except requests.exceptions.Timeout:
-        print(f"\n❌ 下载超时: {output_path.name}")
+            print(f"\n❌ 下载失败: {e}")
         return False
 
     except Exception as e:
@@ -295,4 +274,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
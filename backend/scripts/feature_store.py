@@ -0,0 +1,141 @@
+"""
+嵌入式要素库（SQLite + R*Tree）写入
+events/movements 等管线在输出GeoJSON的同时写入 data/geojson/campaign.sqlite，
+按日期排序插入并建立日期索引与R*Tree空间索引，
+API与分析脚本可以直接做时间/范围过滤查询，无需整文件载入内存，也无需数据库服务
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from datetime import date, datetime
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+STORE_FILE = DATA_DIR / "geojson" / "campaign.sqlite"
+
+# 表结构版本（src/services/feature_store.py 读取时校验）
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS features (
+    fid INTEGER PRIMARY KEY,
+    layer TEXT NOT NULL,
+    id TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    type TEXT,
+    feature TEXT NOT NULL,
+    UNIQUE (layer, id)
+);
+CREATE INDEX IF NOT EXISTS features_layer_date ON features (layer, start_date, end_date);
+CREATE VIRTUAL TABLE IF NOT EXISTS features_rtree USING rtree (
+    fid, min_lon, max_lon, min_lat, max_lat
+);
+"""
+
+
+def feature_bounds(geometry: dict) -> tuple | None:
+    """几何外包框 (min_lon, max_lon, min_lat, max_lat)；没有坐标或坐标缺失（None）时返回None"""
+    coords = geometry.get('coordinates')
+    # 逐层展开到 [lon, lat] 点列表
+    while coords and isinstance(coords[0], list) and coords[0] and isinstance(coords[0][0], list):
+        coords = [p for part in coords for p in part]
+    if coords and not isinstance(coords[0], list):
+        coords = [coords]
+    if not coords or any(len(p) < 2 or p[0] is None or p[1] is None for p in coords):
+        return None
+    lons = [p[0] for p in coords]
+    lats = [p[1] for p in coords]
+    return min(lons), max(lons), min(lats), max(lats)
+
+
+def feature_dates(props: dict) -> tuple:
+    """事件为单日（date），路线为区间（start_date/end_date）"""
+    start = props.get('start_date') or props.get('date')
+    end = props.get('end_date') or start
+    return start, end
+
+
+def feature_id(props: dict) -> str:
+    """要素唯一ID；多LOD的路线以 id@lod 区分"""
+    if 'lod' in props:
+        return f"{props['id']}@{props['lod']}"
+    return str(props['id'])
+
+
+def max_span_days(rows: list) -> int:
+    """图层内要素时间跨度的最大天数，读取端据此给 start_date 加下界，使日期查询只扫描索引的一小段"""
+    return max(((date.fromisoformat(end) - date.fromisoformat(start)).days
+                for _, start, end, *_ in rows), default=0)
+
+
+def write_layer(layer: str, features: list, store_file: Path = STORE_FILE) -> int:
+    """
+    写入（整体替换）一个图层
+
+    按开始日期排序插入，使同一时间段的行在文件中相邻（日期范围查询只需顺序读少量页）；
+    缺少日期或坐标（如尚未地理编码的事件）的要素不写入
+
+    Args:
+        layer: 图层名（events / movements / ...）
+        features: GeoJSON Feature列表
+        store_file: 数据库路径
+
+    Returns:
+        写入的要素数
+    """
+    rows = []
+    skipped = 0
+    for feature in features:
+        props = feature['properties']
+        start, end = feature_dates(props)
+        bounds = feature_bounds(feature['geometry']) if feature.get('geometry') else None
+        if not start or bounds is None:
+            skipped += 1
+            continue
+        rows.append((feature_id(props), start, end, props.get('type'),
+                     json.dumps(feature, ensure_ascii=False, separators=(',', ':')), bounds))
+    rows.sort(key=lambda r: (r[1], r[0]))
+
+    store_file.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(store_file)
+    try:
+        # WAL模式下API读连接不会被写入阻塞
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        with conn:
+            old = [fid for (fid,) in conn.execute("SELECT fid FROM features WHERE layer = ?", (layer,))]
+            conn.executemany("DELETE FROM features_rtree WHERE fid = ?", [(fid,) for fid in old])
+            conn.execute("DELETE FROM features WHERE layer = ?", (layer,))
+
+            # 预先分配fid，两张表都可以批量写入
+            base = conn.execute("SELECT COALESCE(MAX(fid), 0) + 1 FROM features").fetchone()[0]
+            conn.executemany(
+                "INSERT INTO features (fid, layer, id, start_date, end_date, type, feature) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(base + i, layer, key, start, end, ftype, text)
+                 for i, (key, start, end, ftype, text, _) in enumerate(rows)],
+            )
+            conn.executemany("INSERT INTO features_rtree VALUES (?, ?, ?, ?, ?)",
+                             [(base + i, *row[5]) for i, row in enumerate(rows)])
+
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                ("schema_version", str(SCHEMA_VERSION)),
+                ("generated_at", datetime.now().isoformat()),
+                (f"layer:{layer}:count", str(len(rows))),
+                (f"layer:{layer}:max_span_days", str(max_span_days(rows))),
+            ])
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+    print(f"✅ 要素库已更新: {store_file.name} [{layer}] {len(rows)} 个要素")
+    if skipped:
+        print(f"  ⚠️ 跳过 {skipped} 个缺少日期或坐标的要素")
+    return len(rows)
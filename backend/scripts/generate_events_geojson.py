@@ -3,6 +3,7 @@
 将 1812_campaign_timeline.json 转换为标准GeoJSON格式供前端使用
 """
 
+import sys
 import json
 from pathlib import Path
 from datetime import datetime
@@ -13,9 +14,6 @@ INPUT_FILE = DATA_DIR / "1812_campaign_timeline.json"
 OUTPUT_DIR = DATA_DIR / "geojson"
 OUTPUT_FILE = OUTPUT_DIR / "events.geojson"
 
-# 确保输出目录存在
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
 
 def load_timeline_data() -> dict:
     """加载时间线JSON数据"""
@@ -226,6 +224,7 @@ def save_geojson(geojson: dict, output_path: Path):
     """保存GeoJSON到文件"""
     print(f"\n保存GeoJSON: {output_path}")
 
+    output_path.parent.mkdir(parents=True, exist_ok=True)
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(geojson, f, ensure_ascii=False, indent=2)
 
@@ -364,6 +363,11 @@ def main():
         # 5. 统计
         print_statistics(geojson)
 
+        # 6. 嵌入式要素库（与GeoJSON同步更新）
+        # 兵力序列与行政区聚合是管线中独立的 troops / regions 步骤，这里不再重复生成
+        from feature_store import write_layer
+        write_layer("events", geojson['features'])
+
         print("\n" + "=" * 70)
         print("✅ 生成完成!")
         print("=" * 70)
@@ -376,11 +380,13 @@ def main():
     except FileNotFoundError:
         print(f"\n❌ 错误: 找不到输入文件 {INPUT_FILE}")
         print("请确保已运行数据收集脚本")
+        return 1
     except Exception as e:
         print(f"\n❌ 错误: {e}")
         import traceback
         traceback.print_exc()
+        return 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""
+行军路线GeoJSON生成脚本
+按日期顺序串联 1812_campaign_timeline.json 中的事件（可叠加航点文件），
+为每个阵营生成行军LineString，并预计算多级Douglas-Peucker简化（LOD）供flow map直接选用
+"""
+
+import sys
+import json
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+INPUT_FILE = DATA_DIR / "1812_campaign_timeline.json"
+WAYPOINTS_DIR = DATA_DIR / "waypoints"
+OUTPUT_DIR = DATA_DIR / "geojson"
+OUTPUT_FILE = OUTPUT_DIR / "movements.geojson"
+
+# LOD级别 → 简化容差（度，经度已按纬度余弦缩放）
+# 对应planA: 1=High-res(zoom>8) 2=Mid-res(5-8) 3=Low-res(<5)
+LOD_TOLERANCES = {
+    1: 0.0,
+    2: 0.05,
+    3: 0.25,
+}
+
+# participants中的键 → 阵营（联军归入奥地利军团）
+FACTION_ALIASES = {
+    "coalition": "austrian",
+}
+
+# 南翼行动（schwarzenberg_operations）是独立战区: 参与方按此映射成单独的路线，不并入主力路线
+FLANK_ROUTES = {
+    "austrian": "austrian",
+    "coalition": "austrian",
+    "russian": "russian_3rd_army",
+}
+
+
+def load_waypoints(waypoints_dir: Path = WAYPOINTS_DIR) -> list:
+    """
+    加载可选航点文件（waypoints/*.json）
+
+    每个文件为航点列表: [{"faction": "french", "date": "1812-07-01", "lat": .., "lon": .., "name": ..}, ...]
+    带 "unit"（部队id，可附 "troops"）的航点是部队级路点，只由 build_edge_bundles 按部队串成独立的行军边
+    """
+    waypoints = []
+    if not waypoints_dir.exists():
+        return waypoints
+
+    for path in sorted(waypoints_dir.glob("*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+        waypoints.extend(items)
+        print(f"  - 航点文件 {path.name}: {len(items)} 个")
+
+    return waypoints
+
+
+def collect_route_points(timeline_data: dict, waypoints: list = None) -> dict:
+    """
+    按阵营收集路线节点并按日期排序
+
+    Args:
+        timeline_data: 时间线数据
+        waypoints: 额外航点列表（带 "unit" 的部队级路点不并入阵营路线）
+
+    Returns:
+        {路线: [{"date", "lon", "lat", "event_id", "name"}, ...]}，连续重复位置已合并；
+        南翼行动的参与方按 FLANK_ROUTES 成为单独路线（如 russian_3rd_army）
+    """
+    events = [(event, FACTION_ALIASES) for event in timeline_data.get('events', [])]
+    events += [(event, FLANK_ROUTES)
+               for event in timeline_data.get('schwarzenberg_operations', {}).get('events', [])]
+
+    points = {}
+    order = 0
+    for event, aliases in events:
+        location = event.get('location', {})
+        if location.get('lon') is None or location.get('lat') is None:
+            continue
+        factions = {aliases.get(key, key) for key in event.get('participants', {})}
+        for faction in factions:
+            points.setdefault(faction, []).append({
+                "date": event.get('date'),
+                "lon": location['lon'],
+                "lat": location['lat'],
+                "event_id": event.get('id'),
+                "name": location.get('name'),
+                "_order": order,
+            })
+        order += 1
+
+    for waypoint in waypoints or []:
+        if waypoint.get('unit'):
+            continue
+        faction = FACTION_ALIASES.get(waypoint['faction'], waypoint['faction'])
+        points.setdefault(faction, []).append({
+            "date": waypoint['date'],
+            "lon": waypoint['lon'],
+            "lat": waypoint['lat'],
+            "event_id": None,
+            "name": waypoint.get('name'),
+            "_order": order,
+        })
+        order += 1
+
+    routes = {}
+    for faction, items in points.items():
+        items.sort(key=lambda p: (p['date'], p['_order']))
+        route = []
+        for item in items:
+            item.pop('_order')
+            if route and (route[-1]['lon'], route[-1]['lat']) == (item['lon'], item['lat']):
+                continue
+            route.append(item)
+        if len(route) >= 2:
+            routes[faction] = route
+
+    return routes
+
+
+def _segment_distances(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """批量计算点到线段ab的距离（退化线段时为点到a的距离）"""
+    ab = b - a
+    denom = float(ab @ ab)
+    if denom == 0.0:
+        return np.hypot(*(points - a).T)
+    t = np.clip(((points - a) @ ab) / denom, 0.0, 1.0)
+    nearest = a + t[:, None] * ab
+    return np.hypot(*(points - nearest).T)
+
+
+def douglas_peucker(coords: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas-Peucker简化（显式栈迭代，每个区间的距离计算向量化）
+
+    Args:
+        coords: (N, 2) 平面坐标
+        tolerance: 简化容差
+
+    Returns:
+        长度为N的布尔掩码，True表示保留该顶点
+    """
+    n = len(coords)
+    keep = np.zeros(n, dtype=bool)
+    if n < 3 or tolerance <= 0:
+        keep[:] = True
+        return keep
+
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        distances = _segment_distances(coords[start + 1:end], coords[start], coords[end])
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return keep
+
+
+def to_planar(lonlat: np.ndarray) -> np.ndarray:
+    """经度按平均纬度余弦缩放，使容差在东西/南北方向上近似等距"""
+    scale = np.cos(np.radians(lonlat[:, 1].mean()))
+    return np.column_stack([lonlat[:, 0] * scale, lonlat[:, 1]])
+
+
+def build_route_features(faction: str, route: list, lod_tolerances: dict = LOD_TOLERANCES) -> list:
+    """
+    为单个阵营生成各LOD级别的LineString Feature
+
+    Returns:
+        Feature列表（每个LOD一个）
+    """
+    lonlat = np.array([[p['lon'], p['lat']] for p in route], dtype=np.float64)
+    planar = to_planar(lonlat)
+
+    features = []
+    for lod, tolerance in sorted(lod_tolerances.items()):
+        keep = douglas_peucker(planar, tolerance)
+        kept = np.flatnonzero(keep)
+        features.append({
+            "type": "Feature",
+            "geometry": {
+                "type": "LineString",
+                "coordinates": lonlat[kept].tolist()
+            },
+            "properties": {
+                "id": f"route_{faction}_lod{lod}",
+                "faction": faction,
+                "lod": lod,
+                "tolerance": tolerance,
+                "vertex_count": int(len(kept)),
+                "source_vertex_count": len(route),
+                "start_date": route[0]['date'],
+                "end_date": route[-1]['date'],
+                "dates": [route[i]['date'] for i in kept],
+                "event_ids": [route[i]['event_id'] for i in kept],
+            }
+        })
+
+    return features
+
+
+def generate_movements_geojson(timeline_data: dict, waypoints: list = None,
+                               lod_tolerances: dict = LOD_TOLERANCES) -> dict:
+    """
+    生成完整的movements GeoJSON
+
+    Returns:
+        GeoJSON FeatureCollection（每个阵营 × 每个LOD一条LineString）
+    """
+    print("\n开始生成行军路线...")
+
+    routes = collect_route_points(timeline_data, waypoints)
+
+    features = []
+    vertex_counts = {lod: {} for lod in lod_tolerances}
+    for faction, route in sorted(routes.items()):
+        faction_features = build_route_features(faction, route, lod_tolerances)
+        features.extend(faction_features)
+        for feature in faction_features:
+            props = feature['properties']
+            vertex_counts[props['lod']][faction] = props['vertex_count']
+        counts = ", ".join(f"LOD{f['properties']['lod']}={f['properties']['vertex_count']}"
+                           for f in faction_features)
+        print(f"  - {faction}: {len(route)} 个节点 ({counts})")
+
+    geojson = {
+        "type": "FeatureCollection",
+        "metadata": {
+            "title": "Napoleon's 1812 Russian Campaign - Movements",
+            "title_zh": "1812年拿破仑东征俄罗斯 - 行军路线",
+            "campaign": timeline_data.get('campaign'),
+            "date_range": timeline_data.get('date_range'),
+            "generated_at": datetime.now().isoformat(),
+            "coordinate_system": "WGS84",
+            "lod_levels": {
+                str(lod): {
+                    "tolerance": tolerance,
+                    "vertex_counts": vertex_counts[lod]
+                }
+                for lod, tolerance in sorted(lod_tolerances.items())
+            },
+            "schema": {
+                "geometry": "LineString",
+                "properties": {
+                    "faction": "string - french|russian|austrian|russian_3rd_army (flank)",
+                    "lod": "number - 1(high)|2(mid)|3(low)",
+                    "tolerance": "number - Douglas-Peucker tolerance (degrees)",
+                    "vertex_count": "number - Vertices after simplification",
+                    "dates": "array - ISO8601 date per vertex",
+                    "event_ids": "array - Source event ID per vertex (null for waypoints)"
+                }
+            }
+        },
+        "features": features
+    }
+
+    print(f"✅ 生成完成: {len(routes)} 条路线, {len(features)} 个Feature")
+
+    return geojson
+
+
+def save_geojson(geojson: dict, output_path: Path):
+    """保存GeoJSON到文件"""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(geojson, f, ensure_ascii=False, indent=2)
+
+    file_size = output_path.stat().st_size / 1024  # KB
+    print(f"✅ 保存成功: {output_path.name} ({file_size:.1f} KB)")
+
+
+def main():
+    print("=" * 70)
+    print("Movements GeoJSON生成器")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+            timeline_data = json.load(f)
+
+        waypoints = load_waypoints()
+        geojson = generate_movements_geojson(timeline_data, waypoints)
+        save_geojson(geojson, OUTPUT_FILE)
+
+        from feature_store import write_layer
+        write_layer("movements", geojson['features'])
+
+    except FileNotFoundError:
+        print(f"\n❌ 错误: 找不到输入文件 {INPUT_FILE}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+逐日气温场预计算脚本
+把稀疏的气温读数（事件的 weather.temperature + 米纳德图的温度线）插值为 BBOX 范围内的逐日网格：
+先减去季节气候基线得到距平，再做向量化的时空反距离加权（IDW），
+并以"零距平"作为背景权重使远离读数（时间或空间上）的格点回落到基线，
+结果写为 (天, 行, 列) 的int16 .npy，每天是一个连续的块，可以内存映射后直接切片任意日期/范围
+"""
+
+import sys
+import csv
+import json
+import math
+from pathlib import Path
+from datetime import date, datetime
+
+import numpy as np
+
+from project import BBOX, KM_PER_DEGREE, SERIES_START, SERIES_END
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+INPUT_FILE = DATA_DIR / "1812_campaign_timeline.json"
+MINARD_FILE = DATA_DIR / "weather" / "minard_temperatures.csv"
+OUTPUT_DIR = DATA_DIR / "statistics"
+OUTPUT_FILE = OUTPUT_DIR / "temperature_field.json"
+FIELD_FILE = OUTPUT_DIR / "temperature_field.npy"
+
+# 网格分辨率（度）
+FIELD_RESOLUTION = 0.25
+
+# 存储: int16，单位0.1°C
+FIELD_SCALE = 0.1
+FIELD_NODATA = -32768
+
+# 季节气候基线（俄罗斯西部/白俄罗斯，°C）: 年均值 + 余弦年循环，峰值约在7月19日
+CLIMATE_MEAN = 5.0
+CLIMATE_AMPLITUDE = 12.0
+CLIMATE_PEAK_DOY = 200
+
+# 时空距离: 1天相当于多少公里；超过BACKGROUND_RANGE_KM后读数权重低于基线
+KM_PER_DAY = 30.0
+BACKGROUND_RANGE_KM = 300.0
+IDW_POWER = 2
+
+
+def reaumur_to_celsius(value: float) -> float:
+    """列氏度 → 摄氏度（米纳德图的温度线以列氏度标注，0°R = 0°C，80°R = 100°C）"""
+    return value * 1.25
+
+
+def climatology(days: np.ndarray) -> np.ndarray:
+    """年内第几天 → 基线气温（°C）"""
+    return CLIMATE_MEAN + CLIMATE_AMPLITUDE * np.cos(2 * np.pi * (days - CLIMATE_PEAK_DOY) / 365.0)
+
+
+def extract_readings(timeline_data: dict, minard_file: Path = MINARD_FILE) -> list:
+    """
+    收集气温读数: 时间线事件（含南翼行动）的 weather.temperature（°C）+ 米纳德温度线（°R，换算为°C）
+
+    Returns:
+        [{"date", "lon", "lat", "temperature", "source"}]，按日期排序
+    """
+    events = list(timeline_data.get('events', []))
+    events += timeline_data.get('schwarzenberg_operations', {}).get('events', [])
+
+    readings = []
+    for event in events:
+        temperature = (event.get('weather') or {}).get('temperature')
+        location = event.get('location') or {}
+        if temperature is None or location.get('lat') is None or not event.get('date'):
+            continue
+        readings.append({"date": event['date'], "lon": location['lon'], "lat": location['lat'],
+                         "temperature": float(temperature), "source": event.get('id', 'timeline')})
+
+    if minard_file.exists():
+        with open(minard_file, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                readings.append({"date": row['date'], "lon": float(row['lon']), "lat": float(row['lat']),
+                                 "temperature": reaumur_to_celsius(float(row['temperature_r'])),
+                                 "source": "minard"})
+
+    readings.sort(key=lambda r: r['date'])
+    return readings
+
+
+def grid_axes(bbox: dict = BBOX, resolution: float = FIELD_RESOLUTION) -> tuple:
+    """网格像元中心的经度/纬度（纬度自北向南，与栅格行序一致）"""
+    width = int(round((bbox['east'] - bbox['west']) / resolution))
+    height = int(round((bbox['north'] - bbox['south']) / resolution))
+    lons = bbox['west'] + (np.arange(width) + 0.5) * resolution
+    lats = bbox['north'] - (np.arange(height) + 0.5) * resolution
+    return lons, lats
+
+
+def interpolate_day(spatial_km2: np.ndarray, day_offsets: np.ndarray, anomalies: np.ndarray,
+                    day: int) -> np.ndarray:
+    """
+    单日距平场（向量化IDW）
+
+    Args:
+        spatial_km2: (格点数, 读数数) 空间距离平方（km²），全程复用
+        day_offsets: 各读数的日期（相对序列起点的天数）
+        anomalies: 各读数相对基线的距平
+        day: 目标日期（相对序列起点的天数）
+
+    Returns:
+        (格点数,) 距平
+    """
+    distance2 = spatial_km2 + ((day_offsets - day) * KM_PER_DAY) ** 2
+    weights = 1.0 / np.maximum(distance2, 1.0) ** (IDW_POWER / 2)
+    background = 1.0 / BACKGROUND_RANGE_KM ** IDW_POWER
+    return weights @ anomalies / (weights.sum(axis=1) + background)
+
+
+def build_temperature_field(timeline_data: dict, field_file: Path = FIELD_FILE,
+                            resolution: float = FIELD_RESOLUTION) -> dict:
+    """
+    构建逐日气温场，直接写入内存映射的 .npy（每天一块，不在内存中保留整个数组）
+
+    Args:
+        timeline_data: 时间线数据
+        field_file: 输出 .npy 路径
+        resolution: 网格分辨率（度）
+
+    Returns:
+        元数据字典（写为 temperature_field.json）
+    """
+    date_range = timeline_data.get('date_range', {})
+    start = date.fromisoformat(date_range.get('start', SERIES_START))
+    end = date.fromisoformat(date_range.get('end', SERIES_END))
+    length = (end - start).days + 1
+
+    readings = [r for r in extract_readings(timeline_data)
+                if BBOX['west'] <= r['lon'] <= BBOX['east'] and BBOX['south'] <= r['lat'] <= BBOX['north']]
+    print(f"\n生成逐日气温场: {length} 天, {len(readings)} 个读数, 分辨率 {resolution}°")
+
+    lons, lats = grid_axes(BBOX, resolution)
+    grid_lon, grid_lat = np.meshgrid(lons, lats)
+    grid_lon, grid_lat = grid_lon.ravel(), grid_lat.ravel()
+
+    start_doy = start.timetuple().tm_yday
+    baseline = climatology(start_doy + np.arange(length))
+
+    if readings:
+        r_lon = np.array([r['lon'] for r in readings])
+        r_lat = np.array([r['lat'] for r in readings])
+        day_offsets = np.array([(date.fromisoformat(r['date']) - start).days for r in readings], dtype=np.float64)
+        anomalies = np.array([r['temperature'] for r in readings]) - \
+            climatology(start_doy + day_offsets)
+        cos_lat = np.cos(np.radians((grid_lat[:, None] + r_lat[None, :]) / 2))
+        spatial_km2 = (((grid_lon[:, None] - r_lon[None, :]) * cos_lat) ** 2
+                       + (grid_lat[:, None] - r_lat[None, :]) ** 2) * KM_PER_DEGREE ** 2
+
+    field_file.parent.mkdir(parents=True, exist_ok=True)
+    values = np.lib.format.open_memmap(field_file, mode='w+', dtype=np.int16,
+                                       shape=(length, len(lats), len(lons)))
+    for day in range(length):
+        anomaly = interpolate_day(spatial_km2, day_offsets, anomalies, day) if readings else 0.0
+        celsius = baseline[day] + anomaly
+        values[day] = np.rint(celsius / FIELD_SCALE).astype(np.int16).reshape(len(lats), len(lons))
+    values.flush()
+    minimum, maximum = float(values.min()) * FIELD_SCALE, float(values.max()) * FIELD_SCALE
+    del values
+
+    print(f"  - 气温范围: {minimum:.1f} ~ {maximum:.1f} °C")
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "length": length,
+        "file": field_file.name,
+        "shape": [length, len(lats), len(lons)],
+        "dtype": "int16",
+        "scale": FIELD_SCALE,
+        "nodata": FIELD_NODATA,
+        "bounds": [BBOX['west'], BBOX['south'], BBOX['east'], BBOX['north']],
+        "resolution": resolution,
+        "parameters": {
+            "climate_mean": CLIMATE_MEAN,
+            "climate_amplitude": CLIMATE_AMPLITUDE,
+            "climate_peak_doy": CLIMATE_PEAK_DOY,
+            "km_per_day": KM_PER_DAY,
+            "background_range_km": BACKGROUND_RANGE_KM,
+            "idw_power": IDW_POWER,
+        },
+        "readings": readings,
+        "generated_at": datetime.now().isoformat(),
+    }
+
+
+def field_cell(metadata: dict, lon: float, lat: float) -> tuple:
+    """经纬度 → (行, 列)，范围外返回None"""
+    west, south, east, north = metadata['bounds']
+    if not (west <= lon < east and south < lat <= north):
+        return None
+    resolution = metadata['resolution']
+    return int(math.floor((north - lat) / resolution)), int(math.floor((lon - west) / resolution))
+
+
+def save_temperature_field(metadata: dict, output_path: Path = OUTPUT_FILE):
+    """保存元数据（紧凑JSON）"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, separators=(',', ':'))
+
+    field_size = (output_path.parent / metadata['file']).stat().st_size / 1024
+    print(f"✅ 气温场保存: {metadata['file']} ({field_size:.1f} KB), 元数据 {output_path.name}")
+
+
+def main():
+    print("=" * 70)
+    print("逐日气温场生成器")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+            timeline_data = json.load(f)
+
+        metadata = build_temperature_field(timeline_data)
+        save_temperature_field(metadata, OUTPUT_FILE)
+
+        # 自检: 读数所在格点的插值结果
+        values = np.load(FIELD_FILE, mmap_mode='r')
+        start = date.fromisoformat(metadata['start'])
+        for reading in metadata['readings']:
+            cell = field_cell(metadata, reading['lon'], reading['lat'])
+            day = (date.fromisoformat(reading['date']) - start).days
+            if cell is None or not 0 <= day < metadata['length']:
+                continue
+            value = values[day, cell[0], cell[1]] * FIELD_SCALE
+            print(f"  - {reading['date']} ({reading['source']}): 读数 {reading['temperature']:.1f} °C, "
+                  f"格点 {value:.1f} °C")
+
+    except FileNotFoundError as e:
+        print(f"\n❌ 错误: 找不到输入文件 {e.filename}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
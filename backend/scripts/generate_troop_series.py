@@ -0,0 +1,197 @@
+"""
+兵力时间序列预计算脚本
+从 1812_campaign_timeline.json 中提取各阵营稀疏的兵力数据（participants.*.troops），
+按天（或指定分辨率）插值为连续序列，供 /api/statistics/troops 与 Minard 图表直接切片使用
+"""
+
+import sys
+import json
+from pathlib import Path
+from datetime import date, timedelta
+
+import numpy as np
+
+from project import SERIES_START, SERIES_END
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+INPUT_FILE = DATA_DIR / "1812_campaign_timeline.json"
+OUTPUT_DIR = DATA_DIR / "statistics"
+OUTPUT_FILE = OUTPUT_DIR / "troops_daily.json"
+
+
+def extract_troop_samples(timeline_data: dict, include_flank: bool = False) -> dict:
+    """
+    提取各阵营的兵力采样点，并按日期排序
+
+    Args:
+        timeline_data: 时间线数据
+        include_flank: 是否包含Schwarzenberg南翼行动（独立战区，默认不计入主力序列）
+
+    Returns:
+        {阵营: {"dates": [ISO日期, ...], "troops": np.ndarray}}，同一天多条记录时取时间线中靠后的一条
+    """
+    events = list(timeline_data.get('events', []))
+    if include_flank:
+        events += timeline_data.get('schwarzenberg_operations', {}).get('events', [])
+
+    by_faction = {}
+    for event in events:
+        event_date = event.get('date')
+        if not event_date:
+            continue
+        for faction, info in event.get('participants', {}).items():
+            troops = info.get('troops') if isinstance(info, dict) else None
+            if troops is None:
+                continue
+            by_faction.setdefault(faction, {})[event_date] = troops
+
+    samples = {}
+    for faction, points in by_faction.items():
+        dates = sorted(points)
+        samples[faction] = {
+            "dates": dates,
+            "troops": np.array([points[d] for d in dates], dtype=np.int64)
+        }
+
+    return samples
+
+
+def interpolate_troop_series(samples: dict, start: str = SERIES_START, end: str = SERIES_END,
+                             resolution_days: int = 1) -> dict:
+    """
+    将稀疏采样点线性插值为等间隔时间序列
+
+    Args:
+        samples: extract_troop_samples 的结果
+        start: 序列起始日期
+        end: 序列结束日期（含）
+        resolution_days: 时间分辨率（天）
+
+    Returns:
+        {阵营: np.ndarray(int64)}，第 i 个值对应 start + i * resolution_days
+        首个采样点之前/最后采样点之后保持端点值
+    """
+    if resolution_days < 1:
+        raise ValueError("resolution_days 必须 >= 1")
+
+    start_date = date.fromisoformat(start)
+    total_days = (date.fromisoformat(end) - start_date).days
+    grid = np.arange(0, total_days + 1, resolution_days)
+
+    series = {}
+    for faction, sample in samples.items():
+        offsets = np.array([(date.fromisoformat(d) - start_date).days for d in sample['dates']])
+        values = np.interp(grid, offsets, sample['troops'])
+        series[faction] = np.rint(values).astype(np.int64)
+
+    return series
+
+
+def build_troop_series(timeline_data: dict, resolution_days: int = 1, include_flank: bool = False) -> dict:
+    """
+    构建兵力时间序列产物
+
+    Args:
+        timeline_data: 时间线数据
+        resolution_days: 时间分辨率（天）
+        include_flank: 是否包含南翼行动
+
+    Returns:
+        可直接序列化为JSON的产物字典
+    """
+    print(f"\n生成兵力时间序列 (分辨率 {resolution_days} 天)...")
+
+    date_range = timeline_data.get('date_range', {})
+    start = date_range.get('start', SERIES_START)
+    end = date_range.get('end', SERIES_END)
+
+    samples = extract_troop_samples(timeline_data, include_flank=include_flank)
+    series = interpolate_troop_series(samples, start, end, resolution_days)
+
+    factions = {}
+    for faction, sample in samples.items():
+        factions[faction] = {
+            "series": series[faction].tolist(),
+            "samples": {
+                "dates": sample['dates'],
+                "troops": sample['troops'].tolist()
+            },
+            "coverage": {
+                "start": sample['dates'][0],
+                "end": sample['dates'][-1]
+            }
+        }
+        print(f"  - {faction}: {len(sample['dates'])} 个采样点 → {len(series[faction])} 个值")
+
+    length = len(next(iter(series.values()))) if series else 0
+
+    return {
+        "start": start,
+        "end": end,
+        "resolution_days": resolution_days,
+        "length": length,
+        "include_flank": include_flank,
+        "factions": factions,
+    }
+
+
+def series_index(artifact: dict, day: str) -> int:
+    """
+    计算日期在序列中的下标（向下取整到分辨率，并裁剪到有效范围）
+
+    Args:
+        artifact: build_troop_series 的结果
+        day: ISO日期
+
+    Returns:
+        序列下标
+    """
+    offset = (date.fromisoformat(day) - date.fromisoformat(artifact['start'])).days
+    index = offset // artifact['resolution_days']
+    return max(0, min(index, artifact['length'] - 1))
+
+
+def series_dates(artifact: dict) -> list:
+    """返回序列每个值对应的ISO日期列表"""
+    start = date.fromisoformat(artifact['start'])
+    step = artifact['resolution_days']
+    return [(start + timedelta(days=i * step)).isoformat() for i in range(artifact['length'])]
+
+
+def save_troop_series(artifact: dict, output_path: Path = OUTPUT_FILE):
+    """保存兵力时间序列（紧凑JSON）"""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, ensure_ascii=False, separators=(',', ':'))
+
+    file_size = output_path.stat().st_size / 1024  # KB
+    print(f"✅ 兵力序列保存: {output_path.name} ({file_size:.1f} KB)")
+
+
+def main():
+    print("=" * 70)
+    print("兵力时间序列生成器")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+            timeline_data = json.load(f)
+
+        artifact = build_troop_series(timeline_data)
+        save_troop_series(artifact, OUTPUT_FILE)
+
+    except FileNotFoundError:
+        print(f"\n❌ 错误: 找不到输入文件 {INPUT_FILE}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,428 @@
+"""
+地理编码模块
+按 planA 的流程解析历史地名：
+1. 手动校正（historical_names.csv中带坐标的条目、时间线中人工录入的坐标）
+2. 本地地名库（ne_10m_populated_places + 历史别名，如 Kovno→Kaunas、Smoleńsk→Smolensk），
+   精确匹配失败时用三元组（trigram）索引做模糊匹配
+3. 远程服务（默认Nominatim，可替换）
+
+结果写入SQLite缓存（含未命中），批量编码数千个行军路点只需数秒，不受API限流影响
+"""
+
+import sys
+import csv
+import json
+import re
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+TIMELINE_FILE = DATA_DIR / "1812_campaign_timeline.json"
+HISTORICAL_NAMES_FILE = DATA_DIR / "gazetteer" / "historical_names.csv"
+PLACES_ZIP = DATA_DIR / "boundaries" / "ne_10m_populated_places.zip"
+CACHE_FILE = DATA_DIR / "cache" / "geocode.sqlite"
+
+# Natural Earth中可作为地名变体的字段
+NAME_COLUMNS = ["name", "nameascii", "namealt", "name_en", "name_de", "name_fr",
+                "name_pl", "name_ru", "name_zh", "ls_name"]
+
+# 模糊匹配阈值（SequenceMatcher相似度）与候选数
+FUZZY_THRESHOLD = 0.85
+FUZZY_CANDIDATES = 20
+
+# 地名库范围相对项目区域的外扩（度），覆盖普鲁士/波兰境内的出发地
+GAZETTEER_MARGIN = 5.0
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "napoleon-1812-visualization/1.0"
+
+
+@dataclass(frozen=True)
+class GeocodeResult:
+    """地理编码结果"""
+    name: str
+    lat: float
+    lon: float
+    source: str
+    score: float = 1.0
+
+
+def normalize(name: str) -> str:
+    """去变音符号、转小写、合并标点空白: 'Smoleńsk' → 'smolensk'"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_name = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"[\W_]+", " ", ascii_name.lower()).strip()
+
+
+def name_variants(name: str) -> list:
+    """
+    拆分带括号的地名: 'Kaunas (Kovno)' → ['Kaunas (Kovno)', 'Kaunas', 'Kovno']
+
+    'near ...' 之类的方位说明不作为变体
+    """
+    variants = [name]
+    match = re.match(r"^(.*?)\s*\((.*)\)\s*$", name)
+    if match:
+        variants.append(match.group(1))
+        inner = match.group(2)
+        if not re.match(r"^(near|between|nahe|pres)\b", inner, re.IGNORECASE):
+            variants.append(inner)
+    return variants
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Gazetteer:
+    """
+    内存地名库
+
+    精确匹配: 规范化名称 → 条目列表（按rank排序，rank越小越重要）
+    模糊匹配: 三元组倒排索引筛选候选，再用SequenceMatcher打分
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.keys = {}
+        self.index = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, name: str, lat: float, lon: float, variants=(), rank: float = 0, source: str = "gazetteer"):
+        entry_id = len(self.entries)
+        self.entries.append((name, float(lat), float(lon), rank, source))
+        for variant in {normalize(v) for v in (name, *variants) if v}:
+            if not variant:
+                continue
+            bucket = self.keys.setdefault(variant, [])
+            if not bucket:
+                for gram in trigrams(variant):
+                    self.index.setdefault(gram, []).append(variant)
+            bucket.append(entry_id)
+            bucket.sort(key=lambda i: self.entries[i][3])
+
+    def _result(self, entry_id: int, score: float = 1.0) -> GeocodeResult:
+        name, lat, lon, _, source = self.entries[entry_id]
+        return GeocodeResult(name, lat, lon, source, score)
+
+    def lookup(self, name: str) -> GeocodeResult | None:
+        """精确匹配（规范化后）"""
+        bucket = self.keys.get(normalize(name))
+        return self._result(bucket[0]) if bucket else None
+
+    def fuzzy(self, name: str, threshold: float = FUZZY_THRESHOLD) -> GeocodeResult | None:
+        """模糊匹配，返回相似度最高且不低于阈值的条目"""
+        key = normalize(name)
+        if not key:
+            return None
+
+        shared = {}
+        for gram in trigrams(key):
+            for candidate in self.index.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        candidates = sorted(shared, key=shared.get, reverse=True)[:FUZZY_CANDIDATES]
+
+        best, best_score = None, threshold
+        for candidate in candidates:
+            score = SequenceMatcher(None, key, candidate).ratio()
+            if score >= best_score:
+                best, best_score = candidate, score
+        return self._result(self.keys[best][0], round(best_score, 3)) if best else None
+
+    @classmethod
+    def from_natural_earth(cls, zip_path: Path = PLACES_ZIP, margin: float = GAZETTEER_MARGIN) -> "Gazetteer":
+        """由 ne_10m_populated_places.zip 构建（直接读zip，只保留项目区域周边）"""
+        from clip_natural_earth import project_bounds, read_zipped_layer
+
+        places = read_zipped_layer(zip_path, project_bounds(margin=margin), NAME_COLUMNS + ["scalerank"])
+        gazetteer = cls()
+        columns = [c for c in NAME_COLUMNS if c in places.columns]
+        for row in places.itertuples(index=False):
+            variants = []
+            for column in columns:
+                value = getattr(row, column)
+                if isinstance(value, str):
+                    # namealt 可能是 "A|B" 形式的多个别名
+                    variants.extend(v for v in value.split("|") if v)
+            gazetteer.add(variants[0] if variants else "", row.geometry.y, row.geometry.x,
+                          variants, rank=getattr(row, "scalerank", 0) or 0, source="natural_earth")
+        return gazetteer
+
+
+class GeocodeCache:
+    """SQLite结果缓存，未命中也会缓存（lat/lon为NULL），避免重复请求远程服务"""
+
+    def __init__(self, path: Path = CACHE_FILE):
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode (
+                query TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                name TEXT,
+                lat REAL,
+                lon REAL,
+                source TEXT,
+                score REAL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (query, year)
+            )
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def get_many(self, queries: list, year: int) -> dict:
+        """返回 {规范化查询: GeocodeResult 或 None}，缓存中不存在的查询不出现在结果里"""
+        found = {}
+        for i in range(0, len(queries), 500):
+            batch = queries[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT query, name, lat, lon, source, score FROM geocode "
+                f"WHERE year = ? AND query IN ({','.join('?' * len(batch))})",
+                [year, *batch],
+            )
+            for query, name, lat, lon, source, score in rows:
+                found[query] = GeocodeResult(name, lat, lon, source, score) if lat is not None else None
+        return found
+
+    def put_many(self, results: dict, year: int):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(query, year, r.name if r else None, r.lat if r else None, r.lon if r else None,
+                  r.source if r else None, r.score if r else None, now)
+                 for query, r in results.items()],
+            )
+
+
+class NominatimProvider:
+    """Nominatim远程查询（遵守1次/秒的使用政策），限定在项目区域附近"""
+
+    def __init__(self, url: str = NOMINATIM_URL, min_interval: float = 1.0, session=None):
+        import requests
+
+        self.url = url
+        self.min_interval = min_interval
+        self.session = session or requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        self._last_request = 0.0
+
+    def geocode(self, name: str) -> GeocodeResult | None:
+        from clip_natural_earth import project_bounds
+
+        wait = self._last_request + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_request = time.monotonic()
+
+        west, south, east, north = project_bounds(margin=GAZETTEER_MARGIN)
+        response = self.session.get(self.url, timeout=(10, 30), params={
+            "q": name, "format": "jsonv2", "limit": 1,
+            "viewbox": f"{west},{north},{east},{south}", "bounded": 1,
+        })
+        response.raise_for_status()
+        hits = response.json()
+        if not hits:
+            return None
+        hit = hits[0]
+        return GeocodeResult(hit.get("name") or name, float(hit["lat"]), float(hit["lon"]), "nominatim")
+
+
+def load_historical_names(csv_file: Path = HISTORICAL_NAMES_FILE) -> tuple:
+    """
+    读取历史地名映射表
+
+    Returns:
+        (别名 {规范化历史名: 现代名}, 手动校正 {规范化历史名: GeocodeResult})
+    """
+    aliases, manual = {}, {}
+    if not csv_file.exists():
+        return aliases, manual
+
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            key = normalize(row['historical'])
+            if row.get('lat') and row.get('lon'):
+                manual[key] = GeocodeResult(row['historical'], float(row['lat']), float(row['lon']), "manual")
+            elif row.get('modern'):
+                aliases[key] = row['modern']
+    return aliases, manual
+
+
+def timeline_locations(timeline_data: dict) -> dict:
+    """时间线中人工录入的坐标，作为手动校正 {规范化名称: GeocodeResult}"""
+    events = list(timeline_data.get('events', []))
+    events += timeline_data.get('schwarzenberg_operations', {}).get('events', [])
+
+    manual = {}
+    for event in events:
+        location = event.get('location', {})
+        if location.get('lat') is None or location.get('lon') is None:
+            continue
+        for variant in name_variants(location['name']):
+            manual.setdefault(normalize(variant), GeocodeResult(
+                location['name'], location['lat'], location['lon'], "timeline"))
+    return manual
+
+
+class Geocoder:
+    """
+    地理编码器: 手动校正 → 地名库精确匹配（含历史别名） → 模糊匹配 → 远程服务
+
+    Args:
+        gazetteer: 本地地名库
+        cache: 结果缓存（None则不缓存）
+        provider: 远程服务，需实现 geocode(name) -> GeocodeResult | None（None则不查询远程）
+        aliases: {规范化历史名: 现代名}
+        manual: {规范化名称: GeocodeResult}
+    """
+
+    def __init__(self, gazetteer: Gazetteer, cache: GeocodeCache | None = None, provider=None,
+                 aliases: dict | None = None, manual: dict | None = None):
+        self.gazetteer = gazetteer
+        self.cache = cache
+        self.provider = provider
+        self.aliases = aliases or {}
+        self.manual = manual or {}
+
+    def resolve_local(self, name: str) -> GeocodeResult | None:
+        """只使用本地数据解析（不查缓存、不访问远程）"""
+        for variant in name_variants(name):
+            key = normalize(variant)
+            if key in self.manual:
+                return self.manual[key]
+
+            result = self.gazetteer.lookup(self.aliases.get(key, variant))
+            if result:
+                return result
+
+        for variant in name_variants(name):
+            key = normalize(variant)
+            result = self.gazetteer.fuzzy(self.aliases.get(key, variant))
+            if result:
+                return result
+        return None
+
+    def geocode(self, name: str, year: int = 1812) -> GeocodeResult | None:
+        return self.geocode_many([name], year)[name]
+
+    def geocode_many(self, names: list, year: int = 1812) -> dict:
+        """
+        批量地理编码（去重、一次性查缓存、一次事务写缓存）
+
+        Args:
+            names: 地名列表
+            year: 年份（地名库为现代数据，年份只作为缓存键的一部分，便于日后接入分年代地名库）
+
+        Returns:
+            {地名: GeocodeResult 或 None}
+        """
+        queries = {name: normalize(name) for name in names}
+        unique = sorted(set(queries.values()))
+        resolved = self.cache.get_many(unique, year) if self.cache else {}
+
+        originals = {}
+        for name, query in queries.items():
+            originals.setdefault(query, name)
+
+        fresh = {}
+        for query in unique:
+            if query in resolved:
+                continue
+            name = originals[query]
+            result = self.resolve_local(name)
+            if result is None and self.provider is not None:
+                try:
+                    result = self.provider.geocode(name)
+                except Exception as e:
+                    # 远程失败不缓存，下次重试
+                    print(f"  ⚠️  远程查询失败 {name}: {e}")
+                    resolved[query] = None
+                    continue
+            fresh[query] = result
+
+        if self.cache and fresh:
+            self.cache.put_many(fresh, year)
+        resolved.update(fresh)
+        return {name: resolved[query] for name, query in queries.items()}
+
+
+_default_geocoder = None
+
+
+def get_geocoder() -> Geocoder:
+    """默认地理编码器: Natural Earth地名库 + 历史地名表 + 时间线坐标 + SQLite缓存 + Nominatim"""
+    global _default_geocoder
+    if _default_geocoder is None:
+        gazetteer = Gazetteer.from_natural_earth() if PLACES_ZIP.exists() else Gazetteer()
+        aliases, manual = load_historical_names()
+        if TIMELINE_FILE.exists():
+            with open(TIMELINE_FILE, 'r', encoding='utf-8') as f:
+                manual = {**timeline_locations(json.load(f)), **manual}
+        _default_geocoder = Geocoder(gazetteer, GeocodeCache(), NominatimProvider(), aliases, manual)
+    return _default_geocoder
+
+
+def geocode_place(name: str, year: int = 1812) -> tuple[float, float] | None:
+    """
+    解析地名坐标
+
+    Returns:
+        (lat, lon)，无法解析时返回None
+    """
+    result = get_geocoder().geocode(name, year)
+    return (result.lat, result.lon) if result else None
+
+
+def main():
+    print("=" * 70)
+    print("地理编码工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        with open(TIMELINE_FILE, 'r', encoding='utf-8') as f:
+            timeline_data = json.load(f)
+
+        if not PLACES_ZIP.exists():
+            print(f"\n⚠️  未找到 {PLACES_ZIP.name}，仅使用历史地名表与时间线坐标")
+
+        geocoder = get_geocoder()
+        print(f"\n地名库: {len(geocoder.gazetteer)} 个地点, {len(geocoder.aliases)} 个历史别名, "
+              f"{len(geocoder.manual)} 个手动校正")
+
+        names = sorted({e['location']['name'] for e in timeline_data.get('events', [])})
+        started = time.perf_counter()
+        results = geocoder.geocode_many(names)
+        elapsed = time.perf_counter() - started
+
+        print(f"\n解析 {len(names)} 个地名 ({elapsed * 1000:.1f} ms):")
+        for name, result in results.items():
+            if result:
+                print(f"  ✅ {name} → {result.name} ({result.lat:.4f}, {result.lon:.4f}) [{result.source}]")
+            else:
+                print(f"  ❌ {name}: 未找到")
+
+    except FileNotFoundError as e:
+        print(f"\n❌ 错误: 找不到输入文件 {e.filename}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
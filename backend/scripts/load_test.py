@@ -0,0 +1,365 @@
+"""
+本地压测脚本
+按真实会话轨迹回放请求（时间轴拖动、地形平移、等高线与瓦片加载、章节跳转），
+在多个并发级别下统计各端点的吞吐量与 p50/p95/p99 延迟，并对照planA的 <100ms 目标，
+让每次性能改动都有可比较的数字
+
+    python scripts/load_test.py                          # 自动启动本地后端（uvicorn子进程）
+    python scripts/load_test.py --url http://127.0.0.1:8000 --concurrency 1,16,64 --duration 20
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+
+from project import BBOX, SERIES_START, SERIES_END
+from raster_utils import tiles_covering
+
+# 文件路径
+BACKEND_DIR = Path(__file__).parent.parent
+DATA_DIR = BACKEND_DIR / "data"
+CHAPTERS_FILE = DATA_DIR / "chapters.json"
+REPORT_DIR = DATA_DIR / "cache" / "loadtest"
+
+# 默认压测参数
+DEFAULT_CONCURRENCY = (1, 8, 32)
+DEFAULT_DURATION = 10.0
+DEFAULT_WARMUP = 2.0
+REQUEST_TIMEOUT = 30.0
+
+# planA的响应时间目标（p95，毫秒）
+SLO_P95_MS = 100.0
+
+# 会话类型与抽样权重
+SESSION_WEIGHTS = {"scrub": 4, "pan": 3, "story": 1}
+
+# 地形平移: 视口跨度（度）、输出边长、瓦片层级
+PAN_SPAN = (1.0, 4.0)
+PAN_RESOLUTION = 256
+PAN_ZOOMS = (6, 7, 8)
+CONTOUR_INTERVAL = 100
+
+
+@dataclass(frozen=True)
+class Call:
+    """会话中的一次请求；endpoint为路由模板，用于汇总"""
+    endpoint: str
+    path: str
+
+
+@dataclass(frozen=True)
+class Sample:
+    """一次请求的结果（status为0表示连接失败/超时）"""
+    endpoint: str
+    status: int
+    seconds: float
+    size: int
+
+
+def scrub_session(rng: random.Random, steps: int = 30) -> list:
+    """
+    时间轴拖动: 从随机日期出发，以1~7天的步长来回拖动，
+    每步请求截至当前日期的可见集，并带一次增量查询
+    """
+    start, end = date.fromisoformat(SERIES_START), date.fromisoformat(SERIES_END)
+    length = (end - start).days
+    day = rng.randrange(length + 1)
+    direction = 1
+
+    calls = [Call("/api/events", "/api/events")]
+    for _ in range(steps):
+        if rng.random() < 0.2:
+            direction = -direction
+        previous = (start + timedelta(days=day)).isoformat()
+        day = min(max(day + direction * rng.randint(1, 7), 0), length)
+        current = (start + timedelta(days=day)).isoformat()
+        calls.append(Call("/api/events", f"/api/events?start={SERIES_START}&end={current}"))
+        calls.append(Call("/api/events/delta", f"/api/events/delta?from={previous}&to={current}"))
+    return calls
+
+
+def pan_session(rng: random.Random, steps: int = 12) -> list:
+    """
+    地形平移: 视口在项目范围内随机游走，每步请求bbox高程图与视口内的事件/等高线矢量瓦片，
+    会话开始时加载一次整份等高线GeoJSON
+    """
+    span = rng.uniform(*PAN_SPAN)
+    zoom = rng.choice(PAN_ZOOMS)
+    lon = rng.uniform(BBOX['west'] + span / 2, BBOX['east'] - span / 2)
+    lat = rng.uniform(BBOX['south'] + span / 4, BBOX['north'] - span / 4)
+
+    calls = [Call("/api/terrain/contours", f"/api/terrain/contours?interval={CONTOUR_INTERVAL}")]
+    for _ in range(steps):
+        lon = min(max(lon + rng.uniform(-0.3, 0.3) * span, BBOX['west'] + span / 2), BBOX['east'] - span / 2)
+        lat = min(max(lat + rng.uniform(-0.15, 0.15) * span, BBOX['south'] + span / 4), BBOX['north'] - span / 4)
+        bounds = (lon - span / 2, lat - span / 4, lon + span / 2, lat + span / 4)
+
+        bbox = ",".join(f"{v:.3f}" for v in bounds)
+        calls.append(Call("/api/terrain/dem", f"/api/terrain/dem?bbox={bbox}&resolution={PAN_RESOLUTION}"))
+        for x, y in tiles_covering(bounds, zoom):
+            calls.append(Call("/tiles/{layer}/{z}/{x}/{y}.mvt", f"/tiles/events/{zoom}/{x}/{y}.mvt"))
+            calls.append(Call("/tiles/{layer}/{z}/{x}/{y}.mvt", f"/tiles/contours/{zoom}/{x}/{y}.mvt"))
+    return calls
+
+
+@lru_cache(maxsize=None)
+def load_chapter_ids(chapters_file: Path = CHAPTERS_FILE) -> tuple:
+    """chapters.json 中的章节id（按order），与 /api/events/keyframes 的快照一一对应"""
+    with open(chapters_file, 'r', encoding='utf-8') as f:
+        chapters = json.load(f)['chapters']
+    return tuple(c['id'] for c in sorted(chapters, key=lambda c: c.get('order', 0)))
+
+
+def story_session(rng: random.Random, chapters: int = 4, chapter_ids: tuple | None = None) -> list:
+    """章节跳转: 读取关键帧列表后从随机章节起依次打开若干章节，并刷新兵力统计与行军路线"""
+    chapter_ids = chapter_ids or load_chapter_ids()
+    calls = [Call("/api/events/keyframes", "/api/events/keyframes"),
+             Call("/api/movements", "/api/movements")]
+    first = rng.randrange(len(chapter_ids))
+    for chapter_id in chapter_ids[first:first + chapters]:
+        calls.append(Call("/api/events/keyframes/{chapter_id}", f"/api/events/keyframes/{chapter_id}"))
+        calls.append(Call("/api/statistics/troops", "/api/statistics/troops"))
+    return calls
+
+
+SESSIONS = {"scrub": scrub_session, "pan": pan_session, "story": story_session}
+
+
+async def virtual_user(client, rng: random.Random, deadline: float, samples: list,
+                       revalidate: bool = True):
+    """
+    一个虚拟用户: 按权重抽取会话并顺序回放，直到截止时间
+
+    revalidate时像浏览器一样记住ETag，再次请求同一URL时带 If-None-Match
+    """
+    import httpx
+
+    names = list(SESSION_WEIGHTS)
+    weights = [SESSION_WEIGHTS[name] for name in names]
+    etags = {}
+    while time.perf_counter() < deadline:
+        for call in SESSIONS[rng.choices(names, weights)[0]](rng):
+            if time.perf_counter() >= deadline:
+                return
+            headers = {"If-None-Match": etags[call.path]} if revalidate and call.path in etags else {}
+            started = time.perf_counter()
+            try:
+                response = await client.get(call.path, headers=headers)
+                status, size = response.status_code, len(response.content)
+                if revalidate and "etag" in response.headers:
+                    etags[call.path] = response.headers["etag"]
+            except httpx.HTTPError:
+                status, size = 0, 0
+            samples.append(Sample(call.endpoint, status, time.perf_counter() - started, size))
+
+
+async def run_level(client, concurrency: int, duration: float, seed: int = 0,
+                    revalidate: bool = True) -> dict:
+    """以给定并发回放 duration 秒，返回汇总结果"""
+    samples = []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(virtual_user(client, random.Random(seed * 1000 + i), deadline, samples, revalidate)
+                           for i in range(concurrency)))
+    summary = summarize(samples, time.perf_counter() - started)
+    summary["concurrency"] = concurrency
+    return summary
+
+
+def latency_stats(seconds: list, elapsed: float) -> dict:
+    values = np.array(seconds) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) if values.size else (0.0, 0.0, 0.0)
+    return {
+        "requests": int(values.size),
+        "rps": round(values.size / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(values.max()), 2) if values.size else 0.0,
+    }
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    """
+    按端点汇总（错误 = 连接失败或状态码 >= 400，不计入延迟分位数）
+
+    Returns:
+        {"elapsed", "total", "endpoints": {endpoint: {requests, rps, p50_ms, ..., errors, not_modified, bytes}}}
+    """
+    grouped = {}
+    for sample in samples:
+        grouped.setdefault(sample.endpoint, []).append(sample)
+
+    def stats(group: list) -> dict:
+        ok = [s for s in group if 0 < s.status < 400]
+        result = latency_stats([s.seconds for s in ok], elapsed)
+        result["errors"] = len(group) - len(ok)
+        result["not_modified"] = sum(1 for s in ok if s.status == 304)
+        result["bytes"] = sum(s.size for s in group)
+        return result
+
+    return {
+        "elapsed": round(elapsed, 3),
+        "total": stats(samples),
+        "endpoints": {endpoint: stats(group) for endpoint, group in sorted(grouped.items())},
+    }
+
+
+def print_report(summary: dict, slo_ms: float = SLO_P95_MS):
+    """打印单个并发级别的结果表"""
+    print(f"\n并发 {summary['concurrency']}: {summary['total']['requests']} 个成功请求, "
+          f"{summary['total']['rps']:.1f} req/s, 用时 {summary['elapsed']:.1f} s")
+    print(f"  {'端点':36s} {'请求':>7s} {'req/s':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'304':>6s} {'错误':>5s}")
+    rows = list(summary['endpoints'].items()) + [("(全部)", summary['total'])]
+    for endpoint, s in rows:
+        if s['requests'] == 0:
+            mark = "❌"
+        elif s['errors'] or s['p95_ms'] > slo_ms:
+            mark = "⚠️ "
+        else:
+            mark = "✅"
+        print(f"{mark} {endpoint:36s} {s['requests']:7d} {s['rps']:8.1f} {s['p50_ms']:7.1f}ms "
+              f"{s['p95_ms']:7.1f}ms {s['p99_ms']:7.1f}ms {s['not_modified']:6d} {s['errors']:5d}")
+
+
+async def run_load_test(url: str, levels: list, duration: float, warmup: float = DEFAULT_WARMUP,
+                        seed: int = 0, revalidate: bool = True) -> list:
+    """依次运行各并发级别（每个级别前先以单用户预热，预热结果不计入）"""
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=url, timeout=REQUEST_TIMEOUT, limits=limits) as client:
+        if warmup > 0:
+            await run_level(client, 1, warmup, seed=seed - 1, revalidate=revalidate)
+        results = []
+        for concurrency in levels:
+            summary = await run_level(client, concurrency, duration, seed=seed, revalidate=revalidate)
+            print_report(summary)
+            results.append(summary)
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def local_server(port: int | None = None, workers: int = 1, data_dir: str | None = None,
+                 startup_timeout: float = 60.0):
+    """
+    在子进程中启动 uvicorn src.main:app，就绪（/metrics 返回200）后交出URL，退出时终止进程
+    """
+    import httpx
+
+    port = port or free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ)
+    if data_dir:
+        env["NAPOLEON_DATA_DIR"] = data_dir
+    command = [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    print(f"\n启动本地后端: {url} (workers={workers})")
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    try:
+        deadline = time.perf_counter() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"后端进程已退出（返回码 {process.returncode}）")
+            try:
+                if httpx.get(f"{url}/metrics", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"后端 {startup_timeout:.0f} 秒内未就绪")
+            time.sleep(0.2)
+        print("✅ 后端已就绪")
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def save_report(results: list, parameters: dict, output_path: Path) -> Path:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    report = {"parameters": parameters, "slo_p95_ms": SLO_P95_MS, "levels": results,
+              "generated_at": datetime.now().isoformat()}
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 报告已保存: {output_path}")
+    return output_path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="按会话轨迹回放请求的本地压测")
+    parser.add_argument("--url", help="已运行后端的地址；省略时自动启动本地后端")
+    parser.add_argument("--concurrency", default=",".join(str(c) for c in DEFAULT_CONCURRENCY),
+                        help="并发级别，逗号分隔（默认 %(default)s）")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="每个级别的时长（秒）")
+    parser.add_argument("--warmup", type=float, default=DEFAULT_WARMUP, help="预热时长（秒）")
+    parser.add_argument("--seed", type=int, default=0, help="会话轨迹随机种子")
+    parser.add_argument("--workers", type=int, default=1, help="自动启动时的uvicorn worker数")
+    parser.add_argument("--data-dir", help="自动启动时的数据目录（NAPOLEON_DATA_DIR）")
+    parser.add_argument("--no-revalidate", action="store_true", help="不发送If-None-Match（模拟禁用缓存）")
+    parser.add_argument("--output", type=Path, help="JSON报告路径（默认 data/cache/loadtest/）")
+    return parser.parse_args()
+
+
+def main():
+    print("=" * 70)
+    print("本地压测工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    args = parse_args()
+    try:
+        levels = [int(v) for v in args.concurrency.split(",") if v.strip()]
+        if not levels or min(levels) < 1:
+            print(f"\n❌ 并发级别无效: {args.concurrency}")
+            return 1
+
+        parameters = {"concurrency": levels, "duration": args.duration, "warmup": args.warmup,
+                      "seed": args.seed, "revalidate": not args.no_revalidate,
+                      "sessions": SESSION_WEIGHTS, "workers": args.workers}
+
+        def run(url: str) -> list:
+            parameters["url"] = url
+            return asyncio.run(run_load_test(url, levels, args.duration, args.warmup, args.seed,
+                                             not args.no_revalidate))
+
+        if args.url:
+            results = run(args.url)
+        else:
+            with local_server(workers=args.workers, data_dir=args.data_dir) as url:
+                results = run(url)
+
+        output = args.output or REPORT_DIR / f"report_{datetime.now():%Y%m%d_%H%M%S}.json"
+        save_report(results, parameters, output)
+
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+历史地图与配图批量优化脚本
+为 historical_maps/ 下的原图并行生成多宽度（srcset）WebP/AVIF版本（不超过1920x1080），
+按内容哈希跳过未变化的图片，并输出字节节省报告；
+变体按原图相对 historical_maps/ 的路径存放，同名不同目录/不同扩展名的原图互不覆盖
+"""
+
+import sys
+import json
+import hashlib
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+SOURCE_DIR = DATA_DIR / "historical_maps"
+OUTPUT_DIR = DATA_DIR / "images"
+CACHE_FILE = OUTPUT_DIR / ".cache.json"
+MANIFEST_FILE = OUTPUT_DIR / "manifest.json"
+REPORT_FILE = OUTPUT_DIR / "report.json"
+
+SOURCE_SUFFIXES = {".png", ".jpg", ".jpeg", ".tif", ".tiff"}
+
+# srcset宽度（不放大超过原图宽度）与变体最大尺寸（planA: 1920x1080）
+WIDTHS = [480, 960, 1440, 1920]
+MAX_SIZE = (1920, 1080)
+
+# 输出格式 → PIL保存参数
+FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 6},
+    "avif": {"format": "AVIF", "quality": 60},
+}
+
+
+def find_sources(source_dir: Path = SOURCE_DIR) -> list:
+    """查找所有原图（忽略Windows的Zone.Identifier等附属文件）"""
+    return sorted(p for p in source_dir.rglob("*") if p.is_file() and p.suffix.lower() in SOURCE_SUFFIXES)
+
+
+def source_key(source: Path, widths: list, formats: dict, max_size: tuple = MAX_SIZE) -> str:
+    """原图内容 + 输出参数的哈希，任一变化都会触发重新生成"""
+    digest = hashlib.sha256(source.read_bytes())
+    digest.update(json.dumps([widths, list(max_size), formats], sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def target_sizes(width: int, height: int, widths: list, max_size: tuple = MAX_SIZE) -> list:
+    """
+    变体尺寸 [(宽, 高)]: 原图按比例缩放到 max_size 以内（不放大）作为最大一档，
+    WIDTHS 中更窄的宽度作为其余各档
+    """
+    scale = min(1.0, max_size[0] / width, max_size[1] / height)
+    largest = max(1, int(width * scale))
+    selected = [w for w in widths if w < largest] + [largest]
+    return [(w, max(1, round(height * w / width))) for w in selected]
+
+
+def output_subdir(source: Path, source_dir: Path = SOURCE_DIR) -> Path:
+    """变体子目录: 原图相对源目录的路径，扩展名并入目录名（story/Minard.jpg → story/Minard_jpg）"""
+    rel = source.relative_to(source_dir) if source.is_relative_to(source_dir) else Path(source.name)
+    return rel.parent / f"{rel.stem}_{rel.suffix.lstrip('.').lower()}"
+
+
+def process_image(source: str, output_dir: str, subdir: str, widths: list, formats: dict,
+                  max_size: tuple = MAX_SIZE) -> dict:
+    """
+    生成单张原图的全部变体（在子进程中运行）
+
+    Returns:
+        {"source", "original_bytes", "variants": {格式: [{"width", "height", "url", "bytes"}]}}
+    """
+    from PIL import Image
+
+    source_path = Path(source)
+    out_dir = Path(output_dir) / subdir
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    variants = {fmt: [] for fmt in formats}
+    with Image.open(source_path) as original:
+        original = original.convert("RGB")
+        for width, height in target_sizes(original.width, original.height, widths, max_size):
+            resized = original if width == original.width else original.resize(
+                (width, height), Image.Resampling.LANCZOS)
+            for fmt, options in formats.items():
+                output = out_dir / f"{source_path.stem}-{width}.{fmt}"
+                resized.save(output, **options)
+                variants[fmt].append({
+                    "width": width,
+                    "height": height,
+                    "url": output.relative_to(output_dir).as_posix(),
+                    "bytes": output.stat().st_size,
+                })
+
+    return {
+        "source": source,
+        "original_bytes": source_path.stat().st_size,
+        "variants": variants,
+    }
+
+
+def load_cache(cache_file: Path = CACHE_FILE) -> dict:
+    if cache_file.exists():
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def outputs_exist(entry: dict, output_dir: Path) -> bool:
+    return all((output_dir / v['url']).exists()
+               for variants in entry['variants'].values() for v in variants)
+
+
+def optimize_images(sources: list, output_dir: Path = OUTPUT_DIR, widths: list = WIDTHS,
+                    formats: dict = FORMATS, workers: int | None = None, source_dir: Path = SOURCE_DIR,
+                    max_size: tuple = MAX_SIZE) -> dict:
+    """
+    并行优化全部图片
+
+    Args:
+        sources: 原图路径列表
+        output_dir: 输出目录
+        widths: srcset宽度
+        formats: 输出格式
+        workers: 进程数（默认CPU核数）
+        source_dir: 原图根目录（决定变体子目录）
+        max_size: 变体最大 (宽, 高)
+
+    Returns:
+        报告字典
+    """
+    from PIL import features
+
+    formats = {fmt: opts for fmt, opts in formats.items() if features.check(fmt)}
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cache_file = output_dir / CACHE_FILE.name
+    cache = load_cache(cache_file)
+
+    results = {}
+    pending = {}
+    for source in sources:
+        rel = source.relative_to(DATA_DIR).as_posix() if source.is_relative_to(DATA_DIR) else str(source)
+        key = source_key(source, widths, formats, max_size)
+        cached = cache.get(rel)
+        if cached and cached['key'] == key and outputs_exist(cached['result'], output_dir):
+            results[rel] = cached['result']
+            print(f"  ⏭️  未变化，跳过: {source.name}")
+        else:
+            pending[rel] = (source, key)
+
+    if pending:
+        print(f"处理 {len(pending)} 张图片 (格式: {', '.join(formats)})...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {rel: pool.submit(process_image, str(src), str(output_dir),
+                                        output_subdir(src, source_dir).as_posix(), widths, formats, max_size)
+                       for rel, (src, _) in pending.items()}
+            for rel, future in futures.items():
+                result = future.result()
+                result['source'] = rel
+                results[rel] = result
+                cache[rel] = {"key": pending[rel][1], "result": result}
+                print(f"  ✅ {Path(rel).name}")
+
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
+    manifest = {rel: result['variants'] for rel, result in sorted(results.items())}
+    with open(output_dir / MANIFEST_FILE.name, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    report = build_report(results, skipped=len(results) - len(pending))
+    with open(output_dir / REPORT_FILE.name, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    return report
+
+
+def build_report(results: dict, skipped: int = 0) -> dict:
+    """统计每张图片的字节节省（以最大宽度变体与原图比较）"""
+    images = []
+    for rel, result in sorted(results.items()):
+        original = result['original_bytes']
+        largest = {fmt: max(variants, key=lambda v: v['width'])
+                   for fmt, variants in result['variants'].items() if variants}
+        images.append({
+            "source": rel,
+            "original_bytes": original,
+            "largest_variant_bytes": {fmt: v['bytes'] for fmt, v in largest.items()},
+            "savings_percent": {fmt: round((1 - v['bytes'] / original) * 100, 1)
+                                for fmt, v in largest.items()},
+        })
+
+    total_original = sum(i['original_bytes'] for i in images)
+    formats = sorted({fmt for i in images for fmt in i['largest_variant_bytes']})
+    totals = {fmt: sum(i['largest_variant_bytes'].get(fmt, 0) for i in images) for fmt in formats}
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "images": images,
+        "skipped_unchanged": skipped,
+        "total_original_bytes": total_original,
+        "total_largest_variant_bytes": totals,
+        "total_savings_percent": {fmt: round((1 - b / total_original) * 100, 1) if total_original else 0.0
+                                  for fmt, b in totals.items()},
+    }
+
+
+def print_report(report: dict):
+    """打印节省统计"""
+    print("\n" + "=" * 70)
+    print("字节节省报告（最大宽度变体 vs 原图）")
+    print("=" * 70)
+    for image in report['images']:
+        savings = ", ".join(f"{fmt}: {pct}%" for fmt, pct in image['savings_percent'].items())
+        print(f"  - {Path(image['source']).name}: {image['original_bytes'] / 1024:.0f} KB → {savings}")
+    print(f"\n原图合计: {report['total_original_bytes'] / 1024 / 1024:.2f} MB")
+    for fmt, pct in report['total_savings_percent'].items():
+        size_mb = report['total_largest_variant_bytes'][fmt] / 1024 / 1024
+        print(f"{fmt}: {size_mb:.2f} MB (节省 {pct}%)")
+
+
+def main():
+    print("=" * 70)
+    print("历史地图/配图批量优化工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    sources = find_sources()
+    if not sources:
+        print(f"\n⚠️  未找到图片: {SOURCE_DIR}")
+        return
+
+    print(f"\n找到 {len(sources)} 张原图")
+    report = optimize_images(sources)
+    print_report(report)
+    print(f"\n输出目录: {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
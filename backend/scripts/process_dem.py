@@ -11,30 +11,20 @@ DEM数据处理脚本
 6. 投影转换（可选）
 """
 
+import sys
 import os
 import subprocess
 from pathlib import Path
 import json
 
+from project import BBOX
+
 # 路径配置
 DATA_DIR = Path(__file__).parent.parent / "data"
 DEM_INPUT_DIR = DATA_DIR / "dem" / "jaxa_aw3d30"
 DEM_OUTPUT_DIR = DATA_DIR / "dem" / "processed"
 GEOJSON_DIR = DATA_DIR / "geojson"
 
-# 创建输出目录
-DEM_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-GEOJSON_DIR.mkdir(parents=True, exist_ok=True)
-
-# 项目区域边界（WGS84）
-# 北纬50-60°，东经20-45°
-BBOX = {
-    "west": 20,
-    "south": 50,
-    "east": 45,
-    "north": 60
-}
-
 # 关键事件位置（用于局部高精度处理）
 KEY_LOCATIONS = [
     {"name": "Moscow", "lat": 55.7558, "lon": 37.6173},
@@ -144,6 +134,29 @@ def crop_dem(input_file, output_file, bbox):
         return False
 
 
+def build_overviews(dem_file, levels=(2, 4, 8, 16, 32)):
+    """构建overview金字塔（API按bbox降采样读取时直接使用，避免读取全分辨率数据）"""
+    print("\n步骤2.1: 构建overview金字塔...")
+
+    cmd = [
+        "gdaladdo",
+        "-r", "average",
+        "--config", "COMPRESS_OVERVIEW", "LZW",
+        str(dem_file),
+    ] + [str(level) for level in levels]
+
+    print(f"执行命令: gdaladdo -r average {dem_file.name} {' '.join(str(l) for l in levels)}")
+
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+        print("✅ Overview构建完成")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"⚠️  构建overview失败: {e}")
+        print(e.stderr.decode() if e.stderr else "")
+        return False
+
+
 def generate_contours(dem_file, output_geojson, interval=100):
     """生成等高线"""
     print(f"\n步骤3: 生成等高线 (间隔{interval}m)...")
@@ -343,13 +356,13 @@ def main():
     dem_files = find_dem_files()
     if not dem_files:
         print("\n❌ 未找到DEM文件，退出")
-        return
+        return 1
 
     print("\n" + "=" * 70)
     print("处理流程")
     print("=" * 70)
     print("1. 创建虚拟栅格 (VRT) - 合并所有瓦片")
-    print("2. 裁剪到项目区域")
+    print("2. 裁剪到项目区域（并构建overview）")
     print("3. 生成等高线 GeoJSON")
     print("4. 生成hillshade")
     print("5. 生成heightmap PNG (3D渲染用)")
@@ -367,6 +380,10 @@ def main():
     print("开始处理...")
     print("=" * 70)
 
+    # 创建输出目录
+    DEM_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    GEOJSON_DIR.mkdir(parents=True, exist_ok=True)
+
     # 定义输出文件
     vrt_file = DEM_OUTPUT_DIR / "merged_dem.vrt"
     cropped_dem = DEM_OUTPUT_DIR / "merged_dem_cropped.tif"
@@ -382,13 +399,15 @@ def main():
         success_count += 1
     else:
         print("\n❌ VRT创建失败，无法继续")
-        return
+        return 1
 
     if crop_dem(vrt_file, cropped_dem, BBOX):
         success_count += 1
     else:
-        print("\n⚠️  裁剪失败，跳过后续步骤")
-        return
+        print("\n❌ 裁剪失败，跳过后续步骤")
+        return 1
+
+    build_overviews(cropped_dem)
 
     # 后续步骤使用裁剪后的DEM
     if generate_contours(cropped_dem, contours_file, interval=100):
@@ -432,4 +451,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
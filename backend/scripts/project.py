@@ -0,0 +1,15 @@
+"""
+项目共享常量
+项目区域与时间序列范围只在这里定义，各管线脚本从本模块导入，
+不必为一个常量去导入另一个脚本（连带加载它的依赖）
+"""
+
+# 项目区域边界（WGS84）: 北纬50-60°，东经20-45°
+BBOX = {"west": 20, "south": 50, "east": 45, "north": 60}
+
+# 时间序列范围（与时间线 date_range 一致）
+SERIES_START = "1812-06-24"
+SERIES_END = "1812-12-14"
+
+# 每纬度（及赤道上每经度）的公里数
+KM_PER_DEGREE = 111.32
@@ -0,0 +1,91 @@
+"""
+栅格/瓦片共享工具
+XYZ瓦片（Web Mercator）坐标换算与FFT高斯模糊，供 build_deepzoom / build_heatmaps /
+build_edge_bundles / load_test 等脚本共用；
+大圆距离与双线性采样转出 src/utils/geo.py（与API服务同一份实现）
+"""
+
+import sys
+import math
+from pathlib import Path
+
+import numpy as np
+
+# 直接运行 scripts/ 下的脚本时 backend/ 不在 sys.path 上
+BACKEND_DIR = Path(__file__).parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.append(str(BACKEND_DIR))
+
+from src.utils.geo import EARTH_RADIUS_KM, bilinear_sample, haversine_km  # noqa: E402
+
+WEB_MERCATOR_HALF = 20037508.342789244
+
+# Web Mercator 的纬度上限
+MAX_LATITUDE = 85.0511
+
+
+def tile_bounds_3857(z: int, x: int, y: int) -> tuple:
+    """XYZ瓦片的Web Mercator范围 (left, bottom, right, top)"""
+    size = 2 * WEB_MERCATOR_HALF / 2 ** z
+    left = -WEB_MERCATOR_HALF + x * size
+    top = WEB_MERCATOR_HALF - y * size
+    return left, top - size, left + size, top
+
+
+def tiles_covering(bounds_lonlat: tuple, z: int) -> list:
+    """覆盖经纬度范围的全部XYZ瓦片"""
+    west, south, east, north = bounds_lonlat
+    n = 2 ** z
+
+    def to_tile(lon, lat):
+        lat_rad = math.radians(max(min(lat, MAX_LATITUDE), -MAX_LATITUDE))
+        tx = int((lon + 180.0) / 360.0 * n)
+        ty = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+        return min(max(tx, 0), n - 1), min(max(ty, 0), n - 1)
+
+    x0, y0 = to_tile(west, north)
+    x1, y1 = to_tile(east, south)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def world_pixels(lons: np.ndarray, lats: np.ndarray, z: int, tile_size: int = 256) -> tuple:
+    """经纬度 → 该级别的全球像素坐标"""
+    scale = tile_size * 2 ** z
+    x = (lons + 180.0) / 360.0 * scale
+    y = (1.0 - np.arcsinh(np.tan(np.radians(lats))) / np.pi) / 2.0 * scale
+    return x, y
+
+
+def gaussian_kernel(sigma: float) -> np.ndarray:
+    """归一化的一维高斯核（半径3σ）"""
+    radius = int(math.ceil(3 * sigma))
+    offsets = np.arange(-radius, radius + 1)
+    kernel = np.exp(-offsets ** 2 / (2 * sigma ** 2))
+    return kernel / kernel.sum()
+
+
+def gaussian_blur(grid: np.ndarray, sigma: float) -> np.ndarray:
+    """
+    可分离高斯核的FFT卷积（零填充线性卷积，输出与输入同尺寸）
+
+    Args:
+        grid: 二维数组
+        sigma: 核标准差（像素）
+
+    Returns:
+        卷积结果（float32）
+    """
+    kernel = gaussian_kernel(sigma)
+    radius = len(kernel) // 2
+
+    result = grid.astype(np.float32)
+    for axis in (0, 1):
+        length = result.shape[axis]
+        size = 1 << int(math.ceil(math.log2(length + 2 * radius)))
+        kernel_spectrum = np.fft.rfft(kernel, n=size)
+        shape = [1, 1]
+        shape[axis] = -1
+        spectrum = np.fft.rfft(result, n=size, axis=axis) * kernel_spectrum.reshape(shape)
+        full = np.fft.irfft(spectrum, n=size, axis=axis)
+        result = np.take(full, np.arange(radius, radius + length), axis=axis).astype(np.float32)
+    return np.maximum(result, 0)
@@ -0,0 +1,437 @@
+"""
+地形最小代价路径（行军路线重建）脚本
+1. 由裁剪后的DEM坡度构建代价面（Tobler步行速度函数，单位: 小时/公里），
+   Natural Earth河流作为惩罚（可设为不可通行）
+2. 在降采样网格上用堆（heapq）实现的A*求相邻事件地点之间的最小代价路径，
+   再在粗路径周围的走廊内以细网格重新求解
+3. KEY_LOCATIONS 之间的全对代价矩阵按输入哈希缓存
+4. 各路段由进程池并行计算
+"""
+
+import sys
+import json
+import math
+import heapq
+import hashlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from project import BBOX, KM_PER_DEGREE
+
+# 文件路径
+DATA_DIR = Path(__file__).parent.parent / "data"
+DEM_FILE = DATA_DIR / "dem" / "processed" / "merged_dem_cropped.tif"
+TIMELINE_FILE = DATA_DIR / "1812_campaign_timeline.json"
+RIVERS_ZIP = DATA_DIR / "boundaries" / "ne_10m_rivers_lake_centerlines.zip"
+CACHE_DIR = DATA_DIR / "cache" / "routing"
+OUTPUT_FILE = DATA_DIR / "geojson" / "routes_terrain.geojson"
+
+# 项目区域 (west, south, east, north)
+BOUNDS = (BBOX['west'], BBOX['south'], BBOX['east'], BBOX['north'])
+
+# 粗网格/细网格分辨率（度）与细化走廊半宽（公里）
+COARSE_RESOLUTION = 0.02
+FINE_RESOLUTION = 0.0025
+CORRIDOR_KM = 5.0
+
+# Tobler步行函数: 速度 = TOBLER_MAX_SPEED * exp(-3.5 * |坡度|)（公里/小时）
+TOBLER_MAX_SPEED = 6.0
+
+# 河流像元附加代价（小时/公里）；None表示不可通行
+RIVER_PENALTY = 6.0
+
+# 8邻域 (行偏移, 列偏移)
+NEIGHBOURS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+class CostGrid:
+    """
+    规则经纬度网格上的代价面
+
+    Attributes:
+        cost: 每个像元的通行代价（小时/公里），不可通行为inf
+        bounds: (west, south, east, north)
+        resolution: 像元大小（度）
+    """
+
+    def __init__(self, cost: np.ndarray, bounds: tuple, resolution: float):
+        self.cost = cost
+        self.bounds = bounds
+        self.resolution = resolution
+        self.height, self.width = cost.shape
+        lats = bounds[3] - (np.arange(self.height) + 0.5) * resolution
+        self.cell_x_km = resolution * KM_PER_DEGREE * np.cos(np.radians(lats))
+        self.cell_y_km = resolution * KM_PER_DEGREE
+
+    def to_cell(self, lon: float, lat: float) -> tuple:
+        col = int((lon - self.bounds[0]) / self.resolution)
+        row = int((self.bounds[3] - lat) / self.resolution)
+        return min(max(row, 0), self.height - 1), min(max(col, 0), self.width - 1)
+
+    def to_lonlat(self, cells: list) -> np.ndarray:
+        rows, cols = np.array(cells, dtype=np.float64).T
+        return np.column_stack([self.bounds[0] + (cols + 0.5) * self.resolution,
+                                self.bounds[3] - (rows + 0.5) * self.resolution])
+
+
+def slope_cost(dem: np.ndarray, resolution: float, north: float) -> np.ndarray:
+    """坡度 → Tobler通行代价（小时/公里）"""
+    lats = north - (np.arange(dem.shape[0]) + 0.5) * resolution
+    cell_x = resolution * KM_PER_DEGREE * 1000 * np.cos(np.radians(lats))[:, None]
+    cell_y = resolution * KM_PER_DEGREE * 1000
+    dz_dy, dz_dx = np.gradient(dem)
+    slope = np.hypot(dz_dx / cell_x, dz_dy / cell_y)
+    return 1.0 / (TOBLER_MAX_SPEED * np.exp(-3.5 * slope))
+
+
+def build_cost_grid(dem_file: Path, bounds: tuple, resolution: float, rivers: list | None = None,
+                    river_penalty: float | None = RIVER_PENALTY) -> CostGrid:
+    """
+    读取bounds范围的DEM（按目标分辨率降采样，GDAL会使用金字塔）并构建代价面
+
+    Args:
+        dem_file: DEM路径
+        bounds: (west, south, east, north)
+        resolution: 网格分辨率（度）
+        rivers: 河流几何列表（shapely）
+        river_penalty: 河流附加代价，None为不可通行
+
+    Returns:
+        CostGrid
+    """
+    import rasterio
+    from rasterio.enums import Resampling
+    from rasterio.features import rasterize
+    from rasterio.transform import from_bounds
+    from rasterio.windows import from_bounds as window_from_bounds
+
+    west, south, east, north = bounds
+    width = max(int(round((east - west) / resolution)), 2)
+    height = max(int(round((north - south) / resolution)), 2)
+
+    with rasterio.open(dem_file) as src:
+        window = window_from_bounds(west, south, east, north, transform=src.transform)
+        dem = src.read(1, window=window, out_shape=(height, width), boundless=False,
+                       resampling=Resampling.average).astype(np.float64)
+        nodata = src.nodata
+
+    invalid = np.isnan(dem) if nodata is None else (dem == nodata) | np.isnan(dem)
+    dem[invalid] = np.nan
+    cost = slope_cost(np.where(invalid, np.nanmean(dem), dem), resolution, north)
+    cost[invalid] = np.inf
+
+    if rivers:
+        transform = from_bounds(west, south, east, north, width, height)
+        river_mask = rasterize(rivers, out_shape=(height, width), transform=transform,
+                               all_touched=True, dtype=np.uint8).astype(bool)
+        if river_penalty is None:
+            cost[river_mask] = np.inf
+        else:
+            cost[river_mask] += river_penalty
+
+    return CostGrid(cost, bounds, resolution)
+
+
+def _search(grid: CostGrid, start: tuple, goals: set, heuristic_goal: tuple | None = None) -> tuple:
+    """
+    堆优化的Dijkstra / A*（给定heuristic_goal时）
+
+    边代价 = 两端像元代价均值 × 步长（公里）；A*启发函数为直线距离 × 全图最小代价，可采纳
+
+    Returns:
+        (到达代价列表, 前驱列表)，均按 row * width + col 展平
+    """
+    width, height = grid.width, grid.height
+    cost = grid.cost.ravel().tolist()
+    cell_x = grid.cell_x_km.tolist()
+    cell_y = grid.cell_y_km
+    size = width * height
+
+    dist = [math.inf] * size
+    previous = [-1] * size
+    closed = bytearray(size)
+
+    if heuristic_goal is not None:
+        goal_row, goal_col = heuristic_goal
+        min_cost = float(np.min(grid.cost))
+        min_cell_x = float(grid.cell_x_km.min())
+
+        def heuristic(row, col):
+            return math.hypot((row - goal_row) * cell_y, (col - goal_col) * min_cell_x) * min_cost
+    else:
+        def heuristic(row, col):
+            return 0.0
+
+    source = start[0] * width + start[1]
+    remaining = {row * width + col for row, col in goals}
+    dist[source] = 0.0
+    heap = [(heuristic(*start), source)]
+
+    while heap and remaining:
+        _, node = heapq.heappop(heap)
+        if closed[node]:
+            continue
+        closed[node] = 1
+        remaining.discard(node)
+
+        row, col = divmod(node, width)
+        node_cost = cost[node]
+        node_dist = dist[node]
+        for dr, dc in NEIGHBOURS:
+            r, c = row + dr, col + dc
+            if r < 0 or r >= height or c < 0 or c >= width:
+                continue
+            neighbour = r * width + c
+            neighbour_cost = cost[neighbour]
+            if closed[neighbour] or neighbour_cost == math.inf:
+                continue
+            step = math.hypot(dr * cell_y, dc * cell_x[row])
+            candidate = node_dist + (node_cost + neighbour_cost) * 0.5 * step
+            if candidate < dist[neighbour]:
+                dist[neighbour] = candidate
+                previous[neighbour] = node
+                heapq.heappush(heap, (candidate + heuristic(r, c), neighbour))
+
+    return dist, previous
+
+
+def least_cost_path(grid: CostGrid, start: tuple, goal: tuple) -> tuple:
+    """
+    A*最小代价路径
+
+    Returns:
+        (像元列表 [(row, col), ...], 总代价（小时）)，不可达时返回 ([], inf)
+    """
+    dist, previous = _search(grid, start, {goal}, heuristic_goal=goal)
+    target = goal[0] * grid.width + goal[1]
+    if dist[target] == math.inf:
+        return [], math.inf
+
+    cells = []
+    node = target
+    while node != -1:
+        cells.append(divmod(node, grid.width))
+        node = previous[node]
+    return cells[::-1], dist[target]
+
+
+def corridor_grid(dem_file: Path, coarse_lonlat: np.ndarray, rivers: list | None,
+                  resolution: float = FINE_RESOLUTION, corridor_km: float = CORRIDOR_KM) -> CostGrid:
+    """粗路径周围走廊内的细网格代价面（走廊外不可通行）"""
+    from rasterio.features import rasterize
+    from rasterio.transform import from_bounds
+    from shapely.geometry import LineString
+
+    margin = corridor_km / KM_PER_DEGREE / math.cos(math.radians(float(coarse_lonlat[:, 1].max())))
+    west, south = coarse_lonlat.min(axis=0) - margin
+    east, north = coarse_lonlat.max(axis=0) + margin
+    bounds = (max(west, BOUNDS[0]), max(south, BOUNDS[1]), min(east, BOUNDS[2]), min(north, BOUNDS[3]))
+
+    grid = build_cost_grid(dem_file, bounds, resolution, rivers)
+    corridor = LineString(coarse_lonlat).buffer(margin)
+    inside = rasterize([corridor], out_shape=grid.cost.shape,
+                       transform=from_bounds(*bounds, grid.width, grid.height), dtype=np.uint8).astype(bool)
+    grid.cost[~inside] = np.inf
+    return grid
+
+
+def route_segment(dem_file: Path, coarse: CostGrid, start: tuple, end: tuple, rivers: list | None,
+                  refine: bool = True) -> dict:
+    """
+    计算两点 (lon, lat) 之间的路线: 粗网格A*，再在走廊内细化
+
+    Returns:
+        {"coordinates", "cost_hours", "length_km"}
+    """
+    cells, cost_hours = least_cost_path(coarse, coarse.to_cell(*start), coarse.to_cell(*end))
+    if not cells:
+        return {"coordinates": [list(start), list(end)], "cost_hours": None, "length_km": None}
+    lonlat = coarse.to_lonlat(cells)
+
+    if refine and len(cells) > 1:
+        fine = corridor_grid(dem_file, lonlat, rivers)
+        fine_cells, fine_cost = least_cost_path(fine, fine.to_cell(*start), fine.to_cell(*end))
+        if fine_cells:
+            lonlat, cost_hours = fine.to_lonlat(fine_cells), fine_cost
+
+    # 首尾替换为精确的事件坐标
+    lonlat[0], lonlat[-1] = start, end
+    steps = np.diff(lonlat, axis=0)
+    length_km = float(np.sum(np.hypot(steps[:, 0] * KM_PER_DEGREE * np.cos(np.radians(lonlat[1:, 1])),
+                                      steps[:, 1] * KM_PER_DEGREE)))
+    return {"coordinates": np.round(lonlat, 5).tolist(), "cost_hours": round(cost_hours, 2),
+            "length_km": round(length_km, 2)}
+
+
+def load_rivers(zip_path: Path = RIVERS_ZIP) -> list:
+    """项目区域内的河流中心线（直接读zip）"""
+    if not zip_path.exists():
+        return []
+    from clip_natural_earth import read_zipped_layer
+
+    return list(read_zipped_layer(zip_path, BOUNDS, ["name"]).geometry)
+
+
+# 子进程内缓存（初始化时构建一次粗网格）
+_worker_state = {}
+
+
+def _init_worker(dem_file: str, coarse_resolution: float):
+    rivers = load_rivers()
+    _worker_state['dem_file'] = Path(dem_file)
+    _worker_state['rivers'] = rivers
+    _worker_state['coarse'] = build_cost_grid(Path(dem_file), BOUNDS, coarse_resolution, rivers)
+
+
+def _route_task(start: tuple, end: tuple) -> dict:
+    state = _worker_state
+    return route_segment(state['dem_file'], state['coarse'], start, end, state['rivers'])
+
+
+def _cost_row_task(source: tuple, targets: list) -> list:
+    coarse = _worker_state['coarse']
+    cells = [coarse.to_cell(*t) for t in targets]
+    dist, _ = _search(coarse, coarse.to_cell(*source), set(cells))
+    return [round(dist[r * coarse.width + c], 2) for r, c in cells]
+
+
+def cache_key(dem_file: Path, locations: list, coarse_resolution: float) -> str:
+    """缓存键: DEM/河流文件的大小与修改时间 + 参数 + 地点"""
+    digest = hashlib.sha256()
+    for path in (dem_file, RIVERS_ZIP):
+        if path.exists():
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    params = [coarse_resolution, TOBLER_MAX_SPEED, RIVER_PENALTY, locations]
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def cost_matrix(dem_file: Path, key_locations: list, pool: ProcessPoolExecutor,
+                coarse_resolution: float = COARSE_RESOLUTION, cache_dir: Path = CACHE_DIR) -> dict:
+    """
+    KEY_LOCATIONS 全对代价矩阵（小时），每个地点做一次单源Dijkstra，结果按输入哈希缓存
+
+    Returns:
+        {"names", "hours": [[...]], "cached"}
+    """
+    points = [(loc['lon'], loc['lat']) for loc in key_locations]
+    names = [loc['name'] for loc in key_locations]
+    key = cache_key(dem_file, [names, points], coarse_resolution)
+    cache_file = cache_dir / f"cost_matrix_{key}.json"
+    if cache_file.exists():
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return {**json.load(f), "cached": True}
+
+    rows = list(pool.map(_cost_row_task, points, [points] * len(points)))
+    matrix = {"names": names, "hours": rows}
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump(matrix, f, ensure_ascii=False)
+    return {**matrix, "cached": False}
+
+
+def collect_legs(timeline_data: dict) -> list:
+    """相邻事件地点组成的路段（各阵营共用的相同路段只计算一次）"""
+    from generate_movements import collect_route_points
+
+    legs = {}
+    for faction, route in collect_route_points(timeline_data).items():
+        for a, b in zip(route, route[1:]):
+            key = (a['lon'], a['lat'], b['lon'], b['lat'])
+            legs.setdefault(key, {"start": a, "end": b, "factions": []})['factions'].append(faction)
+    return list(legs.values())
+
+
+def plan_routes(timeline_data: dict, key_locations: list, dem_file: Path = DEM_FILE,
+                workers: int | None = None) -> dict:
+    """
+    计算全部路段与代价矩阵
+
+    Returns:
+        FeatureCollection（metadata中含代价矩阵）
+    """
+    legs = collect_legs(timeline_data)
+    print(f"\n计算 {len(legs)} 个路段（粗网格 {COARSE_RESOLUTION}°, 细网格 {FINE_RESOLUTION}°）...")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(dem_file), COARSE_RESOLUTION)) as pool:
+        matrix = cost_matrix(dem_file, key_locations, pool)
+        print(f"  代价矩阵: {len(matrix['names'])}x{len(matrix['names'])}"
+              f"{'（缓存）' if matrix['cached'] else ''}")
+
+        starts = [(leg['start']['lon'], leg['start']['lat']) for leg in legs]
+        ends = [(leg['end']['lon'], leg['end']['lat']) for leg in legs]
+        results = list(pool.map(_route_task, starts, ends))
+
+    features = []
+    for leg, result in zip(legs, results):
+        a, b = leg['start'], leg['end']
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": result['coordinates']},
+            "properties": {
+                "factions": sorted(leg['factions']),
+                "from_event": a['event_id'],
+                "to_event": b['event_id'],
+                "from_name": a['name'],
+                "to_name": b['name'],
+                "start_date": a['date'],
+                "end_date": b['date'],
+                "cost_hours": result['cost_hours'],
+                "length_km": result['length_km'],
+            },
+        })
+        print(f"  - {a['name']} → {b['name']}: {result['length_km']} km, {result['cost_hours']} h")
+
+    matrix.pop('cached')
+    return {
+        "type": "FeatureCollection",
+        "features": features,
+        "metadata": {
+            "coarse_resolution": COARSE_RESOLUTION,
+            "fine_resolution": FINE_RESOLUTION,
+            "river_penalty": RIVER_PENALTY,
+            "cost_matrix": matrix,
+        },
+    }
+
+
+def main():
+    print("=" * 70)
+    print("地形最小代价路径重建工具")
+    print("1812拿破仑东征项目")
+    print("=" * 70)
+
+    try:
+        if not DEM_FILE.exists():
+            print(f"\n❌ 未找到DEM: {DEM_FILE}")
+            print("请先运行 process_dem.py")
+            return 1
+        if not RIVERS_ZIP.exists():
+            print(f"\n⚠️  未找到 {RIVERS_ZIP.name}，不考虑河流阻隔")
+
+        with open(TIMELINE_FILE, 'r', encoding='utf-8') as f:
+            timeline_data = json.load(f)
+
+        from process_dem import KEY_LOCATIONS
+
+        collection = plan_routes(timeline_data, KEY_LOCATIONS)
+        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(collection, f, ensure_ascii=False, separators=(',', ':'))
+        print(f"\n✅ 路线已保存: {OUTPUT_FILE} ({OUTPUT_FILE.stat().st_size / 1024:.1f} KB)")
+
+    except FileNotFoundError as e:
+        print(f"\n❌ 错误: 找不到输入文件 {e.filename}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
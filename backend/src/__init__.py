@@ -0,0 +1 @@
+"""1812拿破仑东征项目后端"""
@@ -0,0 +1,19 @@
+"""
+路由公共依赖
+"""
+
+from fastapi import HTTPException, Request
+
+from ..services.data_loader import DataStore
+
+
+def get_store(request: Request) -> DataStore:
+    """获取启动时加载的数据容器"""
+    return request.app.state.store
+
+
+def require(store: DataStore, name: str):
+    """产物未生成时返回503，提示先运行对应的脚本"""
+    if name not in store.artifacts:
+        raise HTTPException(status_code=503, detail=f"数据产物 '{name}' 未生成")
+    return store.artifacts[name]
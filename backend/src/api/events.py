@@ -0,0 +1,120 @@
+"""
+事件端点
+"""
+
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from .deps import get_store, require
+from ..services.data_loader import DataStore, feature_collection
+from ..services.feature_store import MAX_LIMIT, feature_collection_text
+from ..utils.http import GEOJSON, cached_response, derive_etag, dumps, parse_bbox
+
+router = APIRouter(tags=["events"])
+
+
+@router.get("/events")
+async def get_events(
+    request: Request,
+    start: date | None = Query(None, description="起始日期（含）"),
+    end: date | None = Query(None, description="结束日期（含）"),
+    store: DataStore = Depends(get_store),
+):
+    """按时间范围返回事件FeatureCollection"""
+    artifact = require(store, "events")
+
+    if start is None and end is None:
+        return cached_response(request, artifact.etag, lambda: artifact.raw, GEOJSON)
+
+    start_iso = start.isoformat() if start else None
+    end_iso = end.isoformat() if end else None
+    etag = derive_etag(artifact.etag, start_iso, end_iso)
+
+    return cached_response(
+        request, etag,
+        lambda: feature_collection(store.events.between(start_iso, end_iso)),
+        GEOJSON,
+    )
+
+
+@router.get("/events/delta")
+async def get_events_delta(
+    request: Request,
+    from_date: date = Query(..., alias="from", description="拖动前的日期"),
+    to_date: date = Query(..., alias="to", description="拖动后的日期"),
+    store: DataStore = Depends(get_store),
+):
+    """返回时间轴拖动时进入/离开可见集的事件（可见集 = 截至当前日期的全部事件）"""
+    artifact = require(store, "events")
+    from_iso, to_iso = from_date.isoformat(), to_date.isoformat()
+
+    return cached_response(
+        request, derive_etag(artifact.etag, "delta", from_iso, to_iso),
+        lambda: dumps(store.events.delta(from_iso, to_iso)),
+    )
+
+
+@router.get("/events/keyframes")
+async def list_keyframes(request: Request, store: DataStore = Depends(get_store)):
+    """列出章节边界关键帧（日期与可见事件数）"""
+    require(store, "chapters")
+    artifact = require(store, "events")
+    etag = derive_etag(artifact.etag, store.etag("chapters"), "keyframes")
+    return cached_response(request, etag,
+                           lambda: dumps(list(store.keyframes.chapters.values())))
+
+
+@router.get("/events/keyframes/{chapter_id}")
+async def get_keyframe(chapter_id: str, request: Request, store: DataStore = Depends(get_store)):
+    """返回章节边界处的完整可见事件快照（预先序列化）"""
+    require(store, "chapters")
+    artifact = require(store, "events")
+    snapshot = store.keyframes.snapshots.get(chapter_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"章节不存在: {chapter_id}")
+
+    etag = derive_etag(artifact.etag, store.etag("chapters"), "keyframe", chapter_id)
+    return cached_response(request, etag, lambda: snapshot, GEOJSON)
+
+
+@router.get("/events/query")
+def query_events(
+    request: Request,
+    start: date | None = Query(None, description="起始日期（含）"),
+    end: date | None = Query(None, description="结束日期（含）"),
+    bbox: str | None = Query(None, description="minx,miny,maxx,maxy"),
+    type: str | None = Query(None, description="事件类型"),
+    limit: int = Query(1000, ge=1, le=MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    store: DataStore = Depends(get_store),
+):
+    """在嵌入式要素库上按时间/范围/类型过滤（日期索引 + R*Tree，不依赖内存索引）"""
+    if store.features is None:
+        raise HTTPException(status_code=503, detail="要素库未生成，请先运行 generate_events_geojson.py")
+    try:
+        bounds = parse_bbox(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    start_iso = start.isoformat() if start else None
+    end_iso = end.isoformat() if end else None
+    etag = derive_etag(store.features.etag, "query", start_iso, end_iso, bounds, type, limit, offset)
+
+    def build() -> bytes:
+        features, more = store.features.query("events", start_iso, end_iso, bounds, type, limit, offset)
+        return feature_collection_text(features, {"limit": limit, "offset": offset, "has_more": more})
+
+    return cached_response(request, etag, build, GEOJSON)
+
+
+@router.get("/events/{event_id}")
+async def get_event(event_id: str, request: Request, store: DataStore = Depends(get_store)):
+    """返回单个事件Feature"""
+    artifact = require(store, "events")
+    feature = store.events.by_id.get(event_id)
+    if feature is None:
+        raise HTTPException(status_code=404, detail=f"事件不存在: {event_id}")
+
+    return cached_response(request, derive_etag(artifact.etag, event_id),
+                           lambda: dumps(feature), GEOJSON)
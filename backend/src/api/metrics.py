@@ -0,0 +1,16 @@
+"""
+指标端点
+"""
+
+from fastapi import APIRouter, Request, Response
+
+from ..services.metrics import CONTENT_TYPE
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics(request: Request):
+    """Prometheus文本格式指标（请求延迟/大小直方图、条件请求命中、缓存统计、产物加载耗时）"""
+    store = getattr(request.app.state, "store", None)
+    return Response(content=request.app.state.metrics.render(store), media_type=CONTENT_TYPE)
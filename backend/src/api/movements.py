@@ -0,0 +1,30 @@
+"""
+行军路线端点
+"""
+
+from fastapi import APIRouter, Depends, Query, Request
+
+from .deps import get_store, require
+from ..services.data_loader import DataStore, feature_collection
+from ..utils.http import GEOJSON, cached_response, derive_etag
+
+router = APIRouter(tags=["movements"])
+
+
+@router.get("/movements")
+async def get_movements(
+    request: Request,
+    unit: str | None = Query(None, description="阵营/军团，如 french"),
+    lod: int = Query(2, ge=1, le=3, description="1=高精度 2=中等 3=低精度"),
+    store: DataStore = Depends(get_store),
+):
+    """返回预先简化的行军路线（generate_movements.py产物）"""
+    artifact = require(store, "movements")
+
+    def build() -> bytes:
+        features = store.movements.get(lod, [])
+        if unit:
+            features = [f for f in features if f['properties']['faction'] == unit]
+        return feature_collection(features)
+
+    return cached_response(request, derive_etag(artifact.etag, unit, lod), build, GEOJSON)
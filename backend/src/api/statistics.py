@@ -0,0 +1,73 @@
+"""
+统计端点
+"""
+
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from .deps import get_store, require
+from ..services.data_loader import DataStore
+from ..utils.http import cached_response, derive_etag, dumps, parse_bbox
+
+router = APIRouter(prefix="/statistics", tags=["statistics"])
+
+
+@router.get("/troops")
+async def get_troops_stats(
+    request: Request,
+    start: date | None = Query(None, description="起始日期（含）"),
+    end: date | None = Query(None, description="结束日期（含）"),
+    faction: str | None = Query(None, description="french|russian|..."),
+    store: DataStore = Depends(get_store),
+):
+    """返回按天插值的兵力时间序列（预计算数组切片）"""
+    artifact = require(store, "troops")
+    if faction is not None and faction not in store.troops.factions:
+        raise HTTPException(status_code=404, detail=f"没有阵营 {faction} 的兵力数据")
+
+    etag = derive_etag(artifact.etag, start, end, faction)
+    return cached_response(request, etag,
+                           lambda: dumps(store.troops.query(start, end, faction)))
+
+
+@router.get("/regions")
+async def get_region_stats(
+    request: Request,
+    period: Literal["week", "month"] = Query("month", description="聚合周期"),
+    start: date | None = Query(None, description="起始日期（含所在周期）"),
+    end: date | None = Query(None, description="结束日期（含）"),
+    region: str | None = Query(None, description="一级行政区ID（adm1_code）"),
+    store: DataStore = Depends(get_store),
+):
+    """返回按区域/周期预聚合的兵力与伤亡表（Choropleth直接查表）"""
+    artifact = require(store, "regions")
+    if region is not None and region not in store.regions.regions:
+        raise HTTPException(status_code=404, detail=f"没有区域 {region} 的聚合数据")
+
+    etag = derive_etag(artifact.etag, period, start, end, region)
+    return cached_response(request, etag,
+                           lambda: dumps(store.regions.query(period, start, end, region)))
+
+
+@router.get("/temperature")
+async def get_temperature_field(
+    request: Request,
+    day: date = Query(..., alias="date", description="日期"),
+    bbox: str | None = Query(None, description="minx,miny,maxx,maxy"),
+    store: DataStore = Depends(get_store),
+):
+    """返回某一天的气温格网（内存映射数组切片，值为 int16 × scale °C）"""
+    artifact = require(store, "temperature")
+    if store.temperature.index(day) is None:
+        raise HTTPException(status_code=404, detail=f"{day} 不在气温场时间范围内")
+    try:
+        bounds = parse_bbox(bbox) if bbox else None
+        store.temperature.window(bounds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    etag = derive_etag(artifact.etag, day, bounds)
+    return cached_response(request, etag,
+                           lambda: dumps(store.temperature.query(day, bounds)))
@@ -0,0 +1,107 @@
+"""
+地形端点
+"""
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel, Field
+
+from .deps import get_store
+from ..services.data_loader import DataStore
+from ..services.dem import MAX_RESOLUTION, MIN_RESOLUTION, output_shape
+from ..services.elevation import (DEFAULT_PROFILE_SAMPLES, MAX_POINTS, MAX_PROFILE_SAMPLES, ElevationGrid,
+                                  to_json_values)
+from ..utils.http import GEOJSON, cached_response, dumps, parse_bbox
+
+router = APIRouter(prefix="/terrain", tags=["terrain"])
+
+
+@router.get("/contours")
+async def get_contours(
+    request: Request,
+    interval: int = Query(100, description="等高距（米）"),
+    store: DataStore = Depends(get_store),
+):
+    """返回等高线GeoJSON（process_dem.generate_contours产物，原始字节直出）"""
+    artifact = store.contours.get(interval)
+    if artifact is None:
+        available = sorted(store.contours)
+        raise HTTPException(status_code=404,
+                            detail=f"没有 {interval}m 等高线，可用: {available}")
+
+    return cached_response(request, artifact.etag, lambda: artifact.raw, GEOJSON)
+
+
+@router.get("/dem")
+def get_dem(
+    request: Request,
+    bbox: str = Query(..., description="minx,miny,maxx,maxy"),
+    resolution: int = Query(512, ge=MIN_RESOLUTION, le=MAX_RESOLUTION, description="输出长边（像素）"),
+    format: str = Query("png", pattern="^(png|terrain-rgb)$", description="png | terrain-rgb"),
+    store: DataStore = Depends(get_store),
+):
+    """
+    返回bbox范围的高程图PNG（窗口读取 + LRU编码缓存），实际尺寸见 X-Width/X-Height
+
+    ETag在渲染前确定，If-None-Match命中时不读取/编码栅格（304不带 X-Elevation-* 头）
+    """
+    if store.dem is None:
+        raise HTTPException(status_code=503, detail="DEM未生成，请先运行 process_dem.py")
+    try:
+        requested = parse_bbox(bbox)
+        snapped = store.dem.window_bbox(requested)
+        etag = store.dem.etag(requested, resolution, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rendered = []
+
+    def build() -> bytes:
+        rendered.append(store.dem.render(requested, resolution, format))
+        return rendered[0].body
+
+    response = cached_response(request, etag, build, "image/png")
+    height, width = output_shape(snapped, resolution)
+    response.headers["X-BBox"] = ",".join(str(v) for v in snapped)
+    response.headers["X-Width"] = str(width)
+    response.headers["X-Height"] = str(height)
+    if rendered:
+        response.headers["X-Elevation-Min"] = f"{rendered[0].elevation_min:.1f}"
+        response.headers["X-Elevation-Max"] = f"{rendered[0].elevation_max:.1f}"
+    return response
+
+
+class PointsQuery(BaseModel):
+    """批量点高程请求"""
+    points: list[tuple[float, float]] = Field(..., min_length=1, max_length=MAX_POINTS,
+                                              description="[[lon, lat], ...]")
+
+
+class ProfileQuery(BaseModel):
+    """折线剖面请求"""
+    coordinates: list[tuple[float, float]] = Field(..., min_length=2, max_length=MAX_POINTS,
+                                                   description="[[lon, lat], ...]")
+    samples: int = Field(DEFAULT_PROFILE_SAMPLES, ge=2, le=MAX_PROFILE_SAMPLES)
+
+
+def require_elevation(store: DataStore) -> ElevationGrid:
+    if store.elevation is None:
+        raise HTTPException(status_code=503, detail="高程网格未生成，请先运行 build_elevation_grid.py")
+    return store.elevation
+
+
+@router.post("/elevation")
+def post_elevation(query: PointsQuery, store: DataStore = Depends(get_store)):
+    """批量点高程（米，双线性插值；范围外/无数据为null）"""
+    grid = require_elevation(store)
+    points = np.asarray(query.points, dtype=np.float64)
+    elevation = grid.sample(points[:, 0], points[:, 1])
+    return Response(content=dumps({"elevation": to_json_values(elevation)}), media_type="application/json")
+
+
+@router.post("/profile")
+def post_profile(query: ProfileQuery, store: DataStore = Depends(get_store)):
+    """折线高程剖面（按累计距离等间隔取样）"""
+    grid = require_elevation(store)
+    profile = grid.profile(np.asarray(query.coordinates, dtype=np.float64), query.samples)
+    return Response(content=dumps(profile), media_type="application/json")
@@ -0,0 +1,28 @@
+"""
+矢量瓦片端点
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from .deps import get_store
+from ..services.data_loader import DataStore
+from ..services.tiles import tile_in_range
+from ..utils.http import cached_response, derive_etag
+
+router = APIRouter(prefix="/tiles", tags=["tiles"])
+
+MVT = "application/vnd.mapbox-vector-tile"
+
+
+@router.get("/{layer}/{z}/{x}/{y}.mvt")
+def get_tile(layer: str, z: int, x: int, y: int, request: Request,
+             store: DataStore = Depends(get_store)):
+    """返回事件/等高线图层的Mapbox Vector Tile"""
+    tile_layer = store.tiles.layers.get(layer)
+    if tile_layer is None:
+        raise HTTPException(status_code=404, detail=f"图层不存在: {layer}，可用: {sorted(store.tiles.layers)}")
+    if not tile_in_range(z, x, y):
+        raise HTTPException(status_code=400, detail=f"瓦片坐标越界: {z}/{x}/{y}")
+
+    etag = derive_etag(tile_layer.etag, tile_layer.name, z, x, y)
+    return cached_response(request, etag, lambda: store.tiles.tile(layer, z, x, y), MVT)
@@ -0,0 +1,63 @@
+"""
+后端配置
+数据目录可通过环境变量 NAPOLEON_DATA_DIR 覆盖（测试/部署时使用）
+"""
+
+import os
+from pathlib import Path
+from dataclasses import dataclass, field
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@dataclass(frozen=True)
+class Settings:
+    """服务配置"""
+    data_dir: Path = BACKEND_DIR / "data"
+    # 运行时缓存目录（瓦片等），默认 data_dir/cache
+    cache_dir: Path | None = None
+    cors_origins: list = field(default_factory=lambda: ["http://localhost:5173"])
+    gzip_minimum_size: int = 1000
+    terrain_cache_bytes: int = 64 * 1024 * 1024
+    tile_cache_bytes: int = 256 * 1024 * 1024
+
+    @property
+    def geojson_dir(self) -> Path:
+        return self.data_dir / "geojson"
+
+    @property
+    def feature_store_file(self) -> Path:
+        return self.geojson_dir / "campaign.sqlite"
+
+    @property
+    def dem_dir(self) -> Path:
+        return self.data_dir / "dem" / "processed"
+
+    @property
+    def statistics_dir(self) -> Path:
+        return self.data_dir / "statistics"
+
+    @property
+    def chapters_file(self) -> Path:
+        return self.data_dir / "chapters.json"
+
+    @property
+    def images_dir(self) -> Path:
+        return self.data_dir / "images"
+
+    @property
+    def map_tiles_dir(self) -> Path:
+        return self.data_dir / "tiles"
+
+    @property
+    def story_dir(self) -> Path:
+        return self.data_dir / "story"
+
+    @property
+    def tile_cache_dir(self) -> Path:
+        return (self.cache_dir or self.data_dir / "cache") / "tiles"
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        data_dir = os.environ.get("NAPOLEON_DATA_DIR")
+        return cls(data_dir=Path(data_dir)) if data_dir else cls()
@@ -0,0 +1,67 @@
+"""
+FastAPI入口
+
+运行: uvicorn src.main:app --reload （在backend目录下）
+"""
+
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.staticfiles import StaticFiles
+
+from .api import events, metrics, movements, statistics, terrain, tiles
+from .config import Settings
+from .services.data_loader import load_store
+from .services.metrics import Metrics, MetricsMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """创建应用；数据在启动时一次性加载到 app.state.store"""
+    settings = settings or Settings.from_env()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.store = load_store(settings)
+        yield
+
+    app = FastAPI(
+        title="Napoleon 1812 Campaign API",
+        description="Historical GIS data API for 1812 invasion visualization",
+        version="1.0.0",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_methods=["*"],
+        expose_headers=["ETag", "X-BBox", "X-Width", "X-Height", "X-Elevation-Min", "X-Elevation-Max"],
+    )
+    app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_minimum_size)
+    # 最外层: 计时包含压缩，响应大小为实际发送的字节数
+    app.state.metrics = Metrics()
+    app.add_middleware(MetricsMiddleware, metrics=app.state.metrics)
+
+    for module in (events, movements, statistics, terrain):
+        app.include_router(module.router, prefix="/api")
+    app.include_router(tiles.router)
+    app.include_router(metrics.router)
+
+    # 章节包（build_story_bundles.py产物）作为静态文件提供，前端按manifest预取
+    app.mount("/story", StaticFiles(directory=settings.story_dir, check_dir=False), name="story")
+    # 响应式图片变体（optimize_images.py产物），srcset列表见 /images/manifest.json
+    app.mount("/images", StaticFiles(directory=settings.images_dir, check_dir=False), name="images")
+    # 历史地图DZI/XYZ瓦片（build_deepzoom.py产物）: /maps/deepzoom/Minard.dzi, /maps/xyz/{图名}/{z}/{x}/{y}.png
+    app.mount("/maps", StaticFiles(directory=settings.map_tiles_dir, check_dir=False), name="maps")
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,8 @@
+"""
+数据管线
+scripts/ 下的各处理脚本作为步骤登记在注册表中，只有运行时才导入对应模块
+"""
+
+from .registry import STEPS, Step, StepError, get_step, run_step
+
+__all__ = ["STEPS", "Step", "StepError", "get_step", "run_step"]
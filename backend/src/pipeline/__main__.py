@@ -0,0 +1,81 @@
+"""
+管线命令行
+
+    python -m src.pipeline list                 # 列出步骤（不导入任何步骤模块）
+    python -m src.pipeline run events heatmaps  # 按登记顺序运行指定步骤
+    python -m src.pipeline run --all            # 运行全部非交互步骤
+    python -m src.pipeline imports              # 测量CLI/API与各步骤模块的导入开销
+"""
+
+import sys
+import argparse
+
+from .registry import STEPS, StepError, get_step, run_step
+
+
+def list_steps():
+    for step in STEPS.values():
+        flag = " (交互/网络)" if step.interactive else ""
+        print(f"  {step.name:18s} {step.module:28s} {step.description}{flag}")
+
+
+def run_steps(names: list, run_all: bool = False) -> int:
+    """按登记顺序运行步骤，遇到第一个失败的步骤即停止；返回进程退出码"""
+    if run_all:
+        steps = [step for step in STEPS.values() if not step.interactive]
+    else:
+        selected = {get_step(name).name for name in names}
+        steps = [step for step in STEPS.values() if step.name in selected]
+
+    for step in steps:
+        print(f"\n>>> [{step.name}] {step.description}")
+        try:
+            elapsed = run_step(step.name)
+        except StepError as e:
+            print(f"\n❌ [{step.name}] {e}，后续步骤未运行")
+            return 1
+        print(f"<<< [{step.name}] {elapsed:.1f} s")
+    return 0
+
+
+def report_imports():
+    from .imports import IMPORT_BUDGETS, measure_import
+
+    print("导入开销（全新子进程）:")
+    for module, budget in IMPORT_BUDGETS.items():
+        result = measure_import(module)
+        mark = "✅" if result['seconds'] <= budget else "❌"
+        print(f"  {mark} {module:28s} {result['seconds'] * 1000:7.1f} ms (预算 {budget * 1000:.0f} ms)")
+    for step in STEPS.values():
+        result = measure_import(step.module)
+        mark = "⚠️ " if result['mkdirs'] else "  "
+        print(f"  {mark} {step.module:28s} {result['seconds'] * 1000:7.1f} ms "
+              f"{','.join(result['heavy']) or '-'}{' 创建目录: ' + ','.join(result['mkdirs']) if result['mkdirs'] else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.pipeline", description="1812拿破仑东征项目数据管线")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="列出步骤")
+    run_parser = commands.add_parser("run", help="运行步骤")
+    run_parser.add_argument("steps", nargs="*", help="步骤名")
+    run_parser.add_argument("--all", action="store_true", help="运行全部非交互步骤")
+    commands.add_parser("imports", help="测量导入开销")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        list_steps()
+    elif args.command == "run":
+        if not args.steps and not args.all:
+            parser.error("请指定步骤名或 --all")
+        try:
+            status = run_steps(args.steps, args.all)
+        except KeyError as e:
+            parser.error(e.args[0])
+        sys.exit(status)
+    else:
+        report_imports()
+
+
+if __name__ == "__main__":
+    main()
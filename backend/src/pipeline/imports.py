@@ -0,0 +1,50 @@
+"""
+导入开销测量
+在全新的子进程中导入模块，记录耗时与被连带加载的重依赖，
+用于检查CLI/API的导入时间预算与脚本"导入无副作用"
+"""
+
+import sys
+import json
+import subprocess
+
+from ..config import BACKEND_DIR
+
+# 导入时间预算（秒）: CLI只应加载标准库；API的主要开销是FastAPI/pydantic本身
+IMPORT_BUDGETS = {
+    "src.pipeline": 0.2,
+    "src.main": 1.5,
+}
+
+# 只应在步骤运行时加载的依赖
+HEAVY_MODULES = ("requests", "rasterio", "geopandas", "fiona", "pyproj", "shapely", "PIL", "numpy", "fastapi")
+
+_PROBE = """
+import sys, json, time, pathlib
+sys.path[:0] = {paths!r}
+mkdirs = []
+_mkdir = pathlib.Path.mkdir
+def _record(self, *args, **kwargs):
+    mkdirs.append(str(self))
+    return _mkdir(self, *args, **kwargs)
+pathlib.Path.mkdir = _record
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "mkdirs": mkdirs,
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str) -> dict:
+    """
+    在子进程中导入模块（src.* 或 scripts/ 下的脚本模块）
+
+    Returns:
+        {"seconds": 导入耗时, "mkdirs": 导入期间创建的目录, "heavy": 被加载的重依赖}
+    """
+    code = _PROBE.format(paths=[str(BACKEND_DIR), str(BACKEND_DIR / "scripts")],
+                         module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,96 @@
+"""
+管线步骤注册表
+登记时只记录模块名（字符串），导入注册表不会加载任何步骤模块或其依赖（requests/rasterio/geopandas等）；
+步骤运行时才把 scripts/ 加入 sys.path 并导入模块；
+步骤入口返回非零状态（脚本 main() 出错时返回1，与直接运行时的退出码一致）即视为失败
+"""
+
+import sys
+import time
+import importlib
+from typing import Callable
+from dataclasses import dataclass
+
+from ..config import BACKEND_DIR
+
+SCRIPTS_DIR = BACKEND_DIR / "scripts"
+
+
+@dataclass(frozen=True)
+class Step:
+    """一个管线步骤"""
+    name: str
+    module: str
+    description: str
+    entry: str = "main"
+    # 需要终端交互（确认/选项菜单）或访问网络，不参与 run --all
+    interactive: bool = False
+
+    def load(self) -> Callable:
+        """导入步骤模块并返回入口函数"""
+        if str(SCRIPTS_DIR) not in sys.path:
+            sys.path.insert(0, str(SCRIPTS_DIR))
+        return getattr(importlib.import_module(self.module), self.entry)
+
+
+class StepError(RuntimeError):
+    """步骤入口返回了非零状态"""
+
+
+# 按执行顺序登记（后面的步骤读取前面步骤的产物）
+STEPS: dict[str, Step] = {}
+
+
+def register(name: str, module: str, description: str, **options) -> Step:
+    if name in STEPS:
+        raise ValueError(f"步骤重复登记: {name}")
+    step = Step(name, module, description, **options)
+    STEPS[name] = step
+    return step
+
+
+register("download-geodata", "download_geodata", "下载Natural Earth数据并裁剪底图", interactive=True)
+register("download-dem", "download_jaxa_aw3d30", "下载JAXA AW3D30 DEM瓦片", interactive=True)
+register("process-dem", "process_dem", "合并/裁剪DEM，生成等高线与hillshade", interactive=True)
+register("elevation", "build_elevation_grid", "DEM转为内存映射int16高程网格（点高程与剖面API）")
+register("basemap", "clip_natural_earth", "从Natural Earth zip裁剪分级底图图层")
+register("events", "generate_events_geojson", "事件GeoJSON与要素库")
+register("troops", "generate_troop_series", "逐日兵力时间序列")
+register("regions", "aggregate_regions", "事件-行政区连接与Choropleth聚合表")
+register("movements", "generate_movements", "多LOD行军路线")
+register("flow", "build_flow_bands", "米纳德式兵力流带几何（GPU缓冲区）")
+register("bundles", "build_edge_bundles", "行军边核密度捆绑（按参数缓存）")
+register("densify", "densify_routes", "按DEM加密行军路线")
+register("routes", "route_planner", "地形最小代价路线与关键地点代价矩阵")
+register("viewsheds", "compute_viewshed", "战场视域")
+register("temperature", "generate_temperature_field", "逐日气温场")
+register("heatmaps", "build_heatmaps", "伤亡/兵力密度热力图瓦片")
+register("geocode", "geocoding", "时间线地名地理编码检查（未命中时访问Nominatim）", interactive=True)
+register("images", "optimize_images", "历史地图与配图的多尺寸WebP/AVIF")
+register("deepzoom", "build_deepzoom", "历史地图DZI/XYZ瓦片")
+register("story", "build_story_bundles", "Story Mode章节包")
+
+
+def get_step(name: str) -> Step:
+    """按名称取步骤，未知名称抛出KeyError（附可用列表）"""
+    try:
+        return STEPS[name]
+    except KeyError:
+        raise KeyError(f"未知步骤: {name}，可用: {', '.join(STEPS)}") from None
+
+
+def run_step(name: str) -> float:
+    """
+    运行一个步骤
+
+    Returns:
+        耗时（秒，含模块导入）
+
+    Raises:
+        StepError: 入口返回非零状态
+    """
+    started = time.perf_counter()
+    status = get_step(name).load()()
+    if status:
+        raise StepError(f"步骤 {name} 失败（返回 {status}）")
+    return time.perf_counter() - started
@@ -0,0 +1,343 @@
+"""
+数据加载服务
+启动时一次性读取所有生成产物，构建按日期/ID索引的内存结构，
+并以文件内容哈希作为强ETag，请求路径上不再有任何文件IO或JSON解析
+"""
+
+import json
+import time
+import sqlite3
+import logging
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from datetime import date, timedelta
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .dem import DemService
+from .elevation import ElevationGrid
+from .feature_store import FeatureStore
+from .tiles import TileService, build_tile_service
+from ..config import Settings
+from ..utils.http import content_etag, dumps
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Artifact:
+    """已加载的产物文件"""
+    name: str
+    path: Path
+    raw: bytes
+    etag: str
+    load_seconds: float
+    data: object = None
+
+    @classmethod
+    def load(cls, name: str, path: Path, parse: bool = True) -> "Artifact":
+        """读取文件并计算ETag；parse=False时只保留原始字节（整文件直出的大文件）"""
+        started = time.perf_counter()
+        raw = path.read_bytes()
+        data = json.loads(raw) if parse else None
+        return cls(name=name, path=path, raw=raw, etag=content_etag(raw),
+                   load_seconds=time.perf_counter() - started, data=data)
+
+
+class EventIndex:
+    """按日期排序的事件索引，时间范围查询为两次二分查找"""
+
+    def __init__(self, collection: dict):
+        features = sorted(collection.get('features', []),
+                          key=lambda f: f['properties'].get('date') or '')
+        self.metadata = collection.get('metadata', {})
+        self.features = features
+        self.dates = [f['properties'].get('date') or '' for f in features]
+        self.by_id = {f['properties'].get('id'): f for f in features}
+
+    def range_slice(self, start: str | None = None, end: str | None = None) -> tuple[int, int]:
+        """返回 [start, end]（含端点）对应的下标区间"""
+        lo = bisect_left(self.dates, start) if start else 0
+        hi = bisect_right(self.dates, end) if end else len(self.dates)
+        return lo, hi
+
+    def between(self, start: str | None = None, end: str | None = None) -> list:
+        lo, hi = self.range_slice(start, end)
+        return self.features[lo:hi]
+
+    def visible_count(self, day: str) -> int:
+        """时间轴停在day时可见的事件数（date <= day 的全部事件）"""
+        return bisect_right(self.dates, day)
+
+    def delta(self, from_day: str, to_day: str) -> dict:
+        """
+        时间轴从from_day拖动到to_day时的可见集变化
+
+        向后拖动时 (from, to] 内的事件进入；向前拖动时 (to, from] 内的事件离开
+        """
+        lo = min(self.visible_count(from_day), self.visible_count(to_day))
+        hi = max(self.visible_count(from_day), self.visible_count(to_day))
+        changed = self.features[lo:hi]
+        forward = to_day >= from_day
+        return {
+            "from": from_day,
+            "to": to_day,
+            "direction": "forward" if forward else "backward",
+            "enter": changed if forward else [],
+            "leave": [] if forward else [f['properties'].get('id') for f in changed],
+            "visible_count": self.visible_count(to_day),
+        }
+
+
+class TroopSeries:
+    """预计算兵力序列（generate_troop_series.py产物），查询即数组切片"""
+
+    def __init__(self, artifact: dict):
+        self.start = date.fromisoformat(artifact['start'])
+        self.resolution_days = artifact['resolution_days']
+        self.length = artifact['length']
+        self.factions = {name: info['series'] for name, info in artifact['factions'].items()}
+        self.dates = [(self.start + timedelta(days=i * self.resolution_days)).isoformat()
+                      for i in range(self.length)]
+
+    def index(self, day: date) -> int:
+        """日期所在的序列下标（向下取整到分辨率，不裁剪: 序列之前为负数，之后 >= length）"""
+        return (day - self.start).days // self.resolution_days
+
+    def query(self, start: date | None = None, end: date | None = None,
+              faction: str | None = None) -> dict:
+        """[start, end] 内的序列值；与序列范围不相交时各阵营返回空列表"""
+        lo = max(self.index(start), 0) if start else 0
+        hi = min(self.index(end) + 1, self.length) if end else self.length
+        hi = max(hi, lo)
+        names = [faction] if faction else sorted(self.factions)
+        return {
+            name: [{"date": d, "count": c}
+                   for d, c in zip(self.dates[lo:hi], self.factions[name][lo:hi])]
+            for name in names
+        }
+
+
+def period_start(day: date, period: str) -> date:
+    """日期所在周（周一）或月（1日）的起始日期，与aggregate_regions.py一致"""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+class RegionAggregates:
+    """按区域/周期预聚合的兵力与伤亡表（aggregate_regions.py产物），查询即按日期二分切片"""
+
+    def __init__(self, artifact: dict):
+        self.columns = artifact['columns']
+        self.regions = artifact['regions']
+        self.periods = artifact['periods']
+        start_column = self.columns.index("period_start")
+        self.starts = {period: [row[start_column] for row in rows] for period, rows in self.periods.items()}
+
+    def query(self, period: str, start: date | None = None, end: date | None = None,
+              region: str | None = None) -> dict:
+        starts = self.starts[period]
+        # 起始日期落在周期中间时，包含该周期
+        lo = bisect_left(starts, period_start(start, period).isoformat()) if start else 0
+        hi = bisect_right(starts, end.isoformat()) if end else len(starts)
+        rows = self.periods[period][lo:hi]
+        if region is not None:
+            rows = [row for row in rows if row[0] == region]
+        return {"period": period, "columns": self.columns, "rows": rows,
+                "regions": {row[0]: self.regions[row[0]] for row in rows}}
+
+
+class TemperatureField:
+    """逐日气温场（generate_temperature_field.py产物），.npy内存映射，查询只读取命中的日期块与范围"""
+
+    def __init__(self, metadata: dict, path: Path):
+        self.metadata = metadata
+        self.start = date.fromisoformat(metadata['start'])
+        self.length = metadata['length']
+        self.bounds = metadata['bounds']
+        self.resolution = metadata['resolution']
+        self.scale = metadata['scale']
+        self.values = np.load(path, mmap_mode='r')
+        if list(self.values.shape) != metadata['shape']:
+            raise ValueError(f"{path.name} 形状 {self.values.shape} 与元数据 {metadata['shape']} 不一致")
+
+    def index(self, day: date) -> int | None:
+        offset = (day - self.start).days
+        return offset if 0 <= offset < self.length else None
+
+    def window(self, bbox: tuple | None) -> tuple:
+        """bbox → (行起, 行止, 列起, 列止)，按网格外扩对齐并限制在网格内；与网格不相交时抛出ValueError"""
+        _, height, width = self.values.shape
+        if bbox is None:
+            return 0, height, 0, width
+        west, south, east, north = self.bounds
+        minx, miny, maxx, maxy = bbox
+        col0 = min(max(int((minx - west) // self.resolution), 0), width)
+        col1 = min(max(int(-((west - maxx) // self.resolution)), 0), width)
+        row0 = min(max(int((north - maxy) // self.resolution), 0), height)
+        row1 = min(max(int(-((miny - north) // self.resolution)), 0), height)
+        if row1 <= row0 or col1 <= col0:
+            raise ValueError(f"bbox 与气温场范围 {self.bounds} 不相交")
+        return row0, row1, col0, col1
+
+    def query(self, day: date, bbox: tuple | None = None) -> dict:
+        row0, row1, col0, col1 = self.window(bbox)
+        block = self.values[self.index(day), row0:row1, col0:col1]
+        west, _, _, north = self.bounds
+        return {
+            "date": day.isoformat(),
+            "bounds": [round(v, 6) for v in (west + col0 * self.resolution, north - row1 * self.resolution,
+                                             west + col1 * self.resolution, north - row0 * self.resolution)],
+            "resolution": self.resolution,
+            "width": col1 - col0,
+            "height": row1 - row0,
+            "scale": self.scale,
+            # 行自北向南，值为 int16 × scale（°C）
+            "values": block.tolist(),
+        }
+
+
+class Keyframes:
+    """章节边界处的可见事件快照（chapters.json），启动时预先序列化"""
+
+    def __init__(self, chapters: list, events: EventIndex):
+        self.chapters = {}
+        self.snapshots = {}
+        for chapter in sorted(chapters, key=lambda c: c.get('order', 0)):
+            # 快照截止日取章节日期与其事件日期中的最晚者，保证章节自身的事件都可见
+            event_dates = [events.by_id[i]['properties'].get('date') or '' for i in chapter.get('event_ids', [])
+                           if i in events.by_id]
+            cutoff = max([chapter['date'], *event_dates])
+            count = events.visible_count(cutoff)
+            self.chapters[chapter['id']] = {
+                "id": chapter['id'],
+                "date": chapter['date'],
+                "title": chapter.get('title'),
+                "title_zh": chapter.get('title_zh'),
+                "event_ids": chapter.get('event_ids', []),
+                "visible_count": count,
+            }
+            self.snapshots[chapter['id']] = feature_collection(
+                events.features[:count],
+                {"chapter": chapter['id'], "date": chapter['date'], "cutoff": cutoff},
+            )
+
+
+@dataclass
+class DataStore:
+    """所有内存数据的容器，挂在 app.state.store 上"""
+    settings: Settings
+    artifacts: dict = field(default_factory=dict)
+    events: EventIndex | None = None
+    troops: TroopSeries | None = None
+    regions: RegionAggregates | None = None
+    temperature: TemperatureField | None = None
+    keyframes: Keyframes | None = None
+    contours: dict = field(default_factory=dict)
+    movements: dict = field(default_factory=dict)
+    features: FeatureStore | None = None
+    dem: DemService | None = None
+    elevation: ElevationGrid | None = None
+    tiles: TileService | None = None
+
+    def etag(self, name: str) -> str:
+        return self.artifacts[name].etag
+
+
+def _load_optional(store: DataStore, name: str, path: Path, parse: bool = True) -> Artifact | None:
+    if not path.exists():
+        logger.warning("产物不存在，跳过: %s", path)
+        return None
+    artifact = Artifact.load(name, path, parse=parse)
+    store.artifacts[name] = artifact
+    logger.info("已加载 %s (%.1f KB, %.1f ms)", path.name, len(artifact.raw) / 1024,
+                artifact.load_seconds * 1000)
+    return artifact
+
+
+def load_store(settings: Settings) -> DataStore:
+    """
+    启动时加载全部产物
+
+    Args:
+        settings: 服务配置
+
+    Returns:
+        DataStore
+    """
+    store = DataStore(settings=settings)
+
+    events = _load_optional(store, "events", settings.geojson_dir / "events.geojson")
+    if events:
+        store.events = EventIndex(events.data)
+
+    chapters = _load_optional(store, "chapters", settings.chapters_file)
+    if chapters and store.events:
+        store.keyframes = Keyframes(chapters.data.get('chapters', []), store.events)
+
+    troops = _load_optional(store, "troops", settings.statistics_dir / "troops_daily.json")
+    if troops:
+        store.troops = TroopSeries(troops.data)
+
+    regions = _load_optional(store, "regions", settings.statistics_dir / "region_aggregates.json")
+    if regions:
+        store.regions = RegionAggregates(regions.data)
+
+    temperature = _load_optional(store, "temperature", settings.statistics_dir / "temperature_field.json")
+    if temperature:
+        try:
+            store.temperature = TemperatureField(temperature.data, settings.statistics_dir / temperature.data['file'])
+        except (OSError, ValueError) as e:
+            logger.warning("气温场不可用: %s", e)
+            del store.artifacts["temperature"]
+
+    # 等高线体积大且整文件直出，只保留原始字节
+    for path in sorted(settings.geojson_dir.glob("contours_*m.geojson")):
+        interval = int(path.stem.split('_')[1].rstrip('m'))
+        artifact = _load_optional(store, f"contours_{interval}", path, parse=False)
+        store.contours[interval] = artifact
+
+    movements = _load_optional(store, "movements", settings.geojson_dir / "movements.geojson")
+    if movements:
+        for feature in movements.data.get('features', []):
+            props = feature['properties']
+            store.movements.setdefault(props['lod'], []).append(feature)
+
+    # 嵌入式要素库不载入内存，只打开只读连接
+    if settings.feature_store_file.exists():
+        try:
+            store.features = FeatureStore(settings.feature_store_file)
+            logger.info("已打开要素库 %s %s", settings.feature_store_file.name, store.features.layers)
+        except (ValueError, sqlite3.Error) as e:
+            logger.warning("要素库不可用，/api/events/query 不可用: %s", e)
+
+    dem_file = settings.dem_dir / "merged_dem_cropped.tif"
+    if dem_file.exists():
+        store.dem = DemService(dem_file, cache_bytes=settings.terrain_cache_bytes)
+    else:
+        logger.warning("DEM不存在，/api/terrain/dem 不可用: %s", dem_file)
+
+    # 原始高程网格只做内存映射，不读入内存
+    elevation_file = settings.dem_dir / "elevation_grid.json"
+    if elevation_file.exists():
+        try:
+            store.elevation = ElevationGrid(elevation_file)
+            logger.info("已映射高程网格 %s", store.elevation.grid.shape)
+        except (OSError, ValueError) as e:
+            logger.warning("高程网格不可用: %s", e)
+    else:
+        logger.warning("高程网格不存在，/api/terrain/elevation 与 /profile 不可用: %s", elevation_file)
+
+    store.tiles = build_tile_service(store, settings)
+
+    return store
+
+
+def feature_collection(features: list, metadata: dict | None = None) -> bytes:
+    """序列化FeatureCollection"""
+    collection = {"type": "FeatureCollection", "features": features}
+    if metadata is not None:
+        collection["metadata"] = metadata
+    return dumps(collection)
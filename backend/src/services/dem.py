@@ -0,0 +1,160 @@
+"""
+DEM窗口读取服务
+只读取请求bbox对应的窗口（降采样时由GDAL自动选用overview），重采样到目标分辨率，
+编码为PNG灰度图或Terrain-RGB，并按（对齐后的bbox, 分辨率, 格式）缓存编码结果；
+ETag由DEM文件版本与同一组参数派生，条件请求无需渲染即可返回304
+"""
+
+import io
+import math
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .cache import LRUCache
+from ..utils.http import content_etag, derive_etag
+
+# bbox向外对齐的网格（度），约1km，使相近的平移请求命中同一缓存条目
+BBOX_SNAP_DEGREES = 0.01
+
+MIN_RESOLUTION = 16
+MAX_RESOLUTION = 2048
+
+
+@dataclass(frozen=True)
+class EncodedRaster:
+    """已编码的栅格结果"""
+    body: bytes
+    etag: str
+    bbox: tuple
+    width: int
+    height: int
+    elevation_min: float
+    elevation_max: float
+
+
+def snap_bbox(bbox: tuple, step: float = BBOX_SNAP_DEGREES) -> tuple:
+    """将bbox向外对齐到网格"""
+    minx, miny, maxx, maxy = bbox
+    return (
+        round(math.floor(minx / step) * step, 6),
+        round(math.floor(miny / step) * step, 6),
+        round(math.ceil(maxx / step) * step, 6),
+        round(math.ceil(maxy / step) * step, 6),
+    )
+
+
+def output_shape(bbox: tuple, resolution: int) -> tuple:
+    """
+    输出尺寸 (高, 宽): 长边为 resolution，短边按bbox地面宽高比（经度按中纬度余弦缩放）缩放
+
+    经纬度像元在高纬度东西向更窄，不做余弦修正时2:1的视口会被拉伸
+    """
+    minx, miny, maxx, maxy = bbox
+    ground_width = (maxx - minx) * math.cos(math.radians((miny + maxy) / 2))
+    ground_height = maxy - miny
+    if ground_width >= ground_height:
+        return max(1, round(resolution * ground_height / ground_width)), resolution
+    return resolution, max(1, round(resolution * ground_width / ground_height))
+
+
+def encode_terrain_rgb(elevation: np.ndarray) -> np.ndarray:
+    """Mapbox Terrain-RGB编码: height = -10000 + (R*65536 + G*256 + B) * 0.1"""
+    value = np.clip(np.rint((elevation + 10000.0) * 10.0), 0, 2 ** 24 - 1).astype(np.uint32)
+    return np.dstack([(value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF]).astype(np.uint8)
+
+
+def encode_grayscale(elevation: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    """按窗口内高程范围线性拉伸到0-255（与heightmap_2048.png的-scale一致）"""
+    span = hi - lo if hi > lo else 1.0
+    return np.clip((elevation - lo) / span * 255.0, 0, 255).astype(np.uint8)
+
+
+class DemService:
+    """merged_dem_cropped.tif 的窗口读取与编码缓存"""
+
+    def __init__(self, dem_file: Path, cache_bytes: int = 64 * 1024 * 1024):
+        import rasterio
+
+        self.dem_file = dem_file
+        stat = dem_file.stat()
+        self.version = content_etag(f"{dem_file.name}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+        with rasterio.open(dem_file) as src:
+            self.bounds = tuple(src.bounds)
+            self.nodata = src.nodata
+            self.overviews = src.overviews(1)
+        self.cache = LRUCache(cache_bytes, name="terrain")
+
+    def clip_to_bounds(self, bbox: tuple) -> tuple:
+        """将bbox裁剪到DEM范围内，完全不相交时抛出ValueError"""
+        left, bottom, right, top = self.bounds
+        clipped = (max(bbox[0], left), max(bbox[1], bottom), min(bbox[2], right), min(bbox[3], top))
+        if clipped[0] >= clipped[2] or clipped[1] >= clipped[3]:
+            raise ValueError("bbox 与DEM范围不相交")
+        return clipped
+
+    def window_bbox(self, bbox: tuple) -> tuple:
+        """实际输出的范围: 向外对齐后裁剪到DEM范围（与render一致），不相交时抛出ValueError"""
+        return self.clip_to_bounds(snap_bbox(bbox))
+
+    def etag(self, bbox: tuple, resolution: int, fmt: str = "png") -> str:
+        """响应ETag（DEM版本 + 对齐后的bbox + 分辨率 + 格式），不读取栅格"""
+        return derive_etag(self.version, *self.window_bbox(bbox), resolution, fmt)
+
+    def read_window(self, bbox: tuple, resolution: int) -> np.ndarray:
+        """读取bbox窗口并重采样为长边 resolution 的float32数组（见output_shape，无数据为NaN）"""
+        import rasterio
+        from rasterio.enums import Resampling
+        from rasterio.windows import from_bounds
+
+        with rasterio.open(self.dem_file) as src:
+            window = from_bounds(*bbox, transform=src.transform)
+            data = src.read(
+                1,
+                window=window,
+                out_shape=output_shape(bbox, resolution),
+                resampling=Resampling.bilinear,
+            ).astype(np.float32)
+
+        if self.nodata is not None:
+            data[data == self.nodata] = np.nan
+        return data
+
+    def render(self, bbox: tuple, resolution: int, fmt: str = "png") -> EncodedRaster:
+        """
+        返回编码后的高程图（优先命中缓存）
+
+        Args:
+            bbox: (minx, miny, maxx, maxy)，会先向外对齐再裁剪到DEM范围
+            resolution: 输出长边（像素），短边按bbox宽高比缩放
+            fmt: png | terrain-rgb
+        """
+        from PIL import Image
+
+        snapped = self.window_bbox(bbox)
+        key = (snapped, resolution, fmt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        elevation = self.read_window(snapped, resolution)
+        valid = ~np.isnan(elevation)
+        lo = float(elevation[valid].min()) if valid.any() else 0.0
+        hi = float(elevation[valid].max()) if valid.any() else 0.0
+        elevation[~valid] = lo
+
+        if fmt == "terrain-rgb":
+            image = Image.fromarray(encode_terrain_rgb(elevation))
+        else:
+            image = Image.fromarray(encode_grayscale(elevation, lo, hi))
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        body = buffer.getvalue()
+
+        result = EncodedRaster(body=body, etag=self.etag(bbox, resolution, fmt), bbox=snapped,
+                               width=elevation.shape[1], height=elevation.shape[0],
+                               elevation_min=lo, elevation_max=hi)
+        self.cache.put(key, result, len(body))
+        return result
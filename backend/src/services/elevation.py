@@ -0,0 +1,87 @@
+"""
+点高程与高程剖面服务
+在 build_elevation_grid.py 生成的内存映射int16网格上做向量化双线性采样，
+一次请求可查询数千个点或任意折线的剖面，请求路径上不解码GeoTIFF
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.geo import bilinear_sample, haversine_km
+
+MAX_POINTS = 10000
+MAX_PROFILE_SAMPLES = 4096
+DEFAULT_PROFILE_SAMPLES = 512
+
+
+class ElevationGrid:
+    """内存映射的原始高程网格（行自北向南，像元中心位于 west + (col + 0.5) * resolution）"""
+
+    def __init__(self, meta_file: Path):
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            self.metadata = json.load(f)
+        self.grid = np.load(meta_file.parent / self.metadata['file'], mmap_mode='r')
+        if list(self.grid.shape) != self.metadata['shape']:
+            raise ValueError(f"{self.metadata['file']} 形状 {self.grid.shape} 与元数据 {self.metadata['shape']} 不一致")
+        self.bounds = tuple(self.metadata['bounds'])
+        self.resolution = self.metadata['resolution']
+        self.nodata = self.metadata['nodata']
+
+    def sample(self, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        """
+        双线性插值高程（米）
+
+        四个邻近像元中的无数据像元不参与加权；范围外或四邻全为无数据时返回NaN
+
+        Args:
+            lons, lats: 等长的一维数组
+
+        Returns:
+            float64数组
+        """
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        west, _, _, north = self.bounds
+        cols = (lons - west) / self.resolution - 0.5
+        rows = (north - lats) / self.resolution - 0.5
+        return bilinear_sample(self.grid, rows, cols, self.nodata)
+
+    def profile(self, coordinates: np.ndarray, samples: int = DEFAULT_PROFILE_SAMPLES) -> dict:
+        """
+        折线高程剖面: 按累计距离等间隔取样
+
+        Args:
+            coordinates: (N, 2) 经纬度折线，N >= 2
+            samples: 取样点数
+
+        Returns:
+            {"length_km", "distance_km", "coordinates", "elevation", "min", "max", "ascent", "descent"}
+        """
+        lons, lats = coordinates[:, 0], coordinates[:, 1]
+        cumulative = np.concatenate([[0.0], np.cumsum(haversine_km(lons[:-1], lats[:-1], lons[1:], lats[1:]))])
+        distance = np.linspace(0.0, cumulative[-1], samples)
+        sample_lons = np.interp(distance, cumulative, lons)
+        sample_lats = np.interp(distance, cumulative, lats)
+        elevation = self.sample(sample_lons, sample_lats)
+
+        valid = elevation[~np.isnan(elevation)]
+        # 与无数据（NaN）取样点相邻的差值不计入爬升/下降，与 densify_routes.elevation_profile 一致
+        steps = np.diff(elevation)
+        steps = steps[np.isfinite(steps)]
+        return {
+            "length_km": round(float(cumulative[-1]), 4),
+            "distance_km": np.round(distance, 4).tolist(),
+            "coordinates": np.round(np.column_stack([sample_lons, sample_lats]), 6).tolist(),
+            "elevation": to_json_values(elevation),
+            "min": round(float(valid.min()), 1) if valid.size else None,
+            "max": round(float(valid.max()), 1) if valid.size else None,
+            "ascent": round(float(steps[steps > 0].sum()), 1),
+            "descent": round(float(-steps[steps < 0].sum()), 1),
+        }
+
+
+def to_json_values(elevation: np.ndarray) -> list:
+    """高程数组 → JSON列表（保留0.1米，NaN为null）"""
+    return [None if np.isnan(v) else v for v in np.round(elevation, 1).tolist()]
@@ -0,0 +1,97 @@
+"""
+嵌入式要素库（SQLite + R*Tree）只读查询
+数据由 scripts/feature_store.py 写入；查询走日期索引与R*Tree，
+只读取命中的行并直接拼接已序列化的Feature文本，不需要把整个数据集载入内存
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import date, timedelta
+
+from ..utils.http import content_etag, dumps
+
+# 与 scripts/feature_store.py 一致
+SCHEMA_VERSION = 1
+
+MAX_LIMIT = 10000
+
+
+class FeatureStore:
+    """只读要素库，每个线程持有独立连接（FastAPI同步端点运行在线程池中）"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._local = threading.local()
+
+        meta = dict(self._connection().execute("SELECT key, value FROM meta"))
+        version = int(meta.get("schema_version", 0))
+        if version != SCHEMA_VERSION:
+            raise ValueError(f"{path.name} 表结构版本为 {version}，需要 {SCHEMA_VERSION}，请重新运行管线脚本")
+        self.layers = {key.split(':')[1]: int(value) for key, value in meta.items()
+                       if key.startswith("layer:") and key.endswith(":count")}
+        self.max_span = {key.split(':')[1]: int(value) for key, value in meta.items()
+                         if key.startswith("layer:") and key.endswith(":max_span_days")}
+        # 以元数据（含生成时间）作为ETag，避免启动时哈希整个数据库文件
+        self.etag = content_etag(repr(sorted(meta.items())).encode('utf-8'))
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def query(self, layer: str, start: str | None = None, end: str | None = None,
+              bbox: tuple | None = None, feature_type: str | None = None,
+              limit: int = 1000, offset: int = 0) -> tuple:
+        """
+        按时间区间/范围过滤
+
+        Args:
+            layer: 图层名
+            start, end: ISO日期，与要素的 [start_date, end_date] 有交集即命中
+            bbox: (minx, miny, maxx, maxy)，与要素外包框相交即命中
+            feature_type: 事件类型
+            limit, offset: 分页
+
+        Returns:
+            (已序列化的Feature文本列表, 是否还有更多结果)
+        """
+        sql = ["SELECT f.feature FROM features f"]
+        where = ["f.layer = ?"]
+        params = [layer]
+
+        if bbox is not None:
+            sql.append("JOIN features_rtree r ON r.fid = f.fid")
+            minx, miny, maxx, maxy = bbox
+            where += ["r.min_lon <= ?", "r.max_lon >= ?", "r.min_lat <= ?", "r.max_lat >= ?"]
+            params += [maxx, minx, maxy, miny]
+        if start is not None:
+            # start_date >= start - 最大跨度 与 end_date >= start 等价，但可以走索引范围扫描
+            lower = date.fromisoformat(start) - timedelta(days=self.max_span.get(layer, 0))
+            where += ["f.start_date >= ?", "f.end_date >= ?"]
+            params += [lower.isoformat(), start]
+        if end is not None:
+            where.append("f.start_date <= ?")
+            params.append(end)
+        if feature_type is not None:
+            where.append("f.type = ?")
+            params.append(feature_type)
+
+        limit = min(limit, MAX_LIMIT)
+        sql.append("WHERE " + " AND ".join(where))
+        sql.append("ORDER BY f.start_date, f.id LIMIT ? OFFSET ?")
+        # 多取一行判断是否还有下一页
+        params += [limit + 1, offset]
+
+        rows = [text for (text,) in self._connection().execute(" ".join(sql), params)]
+        return rows[:limit], len(rows) > limit
+
+
+def feature_collection_text(features: list, metadata: dict | None = None) -> bytes:
+    """由已序列化的Feature文本拼接FeatureCollection，不经过JSON解析"""
+    body = '{"type":"FeatureCollection","features":[' + ",".join(features) + "]"
+    if metadata is not None:
+        body += ',"metadata":' + dumps(metadata).decode('utf-8')
+    return (body + "}").encode('utf-8')
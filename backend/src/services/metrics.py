@@ -0,0 +1,263 @@
+"""
+请求级指标与Prometheus文本格式输出
+按路由模板记录延迟/响应体大小直方图与条件请求（ETag）命中，
+缓存与产物加载指标在抓取时从 DataStore 读取，不在请求路径上额外计数
+（事件端点的ETag命中/未命中由请求中间件顺带累计）
+"""
+
+import time
+import threading
+
+# 延迟分桶（秒），0.1对应planA的<100ms目标
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# 事件端点路由前缀（cache="events" 的命中统计范围）
+EVENTS_ROUTE = "/api/events"
+# 响应体大小分桶（字节）
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if value != int(value) else f"{value:.1f}"
+    return str(value)
+
+
+class Counter:
+    """按标签组合累加的计数器"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> list:
+        with self._lock:
+            return [(self.name, _labels(self.labels, key), value) for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """固定分桶直方图（累计桶 + _sum + _count）"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            counts = entry[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> list:
+        result = []
+        with self._lock:
+            items = sorted((key, [list(v[0]), v[1], v[2]]) for key, v in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                result.append((f"{self.name}_bucket", _labels(self.labels, key, f'le="{bound}"'), cumulative))
+            result.append((f"{self.name}_bucket", _labels(self.labels, key, 'le="+Inf"'), count))
+            result.append((f"{self.name}_sum", _labels(self.labels, key), total))
+            result.append((f"{self.name}_count", _labels(self.labels, key), count))
+        return result
+
+
+class Gauge:
+    """抓取时计算的瞬时值"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.values = {}
+
+    def samples(self) -> list:
+        return [(self.name, _labels(self.labels, key), value) for key, value in sorted(self.values.items())]
+
+
+class SnapshotCounter(Gauge):
+    """抓取时从外部累计值读取的计数器（如缓存命中次数），按counter类型输出"""
+
+    kind = "counter"
+
+
+class Metrics:
+    """应用级指标注册表，挂在 app.state.metrics 上"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.request_duration = Histogram("http_request_duration_seconds", "请求处理耗时（到响应体发送完毕）",
+                                          ("method", "route", "status"))
+        self.response_size = Histogram("http_response_size_bytes", "响应体字节数（压缩后）",
+                                       ("method", "route"), SIZE_BUCKETS)
+        self.conditional = Counter("http_conditional_requests_total",
+                                   "带If-None-Match的请求，result=hit表示304", ("route", "result"))
+        # 事件端点的响应缓存: 304为命中，200（生成/直出响应体）为未命中
+        self._events_cache = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, size: int,
+                        conditional: bool):
+        self.request_duration.observe(seconds, method, route, str(status))
+        self.response_size.observe(size, method, route)
+        if conditional:
+            self.conditional.inc(route, "hit" if status == 304 else "miss")
+        if route.startswith(EVENTS_ROUTE) and status in (200, 304):
+            with self._lock:
+                self._events_cache["hits" if status == 304 else "misses"] += 1
+
+    def events_cache_stats(self, store) -> dict:
+        """
+        事件缓存统计: 命中/未命中来自事件端点的ETag重新验证，
+        条目/字节为常驻内存的预序列化响应体（事件产物 + 章节快照），启动后不会淘汰
+        """
+        with self._lock:
+            stats = dict(self._events_cache)
+        bodies = []
+        if store is not None and "events" in store.artifacts:
+            bodies.append(store.artifacts["events"].raw)
+        if store is not None and store.keyframes is not None:
+            bodies.extend(store.keyframes.snapshots.values())
+        stats.update(entries=len(bodies), bytes=sum(len(b) for b in bodies), evictions=0)
+        return stats
+
+    def store_metrics(self, store) -> list:
+        """从DataStore读取缓存统计与产物加载信息"""
+        cache_hits = SnapshotCounter("cache_hits_total", "缓存命中次数", ("cache",))
+        cache_misses = SnapshotCounter("cache_misses_total", "缓存未命中次数", ("cache",))
+        cache_evictions = SnapshotCounter("cache_evictions_total", "缓存淘汰次数", ("cache",))
+        cache_entries = Gauge("cache_entries", "缓存条目数", ("cache",))
+        cache_bytes = Gauge("cache_bytes", "缓存占用字节数", ("cache",))
+        cache_max_bytes = Gauge("cache_max_bytes", "缓存容量上限", ("cache",))
+        load_seconds = Gauge("artifact_load_seconds", "启动时产物读取与解析耗时", ("artifact",))
+        artifact_bytes = Gauge("artifact_size_bytes", "产物文件大小", ("artifact",))
+
+        caches = {"events": self.events_cache_stats(store)}
+        if store is not None and store.dem is not None:
+            caches["terrain"] = store.dem.cache.stats()
+        if store is not None and store.tiles is not None:
+            caches["tiles"] = store.tiles.cache.stats()
+        for name, stats in caches.items():
+            cache_hits.values[(name,)] = stats["hits"]
+            cache_misses.values[(name,)] = stats["misses"]
+            cache_evictions.values[(name,)] = stats["evictions"]
+            cache_entries.values[(name,)] = stats["entries"]
+            cache_bytes.values[(name,)] = stats["bytes"]
+            # 事件响应体常驻内存，没有容量上限
+            if "max_bytes" in stats:
+                cache_max_bytes.values[(name,)] = stats["max_bytes"]
+
+        for name, artifact in (store.artifacts.items() if store is not None else []):
+            load_seconds.values[(name,)] = artifact.load_seconds
+            artifact_bytes.values[(name,)] = len(artifact.raw)
+
+        return [cache_hits, cache_misses, cache_evictions, cache_entries, cache_bytes, cache_max_bytes,
+                load_seconds, artifact_bytes]
+
+    def render(self, store=None) -> bytes:
+        """Prometheus文本格式（0.0.4）"""
+        uptime = Gauge("process_uptime_seconds", "服务运行时长")
+        uptime.values[()] = time.time() - self.started
+        families = [self.request_duration, self.response_size, self.conditional, uptime]
+        families += self.store_metrics(store)
+
+        lines = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for name, labels, value in family.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def route_template(scope) -> str:
+    """
+    请求对应的路由模板（如 /api/events/{event_id}、/maps/{path}），未匹配时为 "unmatched"
+
+    部分FastAPI版本中被include的路由不带前缀，这里用实际路径减去按参数还原的路由路径得到前缀
+    """
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path_format"):
+        try:
+            concrete = route.path_format.format(**scope.get("path_params", {}))
+        except (KeyError, IndexError, ValueError):
+            return route.path
+        path = scope["path"]
+        prefix = path[:-len(concrete)] if concrete and path.endswith(concrete) else ""
+        return prefix + route.path
+    # 静态文件挂载（/story、/images、/maps）: 挂载点写入root_path
+    if scope.get("endpoint") is not None and scope.get("root_path"):
+        return scope["root_path"] + "/{path}"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    纯ASGI中间件: 记录每个HTTP请求的路由模板、状态码、耗时与发送的响应体字节数
+
+    路由模板在路由匹配后由scope得出（见route_template），
+    未匹配的请求统一记为 "unmatched"，避免任意路径造成标签基数膨胀
+    """
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        state = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            conditional = any(name == b"if-none-match" for name, _ in scope.get("headers", []))
+            self.metrics.observe_request(scope["method"], route_template(scope), state["status"],
+                                         time.perf_counter() - started, state["size"], conditional)
@@ -0,0 +1,148 @@
+"""
+Mapbox Vector Tile (v2.1) 编码器
+只实现本项目需要的子集（点/线、标量属性），直接写protobuf字节，不依赖额外库
+"""
+
+import struct
+
+POINT = 1
+LINESTRING = 2
+POLYGON = 3
+
+DEFAULT_EXTENT = 4096
+
+_MOVE_TO = 1
+_LINE_TO = 2
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _length_delimited(field: int, payload: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(payload)) + payload
+
+
+def _packed(field: int, values) -> bytes:
+    return _length_delimited(field, b"".join(_varint(v) for v in values))
+
+
+def _encode_value(value) -> bytes:
+    if isinstance(value, bool):
+        return _key(7, 0) + _varint(int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return _key(5, 0) + _varint(value)
+        return _key(6, 0) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _key(3, 1) + struct.pack('<d', value)
+    return _length_delimited(1, str(value).encode('utf-8'))
+
+
+def _command(command_id: int, count: int) -> int:
+    return (command_id & 0x7) | (count << 3)
+
+
+def encode_geometry(geom_type: int, parts: list) -> list:
+    """
+    将瓦片坐标编码为几何命令序列
+
+    Args:
+        geom_type: POINT | LINESTRING
+        parts: 点要素为 [(x, y), ...]；线要素为 [[(x, y), ...], ...]（已量化为整数）
+    """
+    commands = []
+    cx = cy = 0
+
+    if geom_type == POINT:
+        commands.append(_command(_MOVE_TO, len(parts)))
+        for x, y in parts:
+            commands += [_zigzag(x - cx), _zigzag(y - cy)]
+            cx, cy = x, y
+        return commands
+
+    for line in parts:
+        if len(line) < 2:
+            continue
+        x, y = line[0]
+        commands += [_command(_MOVE_TO, 1), _zigzag(x - cx), _zigzag(y - cy)]
+        cx, cy = x, y
+        commands.append(_command(_LINE_TO, len(line) - 1))
+        for x, y in line[1:]:
+            commands += [_zigzag(x - cx), _zigzag(y - cy)]
+            cx, cy = x, y
+    return commands
+
+
+def encode_layer(name: str, features: list, extent: int = DEFAULT_EXTENT) -> bytes:
+    """
+    编码单个图层
+
+    Args:
+        name: 图层名
+        features: [{"id": int, "type": POINT|LINESTRING, "geometry": parts, "properties": dict}, ...]
+        extent: 瓦片坐标范围
+    """
+    keys, key_index = [], {}
+    values, value_index = [], {}
+    encoded_features = []
+
+    for feature in features:
+        commands = encode_geometry(feature['type'], feature['geometry'])
+        if not commands:
+            continue
+
+        tags = []
+        for key, value in feature.get('properties', {}).items():
+            if value is None or isinstance(value, (list, dict)):
+                continue
+            if key not in key_index:
+                key_index[key] = len(keys)
+                keys.append(key)
+            value_key = (type(value).__name__, value)
+            if value_key not in value_index:
+                value_index[value_key] = len(values)
+                values.append(value)
+            tags += [key_index[key], value_index[value_key]]
+
+        body = b""
+        if feature.get('id') is not None:
+            body += _key(1, 0) + _varint(feature['id'])
+        if tags:
+            body += _packed(2, tags)
+        body += _key(3, 0) + _varint(feature['type'])
+        body += _packed(4, commands)
+        encoded_features.append(body)
+
+    layer = _key(15, 0) + _varint(2)
+    layer += _length_delimited(1, name.encode('utf-8'))
+    for body in encoded_features:
+        layer += _length_delimited(2, body)
+    for key in keys:
+        layer += _length_delimited(3, key.encode('utf-8'))
+    for value in values:
+        layer += _length_delimited(4, _encode_value(value))
+    layer += _key(5, 0) + _varint(extent)
+    return layer
+
+
+def encode_tile(layers: dict, extent: int = DEFAULT_EXTENT) -> bytes:
+    """编码整块瓦片: {图层名: features}"""
+    return b"".join(_length_delimited(3, encode_layer(name, features, extent))
+                    for name, features in layers.items())
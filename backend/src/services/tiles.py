@@ -0,0 +1,294 @@
+"""
+矢量瓦片服务
+启动时将事件/等高线要素转换为Web Mercator归一化坐标并建立逐级瓦片索引，
+请求时只对索引命中的要素做裁剪、简化与量化，编码结果写入有容量上限的磁盘LRU缓存
+"""
+
+import json
+import os
+import threading
+import logging
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from . import mvt
+
+logger = logging.getLogger(__name__)
+
+# 建立完整索引的最大级别，更高级别从该级祖先瓦片的候选集中按bbox过滤
+INDEX_MAX_ZOOM = 8
+MAX_ZOOM = 14
+
+# 瓦片缓冲区（瓦片坐标单位），避免线要素在瓦片边界处断开
+TILE_BUFFER = 64
+
+# 等高线按高程决定最小显示级别: (高程整除数, 最小级别)
+CONTOUR_ZOOM_RULES = [(500, 0), (200, 7), (100, 9)]
+CONTOUR_DEFAULT_MIN_ZOOM = 11
+
+
+def lonlat_to_world(coords: np.ndarray) -> np.ndarray:
+    """经纬度 → Web Mercator归一化坐标（[0,1]，y轴向下）"""
+    lon = coords[:, 0]
+    lat = np.clip(coords[:, 1], -85.0511, 85.0511)
+    x = (lon + 180.0) / 360.0
+    y = 0.5 - np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) / (2 * np.pi)
+    return np.column_stack([x, y])
+
+
+def contour_min_zoom(properties: dict) -> int:
+    """按高程确定等高线的最小显示级别（低级别只显示主曲线）"""
+    elevation = properties.get('elevation')
+    if elevation is None:
+        return CONTOUR_DEFAULT_MIN_ZOOM
+    for divisor, zoom in CONTOUR_ZOOM_RULES:
+        if elevation % divisor == 0:
+            return zoom
+    return CONTOUR_DEFAULT_MIN_ZOOM
+
+
+def _geometry_parts(geometry: dict) -> list:
+    """将GeoJSON几何拆为坐标序列列表"""
+    geom_type = geometry['type']
+    coordinates = geometry['coordinates']
+    if geom_type == 'Point':
+        return [[coordinates]]
+    if geom_type in ('LineString', 'MultiPoint'):
+        return [coordinates] if geom_type == 'LineString' else [[c] for c in coordinates]
+    if geom_type == 'MultiLineString':
+        return coordinates
+    raise ValueError(f"不支持的几何类型: {geom_type}")
+
+
+class TileLayer:
+    """单个图层的预处理要素与逐级瓦片索引"""
+
+    def __init__(self, name: str, features: list, geom_type: int, etag: str, min_zoom_of=None):
+        self.name = name
+        self.geom_type = geom_type
+        self.etag = etag
+        self.parts = []
+        self.properties = []
+
+        bounds = []
+        min_zooms = []
+        for feature in features:
+            geometry = feature.get('geometry')
+            if not geometry or geometry.get('coordinates') is None:
+                continue
+            try:
+                parts = [lonlat_to_world(np.asarray(p, dtype=np.float64)[:, :2])
+                         for p in _geometry_parts(geometry) if len(p)]
+            except (ValueError, IndexError, TypeError):
+                continue
+            if not parts:
+                continue
+            stacked = np.concatenate(parts)
+            bounds.append([*stacked.min(axis=0), *stacked.max(axis=0)])
+            self.parts.append(parts)
+            props = {k: v for k, v in feature.get('properties', {}).items()
+                     if v is not None and not isinstance(v, (list, dict))}
+            self.properties.append(props)
+            min_zooms.append(min_zoom_of(props) if min_zoom_of else 0)
+
+        self.bounds = np.array(bounds, dtype=np.float64).reshape(-1, 4)
+        self.min_zoom = np.array(min_zooms, dtype=np.int8)
+        self.index = self._build_index()
+
+    def _build_index(self) -> dict:
+        """为0..INDEX_MAX_ZOOM逐级建立 (x, y) → 要素下标 的索引"""
+        index = {}
+        for z in range(INDEX_MAX_ZOOM + 1):
+            n = 2 ** z
+            pad = TILE_BUFFER / mvt.DEFAULT_EXTENT
+            x0 = np.clip(np.floor(self.bounds[:, 0] * n - pad), 0, n - 1).astype(np.int64)
+            y0 = np.clip(np.floor(self.bounds[:, 1] * n - pad), 0, n - 1).astype(np.int64)
+            x1 = np.clip(np.floor(self.bounds[:, 2] * n + pad), 0, n - 1).astype(np.int64)
+            y1 = np.clip(np.floor(self.bounds[:, 3] * n + pad), 0, n - 1).astype(np.int64)
+
+            buckets = {}
+            for i in np.flatnonzero(self.min_zoom <= z):
+                for tx in range(x0[i], x1[i] + 1):
+                    for ty in range(y0[i], y1[i] + 1):
+                        buckets.setdefault((tx, ty), []).append(i)
+            index[z] = {key: np.array(ids, dtype=np.int64) for key, ids in buckets.items()}
+        return index
+
+    def candidates(self, z: int, x: int, y: int) -> np.ndarray:
+        """返回可能落入瓦片的要素下标"""
+        if z <= INDEX_MAX_ZOOM:
+            return self.index[z].get((x, y), np.empty(0, dtype=np.int64))
+
+        shift = z - INDEX_MAX_ZOOM
+        ids = self.index[INDEX_MAX_ZOOM].get((x >> shift, y >> shift), np.empty(0, dtype=np.int64))
+        if not len(ids):
+            return ids
+
+        n = 2 ** z
+        pad = TILE_BUFFER / mvt.DEFAULT_EXTENT
+        b = self.bounds[ids] * n
+        hit = ((b[:, 2] >= x - pad) & (b[:, 0] <= x + 1 + pad) &
+               (b[:, 3] >= y - pad) & (b[:, 1] <= y + 1 + pad) &
+               (self.min_zoom[ids] <= z))
+        return ids[hit]
+
+    def render(self, z: int, x: int, y: int) -> list:
+        """裁剪、简化并量化候选要素，返回mvt.encode_layer所需的要素列表"""
+        from shapely import clip_by_rect
+        from shapely.geometry import LineString
+
+        extent = mvt.DEFAULT_EXTENT
+        scale = (2 ** z) * extent
+        origin = np.array([x * extent, y * extent], dtype=np.float64)
+        lo, hi = -TILE_BUFFER, extent + TILE_BUFFER
+
+        features = []
+        for i in self.candidates(z, x, y):
+            tile_parts = [part * scale - origin for part in self.parts[i]]
+
+            if self.geom_type == mvt.POINT:
+                points = np.rint(np.concatenate(tile_parts)).astype(np.int64)
+                inside = ((points >= 0) & (points < extent)).all(axis=1)
+                if inside.any():
+                    features.append({"id": int(i) + 1, "type": mvt.POINT,
+                                     "geometry": [tuple(p) for p in points[inside].tolist()],
+                                     "properties": self.properties[i]})
+                continue
+
+            lines = []
+            for part in tile_parts:
+                if len(part) < 2:
+                    continue
+                clipped = clip_by_rect(LineString(part), lo, lo, hi, hi)
+                if clipped.is_empty:
+                    continue
+                clipped = clipped.simplify(0.5)
+                geoms = getattr(clipped, 'geoms', [clipped])
+                for geom in geoms:
+                    q = np.rint(np.asarray(geom.coords)).astype(np.int64)
+                    if len(q) < 2:
+                        continue
+                    keep = np.concatenate([[True], np.any(q[1:] != q[:-1], axis=1)])
+                    q = q[keep]
+                    if len(q) >= 2:
+                        lines.append([tuple(p) for p in q.tolist()])
+            if lines:
+                features.append({"id": int(i) + 1, "type": mvt.LINESTRING,
+                                 "geometry": lines, "properties": self.properties[i]})
+        return features
+
+
+class DiskTileCache:
+    """磁盘瓦片缓存，按总字节数上限以LRU顺序淘汰（访问时更新mtime）"""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if root.exists():
+            files = sorted(root.rglob("*.mvt"), key=lambda p: p.stat().st_mtime)
+            for path in files:
+                size = path.stat().st_size
+                self._entries[path] = size
+                self.current_bytes += size
+            self._evict()
+
+    def get(self, path: Path) -> bytes | None:
+        with self._lock:
+            if path not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            with self._lock:
+                self.current_bytes -= self._entries.pop(path, 0)
+            return None
+
+    def put(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self.current_bytes -= self._entries.pop(path, 0)
+            self._entries[path] = len(data)
+            self.current_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            path, size = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class TileService:
+    """图层注册表 + 磁盘缓存"""
+
+    def __init__(self, cache_dir: Path, cache_bytes: int):
+        self.layers = {}
+        self.cache = DiskTileCache(cache_dir, cache_bytes)
+
+    def add_layer(self, layer: TileLayer, alias: str | None = None):
+        self.layers[layer.name] = layer
+        if alias:
+            self.layers[alias] = layer
+
+    def tile(self, layer_name: str, z: int, x: int, y: int) -> bytes:
+        """返回编码后的瓦片（优先读磁盘缓存）"""
+        layer = self.layers[layer_name]
+        path = self.cache.root / layer.etag.strip('"')[:16] / layer.name / str(z) / str(x) / f"{y}.mvt"
+
+        data = self.cache.get(path)
+        if data is None:
+            data = mvt.encode_tile({layer.name: layer.render(z, x, y)})
+            self.cache.put(path, data)
+        return data
+
+
+def build_tile_service(store, settings) -> TileService:
+    """从已加载的DataStore构建瓦片图层"""
+    service = TileService(settings.tile_cache_dir, settings.tile_cache_bytes)
+
+    if store.events is not None:
+        service.add_layer(TileLayer("events", store.events.features, mvt.POINT,
+                                    store.etag("events")))
+
+    if store.contours:
+        default_interval = 100 if 100 in store.contours else min(store.contours)
+        for interval, artifact in sorted(store.contours.items()):
+            collection = json.loads(artifact.raw)
+            layer = TileLayer(f"contours_{interval}", collection.get('features', []),
+                              mvt.LINESTRING, artifact.etag, min_zoom_of=contour_min_zoom)
+            service.add_layer(layer, alias="contours" if interval == default_interval else None)
+            logger.info("等高线瓦片索引: %s (%d 条)", layer.name, len(layer.parts))
+
+    return service
+
+
+def tile_in_range(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
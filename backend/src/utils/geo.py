@@ -0,0 +1,60 @@
+"""
+大圆距离与栅格双线性采样
+纯numpy实现，API服务（services/elevation.py）与处理脚本（经 scripts/raster_utils.py）共用同一份
+"""
+
+import numpy as np
+
+# 地球平均半径（km）
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lon1, lat1, lon2, lat2):
+    """计算大圆距离（km），支持numpy数组广播"""
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def bilinear_sample(grid: np.ndarray, rows: np.ndarray, cols: np.ndarray, nodata=None) -> np.ndarray:
+    """
+    双线性插值（像元中心位于整数行列）
+
+    四个邻近像元中的无数据像元（等于nodata或NaN）不参与加权；
+    超出 [-0.5, 边长-0.5] 范围或四邻全为无数据时返回NaN
+
+    Args:
+        grid: 二维数组（可为内存映射，花式索引只触及四邻所在的页面）
+        rows, cols: 等长的浮点行列坐标
+
+    Returns:
+        float64数组
+    """
+    rows = np.asarray(rows, dtype=np.float64)
+    cols = np.asarray(cols, dtype=np.float64)
+    height, width = grid.shape
+
+    inside = (cols >= -0.5) & (rows >= -0.5) & (cols <= width - 0.5) & (rows <= height - 0.5)
+    x = np.clip(cols, 0, width - 1)
+    y = np.clip(rows, 0, height - 1)
+    col0 = np.clip(np.floor(x).astype(np.int64), 0, max(width - 2, 0))
+    row0 = np.clip(np.floor(y).astype(np.int64), 0, max(height - 2, 0))
+    col1 = np.minimum(col0 + 1, width - 1)
+    row1 = np.minimum(row0 + 1, height - 1)
+    fx, fy = x - col0, y - row0
+
+    corners = np.stack([grid[row0, col0], grid[row0, col1],
+                        grid[row1, col0], grid[row1, col1]]).astype(np.float64)
+    weights = np.stack([(1 - fx) * (1 - fy), fx * (1 - fy), (1 - fx) * fy, fx * fy])
+    invalid = np.isnan(corners)
+    if nodata is not None:
+        invalid |= corners == nodata
+    weights[invalid] = 0.0
+    corners[invalid] = 0.0
+
+    total = weights.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values = (weights * corners).sum(axis=0) / total
+    values[(total <= 0) | ~inside] = np.nan
+    return values
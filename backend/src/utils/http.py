@@ -0,0 +1,76 @@
+"""
+HTTP工具：ETag生成、If-None-Match 条件请求处理、预序列化JSON响应与查询参数解析
+"""
+
+import json
+import math
+import hashlib
+from typing import Callable
+
+from fastapi import Request, Response
+
+# 客户端每次使用前都需要重新验证（304几乎零成本）
+CACHE_CONTROL = "no-cache"
+
+GEOJSON = "application/geo+json"
+
+
+def content_etag(raw: bytes) -> str:
+    """根据内容字节生成强ETag"""
+    return f'"{hashlib.sha256(raw).hexdigest()[:32]}"'
+
+
+def derive_etag(base: str, *parts) -> str:
+    """
+    由产物ETag和查询参数派生响应ETag
+
+    同一产物 + 同一参数必然序列化出相同字节，因此派生值仍可作为强ETag使用
+    """
+    key = "|".join([base.strip('"')] + [str(p) for p in parts])
+    return f'"{hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """判断请求的 If-None-Match 是否命中（按RFC 9110使用弱比较）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def dumps(payload) -> bytes:
+    """紧凑JSON序列化"""
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def cached_response(request: Request, etag: str, build: Callable[[], bytes],
+                    media_type: str = "application/json") -> Response:
+    """
+    条件响应：ETag命中时直接返回304，否则才调用build生成响应体
+
+    Args:
+        request: 当前请求
+        etag: 响应ETag
+        build: 生成响应体字节的回调（命中时不会被调用）
+        media_type: 响应类型
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=build(), media_type=media_type, headers=headers)
+
+
+def parse_bbox(text: str) -> tuple:
+    """解析 "minx,miny,maxx,maxy"，非法时抛出ValueError"""
+    parts = [float(v) for v in text.split(',')]
+    if len(parts) != 4:
+        raise ValueError("bbox 需要4个数: minx,miny,maxx,maxy")
+    if not all(math.isfinite(v) for v in parts):
+        raise ValueError("bbox 坐标必须是有限数值")
+    minx, miny, maxx, maxy = parts
+    if not (minx < maxx and miny < maxy):
+        raise ValueError("bbox 需满足 minx<maxx 且 miny<maxy")
+    return minx, miny, maxx, maxy
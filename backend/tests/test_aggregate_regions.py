@@ -0,0 +1,97 @@
+"""
+事件-行政区连接与区域聚合测试（两个相邻的合成区域）
+"""
+
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config import Settings
+from src.main import create_app
+
+gpd = pytest.importorskip("geopandas")
+shapely = pytest.importorskip("shapely")
+
+from aggregate_regions import assign_regions, build_region_aggregates, columns, save_region_aggregates  # noqa: E402
+
+
+@pytest.fixture
+def regions():
+    return gpd.GeoDataFrame({
+        "region_id": ["WEST", "EAST"],
+        "name": ["West", "East"],
+        "name_zh": ["西区", "东区"],
+        "admin": ["Test", "Test"],
+        "area_km2": [1000.0, 2000.0],
+    }, geometry=[shapely.box(30, 54, 31, 55), shapely.box(31, 54, 32, 55)], crs=4326)
+
+
+def event(event_id, lon, lat, day, **props):
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {"id": event_id, "date": day, **props}}
+
+
+@pytest.fixture
+def events():
+    return {"features": [
+        event("w1", 30.5, 54.5, "1812-08-17", french_troops=100000, russian_troops=50000,
+              french_casualties_total=7000, russian_killed=3000, russian_wounded=3000),
+        event("w2", 29.95, 54.5, "1812-08-18", french_troops=120000),   # 边界外0.05°，归最近区域
+        event("e1", 31.5, 54.5, "1812-08-24", russian_troops=40000),
+        # 联军（奥地利 + 萨克森）兵力计入奥地利列
+        event("e2", 31.6, 54.6, "1812-08-25", russian_troops=38000, coalition_austrian=18000,
+              coalition_saxon=16000, coalition_casualties_total=4000),
+        event("far", 25.0, 50.0, "1812-08-24", french_troops=1),          # 超出最近距离，不匹配
+        event("nan", None, None, "1812-08-24"),
+    ]}
+
+
+def test_assign_regions_strtree_and_nearest(regions):
+    lons = np.array([30.5, 31.5, 29.95, 31.0, 25.0])
+    lats = np.array([54.5, 54.5, 54.5, 54.5, 50.0])
+    result = assign_regions(lons, lats, regions.geometry.values)
+    assert result[:3].tolist() == [0, 1, 0]
+    assert result[3] in (0, 1)
+    assert result[4] == -1
+
+
+def test_build_region_aggregates(regions, events):
+    aggregates = build_region_aggregates(events, regions)
+
+    assert aggregates['event_regions'] == {"w1": "WEST", "w2": "WEST", "e1": "EAST", "e2": "EAST",
+                                           "far": None}
+    assert set(aggregates['regions']) == {"WEST", "EAST"}
+
+    cols = columns()
+    weeks = [dict(zip(cols, row)) for row in aggregates['periods']['week']]
+    assert [(r['region'], r['period_start'], r['events']) for r in weeks] == [
+        ("WEST", "1812-08-17", 2), ("EAST", "1812-08-24", 2)]
+    # 兵力取周期内最大值，伤亡累加
+    assert weeks[0]['french_troops'] == 120000
+    assert weeks[0]['french_casualties'] == 7000 and weeks[0]['russian_casualties'] == 6000
+    assert weeks[0]['troop_density'] == pytest.approx((120000 + 50000) / 1000.0)
+    assert weeks[1]['austrian_troops'] == 34000 and weeks[1]['austrian_casualties'] == 4000
+    assert weeks[1]['troop_density'] == pytest.approx((40000 + 34000) / 2000.0)
+
+    months = aggregates['periods']['month']
+    assert [(row[0], row[1], row[2]) for row in months] == [("EAST", "1812-08-01", 2), ("WEST", "1812-08-01", 2)]
+
+
+def test_regions_endpoint(tmp_path, regions, events):
+    save_region_aggregates(build_region_aggregates(events, regions),
+                           tmp_path / "statistics" / "region_aggregates.json")
+
+    with TestClient(create_app(Settings(data_dir=tmp_path))) as client:
+        body = client.get("/api/statistics/regions?period=week&start=1812-08-20").json()
+        # 起始日期落在周中间时包含该周
+        assert [row[0] for row in body['rows']] == ["WEST", "EAST"]
+        assert body['columns'] == columns()
+
+        east = client.get("/api/statistics/regions?period=month&region=EAST").json()
+        assert [row[0] for row in east['rows']] == ["EAST"]
+        assert east['regions'] == {"EAST": {"name": "East", "name_zh": "东区", "admin": "Test", "area_km2": 2000.0}}
+
+        assert client.get("/api/statistics/regions?region=NOWHERE").status_code == 404
+        assert client.get("/api/statistics/regions?period=year").status_code == 422
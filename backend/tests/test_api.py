@@ -0,0 +1,139 @@
+"""
+API端点测试（使用仓库内已生成的 data/ 产物）
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import create_app
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(create_app()) as c:
+        yield c
+
+
+def test_events_endpoint(client):
+    response = client.get("/api/events?start=1812-06-24&end=1812-12-14")
+    assert response.status_code == 200
+    assert len(response.json()['features']) > 0
+
+
+def test_events_date_range(client):
+    features = client.get("/api/events?start=1812-09-07&end=1812-09-15").json()['features']
+    assert [f['properties']['id'] for f in features] == ["evt_005", "evt_006", "evt_007"]
+
+
+def test_events_etag_not_modified(client):
+    first = client.get("/api/events")
+    etag = first.headers["etag"]
+    assert etag.startswith('"')
+
+    second = client.get("/api/events", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+    ranged = client.get("/api/events?start=1812-09-07", headers={"If-None-Match": etag})
+    assert ranged.status_code == 200
+    assert ranged.headers["etag"] != etag
+
+
+def test_troops_statistics_slice(client):
+    data = client.get("/api/statistics/troops?start=1812-06-24&end=1812-06-28&faction=french").json()
+    assert list(data) == ["french"]
+    assert data["french"][0] == {"date": "1812-06-24", "count": 685000}
+    assert data["french"][-1] == {"date": "1812-06-28", "count": 650000}
+
+
+def test_troops_outside_series_is_empty(client):
+    assert client.get("/api/statistics/troops?start=1812-12-20&faction=french").json() == {"french": []}
+    assert client.get("/api/statistics/troops?end=1812-06-01&faction=french").json() == {"french": []}
+
+
+def test_troops_unknown_faction(client):
+    assert client.get("/api/statistics/troops?faction=prussian").status_code == 404
+
+
+def test_movements_lod(client):
+    features = client.get("/api/movements?unit=french&lod=3").json()['features']
+    assert len(features) == 1
+    assert features[0]['properties']['lod'] == 3
+
+
+def test_contours_missing_interval(client):
+    assert client.get("/api/terrain/contours?interval=7").status_code == 404
+
+
+def test_events_delta_forward_and_backward(client):
+    forward = client.get("/api/events/delta?from=1812-09-07&to=1812-09-14").json()
+    assert forward["direction"] == "forward"
+    assert [f['properties']['id'] for f in forward["enter"]] == ["evt_006"]
+    assert forward["leave"] == []
+
+    backward = client.get("/api/events/delta?from=1812-09-14&to=1812-09-07").json()
+    assert backward["enter"] == []
+    assert backward["leave"] == ["evt_006"]
+    assert backward["visible_count"] == forward["visible_count"] - 1
+
+
+def test_chapter_keyframes(client):
+    keyframes = client.get("/api/events/keyframes").json()
+    assert keyframes[0]["id"] == "ch01"
+
+    snapshot = client.get("/api/events/keyframes/ch04").json()
+    assert snapshot["features"][-1]["properties"]["id"] == "evt_005"
+    assert client.get("/api/events/keyframes/ch99").status_code == 404
+
+
+def test_chapter_keyframes_include_own_events(client):
+    for chapter in client.get("/api/events/keyframes").json():
+        snapshot = client.get(f"/api/events/keyframes/{chapter['id']}").json()
+        visible = {f['properties']['id'] for f in snapshot['features']}
+        assert set(chapter['event_ids']) <= visible, chapter['id']
+
+
+def test_keyframe_cutoff_covers_late_events():
+    from src.services.data_loader import EventIndex, Keyframes
+
+    events = EventIndex({"features": [
+        {"properties": {"id": "a", "date": "1812-08-16"}},
+        {"properties": {"id": "b", "date": "1812-08-17"}},
+    ]})
+    keyframes = Keyframes([{"id": "c", "date": "1812-08-16", "event_ids": ["b"]}], events)
+    assert keyframes.chapters["c"]["visible_count"] == 2
+    assert json.loads(keyframes.snapshots["c"])["metadata"]["cutoff"] == "1812-08-17"
+
+
+def metric_value(text: str, sample: str) -> float:
+    """从Prometheus文本中取出某个样本的值（不存在时为0）"""
+    for line in text.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_exposition(client):
+    before = client.get("/metrics").text
+    etag = client.get("/api/events").headers["etag"]
+    client.get("/api/events", headers={"If-None-Match": etag})
+    client.get("/api/events/evt_005")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/events",status="304"}' in text
+    assert 'route="/api/events/{event_id}"' in text
+    assert 'http_conditional_requests_total{route="/api/events",result="hit"}' in text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    # 事件ETag命中/未命中与常驻响应体按 cache="events" 输出，累计值为counter类型
+    assert "# TYPE cache_hits_total counter" in text
+    hits, misses = 'cache_hits_total{cache="events"}', 'cache_misses_total{cache="events"}'
+    assert metric_value(text, hits) - metric_value(before, hits) == 1
+    assert metric_value(text, misses) - metric_value(before, misses) == 2
+    assert 'cache_evictions_total{cache="events"} 0' in text
+    assert 'cache_entries{cache="events"}' in text
+    assert 'cache_max_bytes{cache="events"}' not in text
@@ -0,0 +1,91 @@
+"""
+Natural Earth裁剪测试: 临时目录中构造小型Shapefile zip（与Natural Earth相同的大写字段名），
+检查外包框筛选、矩形裁剪、字段保留与分级输出
+"""
+
+import json
+import zipfile
+
+import pytest
+
+gpd = pytest.importorskip("geopandas")
+from shapely.geometry import Point, box, shape  # noqa: E402
+
+from clip_natural_earth import LAYERS, ZOOM_LEVELS, clip_natural_earth, project_bounds  # noqa: E402
+
+
+def write_zipped_shapefile(gdf, zip_path):
+    """写出Shapefile并打包为zip（只含shp/shx/dbf/prj/cpg，与Natural Earth的zip结构一致）"""
+    folder = zip_path.parent / zip_path.stem
+    folder.mkdir()
+    gdf.to_file(folder / f"{zip_path.stem}.shp")
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        for path in folder.iterdir():
+            archive.write(path, path.name)
+
+
+@pytest.fixture
+def boundaries(tmp_path):
+    directory = tmp_path / "boundaries"
+    directory.mkdir()
+
+    countries = gpd.GeoDataFrame({
+        "NAME": ["Inside", "Crossing", "Far"],
+        "ISO_A3": ["AAA", "BBB", "CCC"],
+        "POP_EST": [1, 2, 3],
+    }, geometry=[box(30, 53, 32, 55), box(40, 58, 50, 65), box(100, 10, 110, 20)], crs="EPSG:4326")
+    write_zipped_shapefile(countries, directory / LAYERS['countries']['file'])
+
+    places = gpd.GeoDataFrame({
+        "NAME": ["Moscow", "Paris"],
+        "SCALERANK": [0, 0],
+    }, geometry=[Point(37.6173, 55.7558), Point(2.35, 48.85)], crs="EPSG:4326")
+    write_zipped_shapefile(places, directory / LAYERS['places']['file'])
+    return directory
+
+
+def read_features(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['features']
+
+
+def test_clip_and_bbox_filter(boundaries, tmp_path):
+    output_dir = tmp_path / "basemap"
+    results = clip_natural_earth(boundaries, output_dir)
+
+    # 缺失的图层（provinces/rivers）被跳过
+    assert set(results) == {"countries", "places"}
+    assert results['countries']['features'] == 2
+    assert results['places']['features'] == 1
+    assert set(results['countries']['outputs']) == set(ZOOM_LEVELS)
+
+    west, south, east, north = project_bounds()
+    area = box(west, south, east, north)
+    for zoom in ZOOM_LEVELS:
+        countries = read_features(output_dir / f"countries_z{zoom}.geojson")
+        assert sorted(f['properties']['name'] for f in countries) == ["Crossing", "Inside"]
+        # 字段统一小写，只保留登记的列
+        assert set(countries[0]['properties']) == {"name", "iso_a3"}
+        for feature in countries:
+            assert area.buffer(1e-6).contains(shape(feature['geometry']))
+
+        crossing = next(f for f in countries if f['properties']['name'] == "Crossing")
+        minx, miny, maxx, maxy = shape(crossing['geometry']).bounds
+        assert (minx, miny) == pytest.approx((40, 58), abs=1e-3)
+        assert (maxx, maxy) == pytest.approx((east, north), abs=1e-3)
+
+        places = read_features(output_dir / f"places_z{zoom}.geojson")
+        assert [f['properties']['name'] for f in places] == ["Moscow"]
+
+
+def test_missing_sources_return_empty(tmp_path):
+    assert clip_natural_earth(tmp_path / "nothing", tmp_path / "basemap") == {}
+
+
+def test_inside_polygon_is_not_altered(boundaries, tmp_path):
+    output_dir = tmp_path / "basemap"
+    clip_natural_earth(boundaries, output_dir)
+    finest = max(ZOOM_LEVELS)
+    inside = next(f for f in read_features(output_dir / f"countries_z{finest}.geojson")
+                  if f['properties']['name'] == "Inside")
+    assert shape(inside['geometry']).symmetric_difference(box(30, 53, 32, 55)).area < 1e-6
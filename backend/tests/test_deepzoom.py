@@ -0,0 +1,76 @@
+"""
+深度缩放瓦片测试: DZI金字塔级数、瓦片重叠与边缘瓦片尺寸，GCP配准后的XYZ瓦片
+"""
+
+import json
+import math
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+from build_deepzoom import build_dzi, build_georeferenced_xyz, dzi_levels
+from raster_utils import tiles_covering
+
+Image = pytest.importorskip("PIL.Image")
+
+TILE, OVERLAP = 254, 1
+
+
+def test_dzi_levels_halve_down_to_one_pixel():
+    levels = dzi_levels(600, 300)
+    assert len(levels) == math.ceil(math.log2(600)) + 1
+    assert levels[-1] == (10, 600, 300)
+    assert levels[-2] == (9, 300, 150)
+    assert levels[0] == (0, 1, 1)
+
+
+def test_build_dzi_tiles(tmp_path):
+    source = tmp_path / "map.png"
+    Image.fromarray(np.random.default_rng(0).integers(0, 255, (300, 600, 3), dtype=np.uint8)).save(source)
+
+    dzi_file = build_dzi(source, tmp_path / "out", tile_size=TILE, overlap=OVERLAP, fmt="png", workers=1)
+    root = ET.parse(dzi_file).getroot()
+    assert (root.get("TileSize"), root.get("Overlap"), root.get("Format")) == (str(TILE), str(OVERLAP), "png")
+    size = root.find("{http://schemas.microsoft.com/deepzoom/2008}Size")
+    assert (size.get("Width"), size.get("Height")) == ("600", "300")
+
+    files = tmp_path / "out" / "map_files"
+    assert sorted(int(p.name) for p in files.iterdir()) == list(range(11))
+
+    def tile_size(level, col, row):
+        with Image.open(files / str(level) / f"{col}_{row}.png") as tile:
+            return tile.size
+
+    top = files / "10"
+    assert len(list(top.iterdir())) == 3 * 2
+    # 首列/首行只在一侧重叠，内部两侧重叠，末列/末行为剩余像素 + 左/上重叠
+    assert tile_size(10, 0, 0) == (TILE + OVERLAP, TILE + OVERLAP)
+    assert tile_size(10, 1, 0) == (TILE + 2 * OVERLAP, TILE + OVERLAP)
+    assert tile_size(10, 2, 1) == (600 - 2 * TILE + OVERLAP, 300 - TILE + OVERLAP)
+    assert tile_size(0, 0, 0) == (1, 1)
+    assert tile_size(8, 0, 0) == (150, 75)
+
+    # 重叠像素与相邻瓦片一致
+    with Image.open(files / "10" / "0_0.png") as left, Image.open(files / "10" / "1_0.png") as right:
+        a, b = np.asarray(left), np.asarray(right)
+    np.testing.assert_array_equal(a[:, TILE - OVERLAP:TILE + OVERLAP], b[:TILE + OVERLAP, 0:2 * OVERLAP])
+
+
+def test_georeferenced_xyz(tmp_path):
+    pytest.importorskip("rasterio")
+    Image.new("RGB", (200, 100), (120, 60, 30)).save(tmp_path / "scan.png")
+    corners = [(0, 0, 30.0, 56.0), (200, 0, 32.0, 56.0), (0, 100, 30.0, 55.0), (200, 100, 32.0, 55.0)]
+    gcp_file = tmp_path / "scan.gcps.json"
+    gcp_file.write_text(json.dumps({"image": "scan.png", "gcps": [
+        {"col": c, "row": r, "lon": lon, "lat": lat} for c, r, lon, lat in corners]}), encoding="utf-8")
+
+    target = build_georeferenced_xyz(gcp_file, tmp_path / "xyz", zooms=[7], workers=1)
+    tiles = sorted(target.glob("7/*/*.png"))
+    candidates = {(x, y) for x, y in tiles_covering((30.0, 55.0, 32.0, 56.0), 7)}
+    assert tiles and {(int(p.parent.name), int(p.stem)) for p in tiles} <= candidates
+
+    with Image.open(tiles[0]) as tile:
+        assert tile.size == (256, 256) and tile.mode == "RGBA"
+        alpha = np.asarray(tile)[..., 3]
+    assert alpha.any()
@@ -0,0 +1,122 @@
+"""
+DEM窗口服务测试（临时目录中的合成GeoTIFF）
+"""
+
+import io
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config import Settings
+from src.main import create_app
+from src.services.cache import LRUCache
+from src.services.dem import output_shape
+from src.utils.http import parse_bbox
+
+BOUNDS = (30.0, 54.0, 32.0, 56.0)
+SIZE = 200
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    rasterio = pytest.importorskip("rasterio")
+    from rasterio.transform import from_bounds
+
+    processed = tmp_path / "dem" / "processed"
+    processed.mkdir(parents=True)
+    rows, cols = np.mgrid[0:SIZE, 0:SIZE]
+    data = (100.0 + cols + rows * 0.5).astype(np.float32)
+    with rasterio.open(processed / "merged_dem_cropped.tif", 'w', driver='GTiff', width=SIZE, height=SIZE,
+                       count=1, dtype='float32', crs='EPSG:4326',
+                       transform=from_bounds(*BOUNDS, SIZE, SIZE), nodata=-9999.0) as dst:
+        dst.write(data, 1)
+    return tmp_path
+
+
+@pytest.fixture
+def client(data_dir):
+    with TestClient(create_app(Settings(data_dir=data_dir))) as c:
+        yield c
+
+
+def test_output_shape_keeps_ground_aspect():
+    # 55°N: 2°经度 × 1°纬度 的地面宽高比约 1.147
+    height, width = output_shape((30.0, 54.5, 32.0, 55.5), 512)
+    assert width == 512
+    assert height == round(512 / (2 * np.cos(np.radians(55.0))))
+    assert output_shape((30.0, 54.0, 30.5, 56.0), 256)[0] == 256
+
+
+def test_dem_endpoint_aspect_and_headers(client):
+    from PIL import Image
+
+    response = client.get("/api/terrain/dem?bbox=30.5,54.5,31.5,55&resolution=256")
+    assert response.status_code == 200
+    width, height = int(response.headers["x-width"]), int(response.headers["x-height"])
+    assert width == 256 and height == round(256 * 0.5 / np.cos(np.radians(54.75)))
+    image = Image.open(io.BytesIO(response.content))
+    assert image.size == (width, height)
+    assert float(response.headers["x-elevation-max"]) > float(response.headers["x-elevation-min"])
+
+    again = client.get("/api/terrain/dem?bbox=30.5,54.5,31.5,55&resolution=256",
+                       headers={"If-None-Match": response.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_dem_revalidation_skips_render(client, monkeypatch):
+    url = "/api/terrain/dem?bbox=30.5,54.5,31.5,55&resolution=256&format=terrain-rgb"
+    response = client.get(url)
+    assert response.status_code == 200
+    # 格式不同 → ETag不同
+    other = client.get(url.replace("terrain-rgb", "png"), headers={"If-None-Match": response.headers["etag"]})
+    assert other.status_code == 200 and other.headers["etag"] != response.headers["etag"]
+
+    # 编码缓存被淘汰后，命中ETag的请求也不能读取/编码栅格
+    dem = client.app.state.store.dem
+    dem.cache.clear()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("304 不应渲染")
+
+    monkeypatch.setattr(dem, "read_window", fail)
+    again = client.get(url, headers={"If-None-Match": response.headers["etag"]})
+    assert again.status_code == 304
+    for header in ("x-bbox", "x-width", "x-height"):
+        assert again.headers[header] == response.headers[header]
+    assert "x-elevation-min" not in again.headers
+
+
+def test_dem_endpoint_bbox_errors(client):
+    assert client.get("/api/terrain/dem?bbox=1,2,3").status_code == 400
+    assert client.get("/api/terrain/dem?bbox=31,55,30,56").status_code == 400
+    assert client.get("/api/terrain/dem?bbox=10,10,11,11").status_code == 400
+    assert client.get("/api/terrain/dem?bbox=a,b,c,d").status_code == 400
+    assert client.get("/api/terrain/dem?bbox=30,54,inf,55").status_code == 400
+    assert client.get("/api/terrain/dem?bbox=30,54,31,55&resolution=8").status_code == 422
+
+
+def test_parse_bbox_validation():
+    assert parse_bbox("30,54,31,55") == (30.0, 54.0, 31.0, 55.0)
+    for text in ("30,54,31", "31,54,30,55", "30,55,31,55", "30,54,inf,55", "-inf,54,31,55", "30,nan,31,55"):
+        with pytest.raises(ValueError):
+            parse_bbox(text)
+
+
+def test_lru_cache_eviction_and_bytes():
+    cache = LRUCache(100)
+    cache.put("a", 1, 40)
+    cache.put("b", 2, 40)
+    assert cache.get("a") == 1
+    cache.put("c", 3, 40)
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.current_bytes == 80
+    cache.put("a", 4, 10)
+    assert cache.current_bytes == 50 and cache.get("a") == 4
+    cache.put("huge", 5, 101)
+    assert "huge" not in cache
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["hits"] == 2 and stats["entries"] == 2
+    assert cache.get("missing") is None and cache.stats()["misses"] == 1
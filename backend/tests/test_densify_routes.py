@@ -0,0 +1,60 @@
+"""
+路线加密与DEM采样测试（临时目录中的合成GeoTIFF: 高程为经纬度的线性函数）
+"""
+
+import numpy as np
+import pytest
+
+from densify_routes import densify_segment, elevation_profile, sample_dem
+
+BOUNDS = (30.0, 50.0, 31.0, 51.0)
+SIZE = 100
+NODATA = -9999.0
+
+
+def plane(lons, lats):
+    return 100.0 + 200.0 * (np.asarray(lons) - 30.0) + 50.0 * (np.asarray(lats) - 50.0)
+
+
+@pytest.fixture
+def dem_file(tmp_path):
+    rasterio = pytest.importorskip("rasterio")
+    from rasterio.transform import from_bounds
+
+    resolution = (BOUNDS[2] - BOUNDS[0]) / SIZE
+    centers = np.arange(SIZE) + 0.5
+    lons = BOUNDS[0] + centers * resolution
+    lats = BOUNDS[3] - centers * resolution
+    data = plane(lons[None, :], lats[:, None]).astype(np.float32)
+    data[40:50, 40:50] = NODATA
+
+    path = tmp_path / "dem.tif"
+    with rasterio.open(path, 'w', driver='GTiff', width=SIZE, height=SIZE, count=1, dtype='float32',
+                       crs='EPSG:4326', transform=from_bounds(*BOUNDS, SIZE, SIZE), nodata=NODATA) as dst:
+        dst.write(data, 1)
+    return path
+
+
+def test_sample_dem_bilinear(dem_file):
+    lons = np.array([30.123, 30.777, 30.2, 32.0])
+    lats = np.array([50.321, 50.9, 50.15, 50.5])
+    # 小块尺寸使采样点分布在多个读取块中
+    elevations = sample_dem(dem_file, lons, lats, block_size=16)
+
+    np.testing.assert_allclose(elevations[:3], plane(lons[:3], lats[:3]), atol=1e-3)
+    assert np.isnan(elevations[3])
+
+
+def test_sample_dem_nodata_is_nan(dem_file):
+    elevations = sample_dem(dem_file, np.array([30.45]), np.array([50.55]))
+    assert np.isnan(elevations[0])
+
+
+def test_profile_skips_nan_gap():
+    lonlat = densify_segment((30.0, 50.0), (30.05, 50.0), spacing_km=1.0)[:5]
+    elevations = np.array([100.0, 110.0, np.nan, 130.0, 120.0])
+    profile = elevation_profile(lonlat, elevations)
+
+    assert profile['gain_m'] == [0.0, 10.0, 10.0, 10.0, 10.0]
+    assert profile['loss_m'] == [0.0, 0.0, 0.0, 0.0, 10.0]
+    assert profile['distance_km'][0] == 0.0 and profile['distance_km'][-1] > 0
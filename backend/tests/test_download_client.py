@@ -0,0 +1,107 @@
+"""
+共享下载客户端测试（本地不稳定HTTP服务模拟503、连接中断与Range续传）
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from download_client import DownloadClient, DownloadError
+
+PAYLOAD = os.urandom(512 * 1024)
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """按脚本依次返回: 503 → 发送一半后断开 → 正常（支持Range）"""
+
+    script = []
+    requests_seen = []
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        self.requests_seen.append((self.path, range_header))
+
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+
+        action = self.script.pop(0) if self.script else "ok"
+        if action == "503":
+            self.send_error(503)
+            return
+
+        start = int(range_header[len("bytes="):].rstrip("-")) if range_header else 0
+        body = PAYLOAD[start:]
+        self.send_response(206 if range_header else 200)
+        if range_header:
+            self.send_header("Content-Range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if action == "truncate":
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    FlakyHandler.script = []
+    FlakyHandler.requests_seen = []
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client():
+    with DownloadClient(timeout=(2, 5), retries=3, backoff_base=0.01) as c:
+        yield c
+
+
+def test_retries_then_succeeds(server, client, tmp_path):
+    FlakyHandler.script = ["503", "503"]
+    output = client.download(f"{server}/file.bin", tmp_path / "file.bin")
+
+    assert output.read_bytes() == PAYLOAD
+    assert len(FlakyHandler.requests_seen) == 3
+    assert not (tmp_path / "file.bin.part").exists()
+
+
+def test_resumes_after_truncation(server, client, tmp_path):
+    FlakyHandler.script = ["truncate"]
+    output = client.download(f"{server}/file.bin", tmp_path / "file.bin")
+
+    assert output.read_bytes() == PAYLOAD
+    assert FlakyHandler.requests_seen[0][1] is None
+    # 第二次请求从已写入的位置续传，而不是重新下载
+    resumed_from = int(FlakyHandler.requests_seen[1][1][len("bytes="):].rstrip("-"))
+    assert 0 < resumed_from <= len(PAYLOAD) // 2
+
+
+def test_not_found_is_not_retried(server, client, tmp_path):
+    with pytest.raises(DownloadError) as excinfo:
+        client.download(f"{server}/missing", tmp_path / "missing.bin")
+
+    assert excinfo.value.status_code == 404
+    assert len(FlakyHandler.requests_seen) == 1
+    assert not (tmp_path / "missing.bin").exists()
+
+
+def test_gives_up_after_retries(server, client, tmp_path):
+    FlakyHandler.script = ["503"] * 10
+    with pytest.raises(DownloadError) as excinfo:
+        client.download(f"{server}/file.bin", tmp_path / "file.bin")
+
+    assert excinfo.value.status_code == 503
+    assert len(FlakyHandler.requests_seen) == client.retries + 1
@@ -0,0 +1,87 @@
+"""
+行军边捆绑测试
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from build_edge_bundles import BundlingParameters, bundle_edges, cached_bundles, collect_edges, subdivide
+
+TIMELINE_FILE = Path(__file__).parent.parent / "data" / "1812_campaign_timeline.json"
+
+
+def parallel_edges(count: int = 40, spread: float = 100.0) -> np.ndarray:
+    offsets = np.linspace(-spread, spread, count)
+    return np.stack([np.column_stack([np.zeros(count), offsets]),
+                     np.column_stack([np.full(count, 1000.0), offsets])], axis=1)
+
+
+def test_subdivide_keeps_endpoints_and_spacing():
+    lines = np.array([[[0.0, 0.0], [3.0, 0.0], [3.0, 1.0]]])
+    result = subdivide(lines, 3)
+    np.testing.assert_allclose(result[0], [[0, 0], [1, 0], [2, 0], [3, 0], [3, 1]])
+
+
+def test_parallel_edges_bundle_together():
+    edges = parallel_edges()
+    bundled = bundle_edges(edges, params=BundlingParameters(samples=24))
+
+    np.testing.assert_allclose(bundled[:, 0], edges[:, 0])
+    np.testing.assert_allclose(bundled[:, -1], edges[:, 1])
+    middle = bundled[:, 12, 1]
+    assert middle.std() < 0.5 * edges[:, 0, 1].std()
+
+
+def test_directed_groups_do_not_attract():
+    edges = parallel_edges(count=2, spread=60.0)
+    edges[1] = edges[1, ::-1]
+    together = bundle_edges(edges, params=BundlingParameters(samples=24))
+    apart = bundle_edges(edges, groups=np.array([0, 1]), params=BundlingParameters(samples=24))
+
+    gap = lambda lines: abs(lines[0, 12, 1] - lines[1, 12, 1])
+    assert gap(together) < gap(apart)
+    np.testing.assert_allclose(gap(apart), 120.0, atol=1.0)
+
+
+def test_cached_bundles_reuses_result(tmp_path):
+    lonlat = np.array([[[24.0, 55.0], [30.0, 55.0]], [[24.0, 55.2], [30.0, 55.2]]])
+    weights, groups = np.array([1.0, 2.0]), np.zeros(2, dtype=np.int64)
+    params = BundlingParameters(samples=16, iterations=5)
+
+    first, key, cached = cached_bundles(lonlat, weights, groups, params, cache_dir=tmp_path)
+    assert not cached and (tmp_path / f"bundles_{key}.npy").exists()
+    second, key2, cached2 = cached_bundles(lonlat, weights, groups, params, cache_dir=tmp_path)
+    assert cached2 and key2 == key
+    np.testing.assert_array_equal(first, second)
+
+    _, key3, _ = cached_bundles(lonlat, weights, groups, BundlingParameters(samples=16, iterations=6),
+                                cache_dir=tmp_path)
+    assert key3 != key
+
+
+def test_collect_edges_main_army_and_units():
+    with open(TIMELINE_FILE, 'r', encoding='utf-8') as f:
+        timeline_data = json.load(f)
+    waypoints = [
+        {"faction": "french", "unit": "iv_corps", "date": "1812-07-01", "lon": 25.0, "lat": 54.5, "troops": 45000},
+        {"faction": "french", "unit": "iv_corps", "date": "1812-07-10", "lon": 27.0, "lat": 54.8},
+        {"faction": "french", "unit": "iv_corps", "date": "1812-07-20", "lon": 29.0, "lat": 55.0, "troops": 35000},
+        {"faction": "french", "unit": "iv_corps", "date": "1812-07-25", "lon": 28.5, "lat": 55.1, "troops": 34000},
+    ]
+    base = collect_edges(timeline_data)
+    edges = collect_edges(timeline_data, waypoints)
+
+    # 部队级路点单独成边，不改变阵营路线
+    units = [e for e in edges if e['unit'] == "iv_corps"]
+    assert [e for e in edges if e['unit'] is None] == base
+    assert [e['direction'] for e in units] == ["advance", "advance", "retreat"]
+    # 07-10 按日期插值: 45000 - 10000 * 9/19
+    np.testing.assert_allclose([e['weight'] for e in units], [45000.0, 45000.0 - 10000.0 * 9 / 19, 35000.0])
+
+    # 主力俄军不混入南翼兵力，方向与兵力流带一样只翻转一次
+    russian = [e for e in base if e['faction'] == "russian"]
+    assert 38000.0 not in [e['weight'] for e in russian]
+    directions = [e['direction'] for e in russian]
+    assert directions == sorted(directions, key=["retreat", "advance"].index)
@@ -0,0 +1,91 @@
+"""
+高程网格测试（临时目录中的合成网格: 高程为经纬度的线性函数，双线性插值应精确还原）
+"""
+
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config import Settings
+from src.main import create_app
+from src.services.elevation import ElevationGrid
+
+BOUNDS = [30.0, 50.0, 31.0, 51.0]
+RESOLUTION = 0.01
+NODATA = -32768
+
+
+def plane(lons, lats):
+    return 100.0 + 200.0 * (np.asarray(lons) - 30.0) + 50.0 * (np.asarray(lats) - 50.0)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    processed = tmp_path / "dem" / "processed"
+    processed.mkdir(parents=True)
+    centers = np.arange(100) + 0.5
+    lons = BOUNDS[0] + centers * RESOLUTION
+    lats = BOUNDS[3] - centers * RESOLUTION
+    grid = np.rint(plane(lons[None, :], lats[:, None])).astype(np.int16)
+    grid[40:42, 60:62] = NODATA
+    np.save(processed / "elevation_grid.npy", grid)
+    with open(processed / "elevation_grid.json", 'w', encoding='utf-8') as f:
+        json.dump({"file": "elevation_grid.npy", "shape": [100, 100], "dtype": "int16", "nodata": NODATA,
+                   "bounds": BOUNDS, "resolution": RESOLUTION}, f)
+    return tmp_path
+
+
+def test_bilinear_matches_plane(data_dir):
+    grid = ElevationGrid(data_dir / "dem" / "processed" / "elevation_grid.json")
+    rng = np.random.default_rng(0)
+    lons = rng.uniform(30.01, 30.5, 2000)
+    lats = rng.uniform(50.6, 50.99, 2000)
+
+    assert np.allclose(grid.sample(lons, lats), plane(lons, lats), atol=0.5)
+
+
+def test_profile_ignores_steps_across_nodata(tmp_path):
+    # 高程自西向东每列+10米，中间20列无数据: 跨过缺口的落差不能算作一次爬升
+    grid = np.tile(np.arange(100, dtype=np.int16) * 10, (100, 1))
+    grid[:, 40:60] = NODATA
+    np.save(tmp_path / "elevation_grid.npy", grid)
+    with open(tmp_path / "elevation_grid.json", 'w', encoding='utf-8') as f:
+        json.dump({"file": "elevation_grid.npy", "shape": [100, 100], "dtype": "int16", "nodata": NODATA,
+                   "bounds": BOUNDS, "resolution": RESOLUTION}, f)
+    elevation = ElevationGrid(tmp_path / "elevation_grid.json")
+
+    profile = elevation.profile(np.array([[30.005, 50.5], [30.995, 50.5]]), samples=100)
+    values = np.array([np.nan if v is None else v for v in profile['elevation']])
+    assert np.isnan(values).any()
+
+    steps = np.diff(values)
+    assert profile['ascent'] == pytest.approx(np.nansum(steps), abs=0.2)
+    assert profile['ascent'] < profile['max'] - profile['min'] - 150
+    assert profile['descent'] == 0
+
+
+def test_nodata_and_out_of_bounds(data_dir):
+    grid = ElevationGrid(data_dir / "dem" / "processed" / "elevation_grid.json")
+    # 无数据块中心: 四邻全为无数据; 块边缘: 只用有效邻点
+    values = grid.sample(np.array([30.61, 30.618, 29.0]), np.array([50.59, 50.585, 50.5]))
+
+    assert np.isnan(values[0])
+    assert np.isnan(values[2])
+    assert not np.isnan(values[1])
+
+
+def test_endpoints(data_dir):
+    with TestClient(create_app(Settings(data_dir=data_dir))) as client:
+        points = client.post("/api/terrain/elevation", json={"points": [[30.255, 50.745], [0, 0]]}).json()
+        assert points["elevation"][0] == pytest.approx(plane(30.255, 50.745), abs=0.5)
+        assert points["elevation"][1] is None
+
+        profile = client.post("/api/terrain/profile",
+                              json={"coordinates": [[30.1, 50.2], [30.9, 50.2]], "samples": 5}).json()
+        assert len(profile["elevation"]) == 5
+        assert profile["distance_km"][-1] == pytest.approx(profile["length_km"])
+        assert profile["ascent"] > 0 and profile["descent"] == 0
+
+        assert client.post("/api/terrain/profile", json={"coordinates": [[30.1, 50.2]]}).status_code == 422
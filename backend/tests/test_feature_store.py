@@ -0,0 +1,120 @@
+"""
+嵌入式要素库（SQLite + R*Tree）写入与查询测试
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from feature_store import feature_bounds, max_span_days, write_layer
+from src.config import Settings
+from src.main import create_app
+from src.services.feature_store import FeatureStore
+
+
+def point(event_id, lon, lat, day, event_type="battle"):
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {"id": event_id, "date": day, "type": event_type}}
+
+
+def route(route_id, coords, start, end):
+    return {"type": "Feature", "geometry": {"type": "LineString", "coordinates": coords},
+            "properties": {"id": route_id, "lod": 1, "start_date": start, "end_date": end}}
+
+
+EVENTS = [
+    point("vitebsk", 30.2, 55.2, "1812-07-28"),
+    point("smolensk", 32.0, 54.8, "1812-08-17"),
+    point("borodino", 35.8, 55.5, "1812-09-07"),
+    point("moscow", 37.6, 55.8, "1812-09-14", "occupation"),
+    point("unlocated", None, None, "1812-10-01"),
+    {"type": "Feature", "geometry": None, "properties": {"id": "no_geometry", "date": "1812-10-02"}},
+]
+
+
+@pytest.fixture
+def store_file(tmp_path):
+    path = tmp_path / "geojson" / "campaign.sqlite"
+    write_layer("events", EVENTS, path)
+    write_layer("movements", [
+        route("french", [[24.0, 54.9], [37.6, 55.8]], "1812-06-24", "1812-09-14"),
+        route("short", [[30.0, 55.0], [30.5, 55.1]], "1812-10-20", "1812-10-22"),
+    ], path)
+    return path
+
+
+def ids(texts):
+    return [json.loads(t)['properties']['id'] for t in texts]
+
+
+def test_feature_bounds():
+    assert feature_bounds({"type": "Point", "coordinates": [30.0, 55.0]}) == (30.0, 30.0, 55.0, 55.0)
+    assert feature_bounds({"type": "MultiLineString",
+                           "coordinates": [[[30, 54], [31, 56]], [[29, 55], [30, 55]]]}) == (29, 31, 54, 56)
+    assert feature_bounds({"type": "Point", "coordinates": [None, None]}) is None
+    assert feature_bounds({"type": "LineString", "coordinates": [[30, 55], [None, 56]]}) is None
+    assert feature_bounds({"type": "LineString", "coordinates": []}) is None
+
+
+def test_max_span_days():
+    rows = [("a", "1812-06-24", "1812-09-14"), ("b", "1812-10-20", "1812-10-22")]
+    assert max_span_days(rows) == 82
+    assert max_span_days([]) == 0
+
+
+def test_write_skips_features_without_coordinates(store_file):
+    store = FeatureStore(store_file)
+    assert store.layers == {"events": 4, "movements": 2}
+    assert store.max_span == {"events": 0, "movements": 82}
+
+
+def test_query_date_bbox_type_and_paging(store_file):
+    store = FeatureStore(store_file)
+
+    features, more = store.query("events", "1812-08-01", "1812-09-10")
+    assert ids(features) == ["smolensk", "borodino"] and not more
+
+    # R*Tree: 外包框与bbox相交
+    features, _ = store.query("events", bbox=(31.5, 54.5, 36.0, 56.0))
+    assert ids(features) == ["smolensk", "borodino"]
+    assert store.query("events", bbox=(10.0, 40.0, 11.0, 41.0))[0] == []
+
+    assert ids(store.query("events", feature_type="occupation")[0]) == ["moscow"]
+
+    page, more = store.query("events", limit=3)
+    assert len(page) == 3 and more
+    page, more = store.query("events", limit=3, offset=3)
+    assert ids(page) == ["moscow"] and not more
+
+
+def test_query_interval_uses_max_span(store_file):
+    store = FeatureStore(store_file)
+    # 路线从6-24持续到9-14，开始日期远早于查询起点，仍需命中
+    features, _ = store.query("movements", "1812-09-01", "1812-09-02")
+    assert ids(features) == ["french"]
+    features, _ = store.query("movements", "1812-09-10", "1812-10-21", bbox=(30.2, 55.0, 30.3, 55.2))
+    assert ids(features) == ["french", "short"]
+    features, _ = store.query("movements", "1812-09-15")
+    assert ids(features) == ["short"]
+
+
+def test_events_query_endpoint(store_file, tmp_path):
+    with TestClient(create_app(Settings(data_dir=tmp_path))) as client:
+        response = client.get("/api/events/query?start=1812-08-01&bbox=31,54,36,56&limit=1")
+        assert response.status_code == 200
+        body = response.json()
+        assert [f['properties']['id'] for f in body['features']] == ["smolensk"]
+        assert body['metadata'] == {"limit": 1, "offset": 0, "has_more": True}
+
+        again = client.get("/api/events/query?start=1812-08-01&bbox=31,54,36,56&limit=1",
+                           headers={"If-None-Match": response.headers["etag"]})
+        assert again.status_code == 304
+
+        assert client.get("/api/events/query?bbox=36,54,31,56").status_code == 400
+        assert client.get("/api/events/query?limit=0").status_code == 422
+
+
+def test_events_query_without_store(tmp_path):
+    with TestClient(create_app(Settings(data_dir=tmp_path))) as client:
+        assert client.get("/api/events/query").status_code == 503
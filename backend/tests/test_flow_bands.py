@@ -0,0 +1,72 @@
+"""
+兵力流带几何测试
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from build_flow_bands import KM_PER_DEGREE, band_geometry, build_flow_bands, route_troop_samples, split_directions
+
+TIMELINE_FILE = Path(__file__).parent.parent / "data" / "1812_campaign_timeline.json"
+
+
+def load_timeline() -> dict:
+    with open(TIMELINE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_split_directions_by_heading():
+    lonlat = np.array([[24.0, 55.0], [26.0, 55.0], [26.0, 56.0], [30.0, 55.0], [28.0, 54.0], [25.0, 55.0]])
+    assert split_directions(lonlat, heading=1) == [("advance", 0, 3), ("retreat", 3, 5)]
+    assert split_directions(lonlat, heading=-1) == [("retreat", 0, 3), ("advance", 3, 5)]
+
+
+def test_band_offsets_left_of_travel():
+    lonlat = np.array([[24.0, 55.0], [25.0, 55.0], [26.0, 55.0]])
+    widths = np.array([30.0, 20.0, 10.0])
+    vertices, indices = band_geometry(lonlat, np.array([0.0, 5.0, 10.0]), np.array([3e5, 2e5, 1e5]), widths,
+                                      vertex_base=10)
+
+    centre, outer = vertices[0::2], vertices[1::2]
+    np.testing.assert_allclose(centre[:, :2], lonlat)
+    # 向东行进，左侧为北；偏移距离即带宽
+    np.testing.assert_allclose((outer[:, 1] - centre[:, 1]) * KM_PER_DEGREE, widths, atol=1e-3)
+    np.testing.assert_allclose(outer[:, 0], lonlat[:, 0], atol=1e-5)
+    assert list(vertices[:, 4]) == [0, 1, 0, 1, 0, 1]
+    assert indices.min() == 10 and indices.max() == 15 and len(indices) == 12
+
+
+def test_build_flow_bands_buffer_layout():
+    buffer, manifest = build_flow_bands(load_timeline())
+
+    assert manifest['byte_length'] == len(buffer)
+    vertices = np.frombuffer(buffer, dtype=np.float32, count=manifest['vertices']['count'] * 5).reshape(-1, 5)
+    indices = np.frombuffer(buffer, dtype=manifest['indices']['type'],
+                            offset=manifest['indices']['byte_offset'], count=manifest['indices']['count'])
+    for draw in manifest['draws']:
+        part = indices[draw['index_offset']:draw['index_offset'] + draw['index_count']]
+        assert part.min() >= draw['vertex_offset']
+        assert part.max() < draw['vertex_offset'] + draw['vertex_count']
+
+    french = [d for d in manifest['draws'] if d['faction'] == "french" and d['lod'] == 1]
+    assert [d['direction'] for d in french] == ["advance", "retreat"]
+    assert french[0]['troops'][0] == manifest['width']['max_troops']
+    assert np.isfinite(vertices).all()
+
+
+def test_flank_troops_stay_on_flank_routes():
+    samples = route_troop_samples(load_timeline())
+    # 南翼行动中的俄军（第3军团）不并入主力俄军序列
+    assert "1812-08-18" not in samples['russian']['dates']
+    assert samples['russian_3rd_army']['dates'] == ["1812-08-18"]
+    assert samples['austrian']['dates'] == ["1812-08-12", "1812-10-18"]
+
+
+def test_russian_draws_have_no_short_direction_flips():
+    _, manifest = build_flow_bands(load_timeline())
+    russian = [d for d in manifest['draws'] if d['faction'] == "russian" and d['lod'] == 1]
+    assert [d['direction'] for d in russian] == ["retreat", "advance"]
+    assert all(d['end_day'] - d['start_day'] > 1 for d in russian)
+    assert 38000 not in [t for d in russian for t in d['troops']]
@@ -0,0 +1,36 @@
+"""
+大圆距离与双线性采样测试（API服务与脚本共用的实现）
+"""
+
+import numpy as np
+import pytest
+
+from src.utils.geo import EARTH_RADIUS_KM, bilinear_sample, haversine_km
+
+
+def test_haversine_quarter_meridian_and_broadcast():
+    assert haversine_km(0.0, 0.0, 0.0, 90.0) == pytest.approx(np.pi / 2 * EARTH_RADIUS_KM)
+    lons = np.array([24.0, 30.0, 37.6])
+    steps = haversine_km(lons[:-1], 55.0, lons[1:], 55.0)
+    assert steps.shape == (2,) and np.all(steps > 0)
+
+
+def test_bilinear_matches_plane_and_skips_nodata():
+    rows, cols = np.mgrid[0:5, 0:6].astype(np.float64)
+    grid = 10 * rows + cols
+    r = np.array([0.0, 1.25, 3.5, 4.0])
+    c = np.array([0.0, 2.5, 4.75, 5.0])
+    assert np.allclose(bilinear_sample(grid, r, c), 10 * r + c)
+
+    # 无数据/NaN像元不参与加权，其余角点重新归一化
+    grid[1, 2] = -9999
+    grid[1, 3] = np.nan
+    value = bilinear_sample(grid, np.array([1.5]), np.array([2.5]), nodata=-9999)
+    assert value[0] == pytest.approx((grid[2, 2] + grid[2, 3]) / 2)
+
+
+def test_bilinear_out_of_range_is_nan():
+    grid = np.ones((3, 3))
+    values = bilinear_sample(grid, np.array([-0.5, -0.6, 1.0, 2.5]), np.array([1.0, 1.0, 2.6, 2.5]))
+    assert values[0] == 1.0 and values[3] == 1.0
+    assert np.isnan(values[1]) and np.isnan(values[2])
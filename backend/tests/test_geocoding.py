@@ -0,0 +1,94 @@
+"""
+地理编码测试（内存地名库 + 本地远程服务桩，不访问网络）
+"""
+
+import pytest
+
+from geocoding import GeocodeCache, GeocodeResult, Gazetteer, Geocoder, normalize, timeline_locations
+
+
+class StubProvider:
+    """替代Nominatim的本地桩，记录调用次数"""
+
+    def __init__(self, places: dict):
+        self.places = places
+        self.calls = []
+
+    def geocode(self, name):
+        self.calls.append(name)
+        if name in self.places:
+            lat, lon = self.places[name]
+            return GeocodeResult(name, lat, lon, "stub")
+        return None
+
+
+@pytest.fixture
+def gazetteer():
+    g = Gazetteer()
+    g.add("Kaunas", 54.90, 23.90, ["Kaunas", "Kowno"], rank=3)
+    g.add("Smolensk", 54.78, 32.04, ["Smolensk", "Смоленск"], rank=4)
+    g.add("Vilnius", 54.69, 25.28, ["Vilnius", "Wilno"], rank=1)
+    g.add("Smolenskoye", 53.00, 40.00, rank=10)
+    return g
+
+
+@pytest.fixture
+def provider():
+    return StubProvider({"Tarutino": (55.18, 36.97)})
+
+
+def make_geocoder(gazetteer, provider, cache=None):
+    return Geocoder(gazetteer, cache or GeocodeCache(":memory:"), provider,
+                    aliases={normalize("Kovno"): "Kaunas", normalize("Wilna"): "Vilnius"})
+
+
+def test_normalize_strips_diacritics():
+    assert normalize("Smoleńsk") == "smolensk"
+    assert normalize("  Brest-Litovsk ") == "brest litovsk"
+
+
+def test_historical_aliases_and_variants(gazetteer, provider):
+    geocoder = make_geocoder(gazetteer, provider)
+
+    assert geocoder.geocode("Kovno").name == "Kaunas"
+    assert geocoder.geocode("Wilna").name == "Vilnius"
+    assert geocoder.geocode("Smoleńsk").name == "Smolensk"
+    assert geocoder.geocode("Kaunas (Kovno)").name == "Kaunas"
+    assert provider.calls == []
+
+
+def test_fuzzy_match(gazetteer, provider):
+    result = make_geocoder(gazetteer, provider).geocode("Smolensck")
+
+    assert result.name == "Smolensk"
+    assert 0.85 <= result.score < 1.0
+    assert provider.calls == []
+
+
+def test_remote_fallback_is_cached(gazetteer, provider, tmp_path):
+    cache_file = tmp_path / "geocode.sqlite"
+    first = make_geocoder(gazetteer, provider, GeocodeCache(cache_file))
+    assert first.geocode("Tarutino").source == "stub"
+    assert first.geocode("Atlantis") is None
+    assert provider.calls == ["Tarutino", "Atlantis"]
+
+    # 新实例共享同一缓存文件: 命中与未命中都不再访问远程
+    second = make_geocoder(gazetteer, provider, GeocodeCache(cache_file))
+    assert second.geocode("Tarutino").lat == pytest.approx(55.18)
+    assert second.geocode("Atlantis") is None
+    assert provider.calls == ["Tarutino", "Atlantis"]
+
+
+def test_manual_overrides_gazetteer(gazetteer, provider):
+    timeline = {"events": [{"location": {"name": "Kaunas (Kovno)", "lat": 54.8985, "lon": 23.9036}}]}
+    geocoder = Geocoder(gazetteer, provider=provider, manual=timeline_locations(timeline))
+
+    assert geocoder.geocode("Kovno").source == "timeline"
+    assert geocoder.geocode("kaunas").lat == pytest.approx(54.8985)
+
+
+def test_geocode_many_deduplicates(gazetteer, provider):
+    results = make_geocoder(gazetteer, provider).geocode_many(["Tarutino", "tarutino", "Kovno"] * 100)
+
+    assert len(results) == 3
+    assert provider.calls == ["Tarutino"]
@@ -0,0 +1,29 @@
+"""
+热力图按周分桶测试
+"""
+
+from build_heatmaps import bucket_samples, metric_samples, week_buckets
+
+
+def test_week_buckets_start_on_monday():
+    buckets = week_buckets("1812-06-24", "1812-07-08")
+    # 1812-06-24 是周三，第一周从周一 06-22 开始
+    assert buckets == [("1812-06-22", "1812-06-28"), ("1812-06-29", "1812-07-05"), ("1812-07-06", "1812-07-12")]
+
+
+def test_bucket_samples_per_week_and_cumulative():
+    features = [
+        {"geometry": {"coordinates": [30.0, 54.0]}, "properties": {"date": "1812-06-24", "v": 10}},
+        {"geometry": {"coordinates": [31.0, 54.5]}, "properties": {"date": "1812-07-06", "v": 5}},
+        {"geometry": {"coordinates": [32.0, 55.0]}, "properties": {"date": "1812-07-06", "v": 0}},
+        {"geometry": None, "properties": {"date": "1812-07-07", "v": 3}},
+    ]
+    samples = metric_samples(features, "v")
+    assert samples == [("1812-06-24", 30.0, 54.0, 10.0), ("1812-07-06", 31.0, 54.5, 5.0)]
+
+    buckets = week_buckets("1812-06-24", "1812-07-08")
+    weekly = bucket_samples(samples, buckets, cumulative=False)
+    assert weekly == [((30.0, 54.0, 10.0),), (), ((31.0, 54.5, 5.0),)]
+
+    running = bucket_samples(samples, buckets, cumulative=True)
+    assert running == [((30.0, 54.0, 10.0),), ((30.0, 54.0, 10.0),), ((30.0, 54.0, 10.0), (31.0, 54.5, 5.0))]
@@ -0,0 +1,57 @@
+"""
+压测脚本测试: 会话轨迹与结果汇总，回放使用进程内ASGI传输（不启动服务器）
+"""
+
+import asyncio
+import random
+
+import httpx
+
+from load_test import SESSIONS, Sample, load_chapter_ids, run_level, story_session, summarize
+from src.main import create_app
+from src.services.data_loader import load_store
+from src.config import Settings
+
+
+def test_sessions_are_deterministic():
+    for build in SESSIONS.values():
+        first = build(random.Random(7))
+        assert first == build(random.Random(7))
+        assert all(call.path.startswith("/") for call in first)
+
+
+def test_story_sessions_reach_every_chapter():
+    chapter_ids = load_chapter_ids()
+    opened = set()
+    for seed in range(200):
+        opened.update(call.path.rsplit("/", 1)[-1] for call in story_session(random.Random(seed))
+                      if call.endpoint == "/api/events/keyframes/{chapter_id}")
+    assert opened == set(chapter_ids)
+
+
+def test_summarize_excludes_errors_from_latency():
+    samples = [Sample("/api/events", 200, 0.010, 100), Sample("/api/events", 304, 0.002, 0),
+               Sample("/api/events", 503, 5.0, 20), Sample("/api/events", 0, 30.0, 0)]
+    stats = summarize(samples, elapsed=2.0)["endpoints"]["/api/events"]
+    assert stats["requests"] == 2
+    assert stats["errors"] == 2
+    assert stats["not_modified"] == 1
+    assert stats["max_ms"] == 10.0
+    assert stats["rps"] == 1.0
+
+
+def test_run_level_in_process(tmp_path):
+    # 读真实数据，但平移会话生成的MVT瓦片写入临时目录而不是 data/cache/tiles
+    app = create_app()
+    app.state.store = load_store(Settings(cache_dir=tmp_path))
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await run_level(client, concurrency=2, duration=0.5, seed=1)
+
+    summary = asyncio.run(run())
+    assert summary["concurrency"] == 2
+    assert summary["total"]["requests"] > 0
+    assert summary["endpoints"]["/api/events"]["errors"] == 0
+    assert app.state.store.tiles.cache.root == tmp_path / "tiles"
@@ -0,0 +1,28 @@
+"""
+行军路线测试
+"""
+
+from generate_movements import collect_route_points
+
+
+def event(event_id: str, day: str, lon: float, participants: dict) -> dict:
+    return {"id": event_id, "date": day, "location": {"lon": lon, "lat": 54.0},
+            "participants": {key: {"troops": troops} for key, troops in participants.items()}}
+
+
+def test_flank_events_get_separate_routes():
+    timeline = {
+        "events": [event("a", "1812-08-01", 30.0, {"russian": 100}),
+                   event("b", "1812-08-20", 32.0, {"russian": 90}),
+                   event("c", "1812-09-07", 35.8, {"russian": 80})],
+        "schwarzenberg_operations": {"events": [
+            event("f1", "1812-08-12", 25.0, {"austrian": 30}),
+            event("f2", "1812-08-18", 26.0, {"coalition": 20, "russian": 38}),
+            event("f3", "1812-09-01", 25.5, {"russian": 35}),
+        ]},
+    }
+    routes = collect_route_points(timeline)
+
+    assert [p['event_id'] for p in routes['russian']] == ["a", "b", "c"]
+    assert [p['event_id'] for p in routes['austrian']] == ["f1", "f2"]
+    assert [p['event_id'] for p in routes['russian_3rd_army']] == ["f2", "f3"]
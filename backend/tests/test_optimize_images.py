@@ -0,0 +1,84 @@
+"""
+图片优化测试（临时目录中生成的小图）
+"""
+
+import json
+
+import pytest
+
+from optimize_images import build_report, optimize_images, output_subdir, target_sizes
+
+Image = pytest.importorskip("PIL.Image")
+
+WEBP = {"webp": {"format": "WEBP", "quality": 80, "method": 0}}
+
+
+def test_target_sizes_fit_box():
+    # 宽图受宽度限制，高图受高度限制；都不放大
+    assert target_sizes(4000, 2000, [480, 960, 1440, 1920])[-1] == (1920, 960)
+    assert target_sizes(2000, 4000, [480, 960, 1440, 1920]) == [(480, 960), (540, 1080)]
+    assert target_sizes(800, 600, [480, 960]) == [(480, 360), (800, 600)]
+    for width, height in target_sizes(3000, 3000, [480, 960, 1440, 1920]):
+        assert width <= 1920 and height <= 1080
+
+
+def write_image(path, size, color):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, color).save(path)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    source_dir = tmp_path / "historical_maps"
+    write_image(source_dir / "Minard.png", (1200, 3000), (200, 30, 30))
+    write_image(source_dir / "story" / "Minard.jpg", (2400, 800), (30, 30, 200))
+    write_image(source_dir / "story" / "Minard.png", (600, 400), (30, 200, 30))
+    return source_dir
+
+
+def test_variants_do_not_collide_and_fit(sources, tmp_path):
+    output_dir = tmp_path / "images"
+    files = sorted(p for p in sources.rglob("*") if p.is_file())
+    report = optimize_images(files, output_dir, formats=WEBP, workers=1, source_dir=sources)
+
+    assert len(report['images']) == 3
+    assert len({output_subdir(p, sources) for p in files}) == 3
+    assert all(image['largest_variant_bytes']['webp'] > 0 for image in report['images'])
+
+    urls = []
+    manifest = json.loads((output_dir / "manifest.json").read_text(encoding="utf-8"))
+    for variants in manifest.values():
+        for variant in variants['webp']:
+            assert variant['width'] <= 1920 and variant['height'] <= 1080
+            with Image.open(output_dir / variant['url']) as written:
+                assert written.size == (variant['width'], variant['height'])
+            urls.append(variant['url'])
+    assert len(urls) == len(set(urls))
+
+
+def test_unchanged_sources_are_skipped(sources, tmp_path):
+    output_dir = tmp_path / "images"
+    files = sorted(p for p in sources.rglob("*") if p.is_file())
+    optimize_images(files, output_dir, formats=WEBP, workers=1, source_dir=sources)
+
+    again = optimize_images(files, output_dir, formats=WEBP, workers=1, source_dir=sources)
+    assert again['skipped_unchanged'] == 3
+
+    write_image(sources / "story" / "Minard.png", (600, 400), (0, 0, 0))
+    changed = optimize_images(files, output_dir, formats=WEBP, workers=1, source_dir=sources)
+    assert changed['skipped_unchanged'] == 2
+
+
+def test_savings_report():
+    results = {
+        "a.png": {"original_bytes": 1000, "variants": {"webp": [{"width": 480, "bytes": 100},
+                                                                {"width": 960, "bytes": 250}]}},
+        "b.png": {"original_bytes": 3000, "variants": {"webp": [{"width": 480, "bytes": 750}]}},
+    }
+    report = build_report(results, skipped=1)
+
+    assert report['skipped_unchanged'] == 1
+    assert [i['savings_percent']['webp'] for i in report['images']] == [75.0, 75.0]
+    assert report['total_original_bytes'] == 4000
+    assert report['total_largest_variant_bytes'] == {"webp": 1000}
+    assert report['total_savings_percent'] == {"webp": 75.0}
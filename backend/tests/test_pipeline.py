@@ -0,0 +1,93 @@
+"""
+管线注册表测试: 步骤按需导入，导入任何模块都不创建目录、不加载重依赖；
+CLI/API导入时间预算是墙钟计时，受机器负载影响，只在设置 PIPELINE_IMPORT_BUDGET=1 时检查
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.config import BACKEND_DIR
+from src.pipeline import STEPS, Step, StepError, get_step, run_step
+from src.pipeline.__main__ import run_steps
+from src.pipeline.imports import IMPORT_BUDGETS, measure_import
+
+
+def test_unknown_step():
+    with pytest.raises(KeyError, match="未知步骤"):
+        get_step("nope")
+
+
+@pytest.fixture
+def broken_steps(tmp_path, monkeypatch):
+    """登记两个临时步骤: broken 的 main() 像脚本出错时一样打印❌并返回1，ok 记录自己是否运行"""
+    (tmp_path / "broken_step.py").write_text(
+        "def main():\n    print('❌ 错误: boom')\n    return 1\n", encoding="utf-8")
+    (tmp_path / "ok_step.py").write_text(
+        "ran = []\n\ndef main():\n    ran.append(True)\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setitem(STEPS, "broken", Step("broken", "broken_step", "总是失败"))
+    monkeypatch.setitem(STEPS, "ok", Step("ok", "ok_step", "总是成功"))
+    yield
+    sys.modules.pop("broken_step", None)
+    sys.modules.pop("ok_step", None)
+
+
+def test_failing_step_raises(broken_steps):
+    with pytest.raises(StepError, match="broken"):
+        run_step("broken")
+    assert run_step("ok") >= 0
+
+
+def test_run_steps_stops_at_first_failure(broken_steps, capsys):
+    import ok_step
+
+    assert run_steps(["ok"]) == 0
+    assert ok_step.ran == [True]
+
+    # 按登记顺序 broken 在 ok 之前，失败后不再运行 ok
+    ok_step.ran.clear()
+    assert run_steps(["ok", "broken"]) == 1
+    assert ok_step.ran == []
+    assert "后续步骤未运行" in capsys.readouterr().out
+
+
+def test_cli_exits_non_zero_on_failed_step(tmp_path):
+    (tmp_path / "broken_step.py").write_text("def main():\n    return 1\n", encoding="utf-8")
+    code = ("import sys\n"
+            "from src.pipeline import STEPS, Step\n"
+            "from src.pipeline.__main__ import main\n"
+            "STEPS['broken'] = Step('broken', 'broken_step', '总是失败')\n"
+            "sys.argv = ['pipeline', 'run', 'broken']\n"
+            "main()\n")
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True,
+                            env={**os.environ, "PYTHONPATH": str(tmp_path)})
+    assert result.returncode == 1
+    assert "后续步骤未运行" in result.stdout
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS))
+def test_entry_import_is_light(module):
+    result = measure_import(module)
+    assert result["mkdirs"] == []
+    assert not {"requests", "rasterio", "geopandas", "shapely"} & set(result["heavy"])
+
+
+@pytest.mark.skipif(not os.environ.get("PIPELINE_IMPORT_BUDGET"),
+                    reason="墙钟计时，设置 PIPELINE_IMPORT_BUDGET=1 或运行 python -m src.pipeline imports 检查")
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS))
+def test_import_budget(module):
+    assert measure_import(module)["seconds"] <= IMPORT_BUDGETS[module]
+
+
+def test_registry_import_loads_no_steps():
+    assert measure_import("src.pipeline")["heavy"] == []
+
+
+@pytest.mark.parametrize("module", [step.module for step in STEPS.values()])
+def test_step_import_has_no_side_effects(module):
+    result = measure_import(module)
+    assert result["mkdirs"] == []
+    assert not {"requests", "rasterio", "geopandas", "fiona", "PIL"} & set(result["heavy"])
@@ -0,0 +1,50 @@
+"""
+栅格/瓦片共享工具测试
+"""
+
+import numpy as np
+import pytest
+
+from raster_utils import gaussian_blur, gaussian_kernel, tile_bounds_3857, tiles_covering, world_pixels
+
+
+@pytest.mark.parametrize("sigma", [1.0, 2.5, 6.0])
+def test_blur_of_delta_is_normalised_kernel(sigma):
+    kernel = gaussian_kernel(sigma)
+    radius = len(kernel) // 2
+    grid = np.zeros((4 * radius + 1, 4 * radius + 1))
+    grid[2 * radius, 2 * radius] = 1.0
+
+    blurred = gaussian_blur(grid, sigma)
+    window = blurred[radius:3 * radius + 1, radius:3 * radius + 1]
+    assert np.allclose(window, np.outer(kernel, kernel), atol=1e-6)
+    assert kernel.sum() == pytest.approx(1.0)
+
+
+def test_blur_conserves_mass_away_from_edges():
+    rng = np.random.default_rng(3)
+    grid = np.zeros((80, 120))
+    grid[30:50, 40:80] = rng.uniform(0, 10, (20, 40))
+
+    blurred = gaussian_blur(grid, 3.0)
+    assert blurred.shape == grid.shape and blurred.dtype == np.float32
+    assert blurred.sum() == pytest.approx(grid.sum(), rel=1e-5)
+    assert blurred.min() >= 0
+
+
+def test_tiles_covering_and_pixels_agree():
+    bounds = (20.0, 50.0, 45.0, 60.0)
+    tiles = tiles_covering(bounds, 6)
+    xs, ys = zip(*tiles)
+    assert len(tiles) == (max(xs) - min(xs) + 1) * (max(ys) - min(ys) + 1)
+
+    px, py = world_pixels(np.array([20.0, 45.0]), np.array([60.0, 50.0]), 6)
+    assert (int(px[0] // 256), int(py[0] // 256)) == (min(xs), min(ys))
+    assert (int(px[1] // 256), int(py[1] // 256)) == (max(xs), max(ys))
+    assert tiles_covering((-180.0, -89.0, 180.0, 89.0), 1) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+
+def test_tile_bounds_3857():
+    left, bottom, right, top = tile_bounds_3857(1, 1, 0)
+    assert (left, bottom) == (0.0, 0.0)
+    assert right == pytest.approx(20037508.342789244) and top == pytest.approx(20037508.342789244)
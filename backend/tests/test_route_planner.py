@@ -0,0 +1,120 @@
+"""
+地形最小代价路径测试（合成代价面）
+"""
+
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import route_planner
+from route_planner import (KM_PER_DEGREE, TOBLER_MAX_SPEED, CostGrid, _search, build_cost_grid, collect_legs,
+                           cost_matrix, least_cost_path)
+
+RESOLUTION = 0.01
+SIZE = 11
+GAP_ROW = 8
+
+
+def barrier_grid() -> CostGrid:
+    """赤道附近的均匀代价面，第5列为不可通行的屏障，只在GAP_ROW行留一个缺口"""
+    cost = np.ones((SIZE, SIZE))
+    cost[:, 5] = np.inf
+    cost[GAP_ROW, 5] = 1.0
+    half = SIZE * RESOLUTION / 2
+    return CostGrid(cost, (0.0, -half, SIZE * RESOLUTION, half), RESOLUTION)
+
+
+def test_path_goes_through_gap():
+    grid = barrier_grid()
+    cells, hours = least_cost_path(grid, (2, 0), (2, 10))
+
+    assert cells[0] == (2, 0) and cells[-1] == (2, 10)
+    assert (GAP_ROW, 5) in cells
+    assert all(grid.cost[c] != np.inf for c in cells)
+    # 已知最优: 两段各5步对角 + 1步直行（代价1小时/公里，赤道附近cos≈1）
+    step = RESOLUTION * KM_PER_DEGREE
+    assert hours == pytest.approx(2 * (5 * math.sqrt(2) + 1) * step, rel=1e-3)
+
+
+def test_astar_matches_dijkstra():
+    grid = barrier_grid()
+    rng = np.random.default_rng(7)
+    grid.cost[grid.cost != np.inf] = rng.uniform(0.5, 3.0, int((grid.cost != np.inf).sum()))
+
+    dist, _ = _search(grid, (0, 0), {(r, c) for r in range(SIZE) for c in range(SIZE)})
+    for goal in [(2, 10), (10, 10), (0, 6), (GAP_ROW, 4)]:
+        _, hours = least_cost_path(grid, (0, 0), goal)
+        assert hours == pytest.approx(dist[goal[0] * SIZE + goal[1]])
+
+
+def test_unreachable_goal():
+    grid = barrier_grid()
+    grid.cost[GAP_ROW, 5] = np.inf
+    assert least_cost_path(grid, (2, 0), (2, 10)) == ([], math.inf)
+
+
+@pytest.fixture
+def flat_dem(tmp_path) -> Path:
+    rasterio = pytest.importorskip("rasterio")
+    from rasterio.transform import from_bounds
+
+    path = tmp_path / "dem.tif"
+    with rasterio.open(path, 'w', driver='GTiff', width=100, height=100, count=1, dtype='float32',
+                       crs='EPSG:4326', transform=from_bounds(30.0, 54.0, 31.0, 55.0, 100, 100)) as dst:
+        dst.write(np.full((100, 100), 200.0, dtype=np.float32), 1)
+    return path
+
+
+def test_river_crossing_penalty(flat_dem):
+    from shapely.geometry import LineString
+
+    river = LineString([(30.5, 53.9), (30.5, 55.1)])
+    bounds = (30.0, 54.0, 31.0, 55.0)
+    plain = build_cost_grid(flat_dem, bounds, 0.05)
+    penalised = build_cost_grid(flat_dem, bounds, 0.05, [river])
+    blocked = build_cost_grid(flat_dem, bounds, 0.05, [river], river_penalty=None)
+
+    # 平地的Tobler代价为 1/最大速度
+    assert np.allclose(plain.cost, 1.0 / TOBLER_MAX_SPEED)
+    on_river = penalised.cost > plain.cost
+    assert on_river.any()
+    assert np.allclose(penalised.cost[on_river], 1.0 / TOBLER_MAX_SPEED + route_planner.RIVER_PENALTY)
+    assert np.isinf(blocked.cost[on_river]).all()
+
+    start, goal = plain.to_cell(30.1, 54.5), plain.to_cell(30.9, 54.5)
+    _, plain_hours = least_cost_path(plain, start, goal)
+    _, crossing_hours = least_cost_path(penalised, start, goal)
+    assert crossing_hours > plain_hours
+    assert least_cost_path(blocked, start, goal) == ([], math.inf)
+
+
+def test_cost_matrix_and_cache(flat_dem, tmp_path, monkeypatch):
+    grid = build_cost_grid(flat_dem, (30.0, 54.0, 31.0, 55.0), 0.05)
+    monkeypatch.setitem(route_planner._worker_state, 'coarse', grid)
+    locations = [{"name": "A", "lon": 30.1, "lat": 54.1}, {"name": "B", "lon": 30.9, "lat": 54.1},
+                 {"name": "C", "lon": 30.5, "lat": 54.9}]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        matrix = cost_matrix(flat_dem, locations, pool, 0.05, tmp_path / "cache")
+        hours = np.array(matrix['hours'])
+        assert not matrix['cached']
+        assert np.allclose(np.diag(hours), 0.0) and np.allclose(hours, hours.T, atol=0.02)
+        _, direct = least_cost_path(grid, grid.to_cell(30.1, 54.1), grid.to_cell(30.9, 54.1))
+        assert hours[0, 1] == pytest.approx(direct, abs=0.01)
+
+        cached = cost_matrix(flat_dem, locations, pool, 0.05, tmp_path / "cache")
+        assert cached['cached'] and cached['hours'] == matrix['hours']
+
+
+def test_legs_follow_main_routes_only():
+    timeline = json.loads((Path(__file__).parent.parent / "data" / "1812_campaign_timeline.json")
+                          .read_text(encoding='utf-8'))
+    flank_ids = {e['id'] for e in timeline['schwarzenberg_operations']['events']}
+    for leg in collect_legs(timeline):
+        # 侧翼事件只与同一侧翼路线上的事件相连，不混入主力路线
+        ends = {leg['start']['event_id'], leg['end']['event_id']}
+        assert ends <= flank_ids or not ends & flank_ids, ends
@@ -0,0 +1,84 @@
+"""
+Story Mode章节包测试
+"""
+
+import json
+from pathlib import Path
+
+import build_story_bundles as story
+from build_story_bundles import assign_events, pick_variant
+
+DATA = Path(__file__).parent.parent / "data"
+
+
+def feature(event_id: str, day: str) -> dict:
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [30.0, 55.0]},
+            "properties": {"id": event_id, "date": day}}
+
+
+def test_each_event_belongs_to_one_chapter():
+    chapters = [
+        {"id": "ch01", "order": 1, "date": "1812-06-24", "event_ids": ["a"]},
+        {"id": "ch02", "order": 2, "date": "1812-08-16", "event_ids": ["c"]},
+        {"id": "ch03", "order": 3, "date": "1812-09-07", "event_ids": ["d"]},
+    ]
+    features = [feature("early", "1812-06-01"), feature("a", "1812-06-24"), feature("b", "1812-07-28"),
+                feature("c", "1812-08-17"), feature("f", "1812-08-16"), feature("d", "1812-09-07"),
+                feature("g", "1812-09-09"), feature("e", "1812-12-14")]
+    assigned = assign_events(chapters, features)
+
+    ids = {chapter: [f['properties']['id'] for f in fs] for chapter, fs in assigned.items()}
+    # 未列出的事件归其日期当天已生效的章节（早于第一章的归第一章）；
+    # c晚于ch02的日期，但列在ch02的event_ids中，不会再出现在ch03
+    assert ids == {"ch01": ["early", "a", "b"], "ch02": ["c", "f"], "ch03": ["d", "g", "e"]}
+
+
+def test_event_after_chapter_date_is_not_deferred():
+    # 博罗季诺章节之后两天的事件属于博罗季诺章节，而不是下一章
+    chapters = [
+        {"id": "borodino", "order": 1, "date": "1812-09-07", "event_ids": []},
+        {"id": "moscow", "order": 2, "date": "1812-09-14", "event_ids": []},
+    ]
+    assigned = assign_events(chapters, [feature("x", "1812-09-09")])
+    assert [f['properties']['id'] for f in assigned["borodino"]] == ["x"]
+    assert assigned["moscow"] == []
+
+
+def test_repo_chapters_partition_events():
+    chapters = json.loads((DATA / "chapters.json").read_text(encoding='utf-8'))['chapters']
+    events = json.loads((DATA / "geojson" / "events.geojson").read_text(encoding='utf-8'))['features']
+    assigned = assign_events(chapters, events)
+
+    ids = [f['properties']['id'] for fs in assigned.values() for f in fs]
+    assert sorted(ids) == sorted(f['properties']['id'] for f in events)
+    for chapter in chapters:
+        assert set(chapter['event_ids']) <= {f['properties']['id'] for f in assigned[chapter['id']]}
+
+
+def test_pick_variant_fits_max_size():
+    variants = [{"width": 480, "height": 300}, {"width": 1440, "height": 900}, {"width": 1920, "height": 1200}]
+    assert pick_variant(variants)['width'] == 1440
+    assert pick_variant([{"width": 2400, "height": 2000}, {"width": 1920, "height": 1600}])['width'] == 1920
+    assert pick_variant([]) is None
+
+
+def test_bundles_reference_optimized_images(tmp_path, monkeypatch):
+    images_dir = tmp_path / "images"
+    variant = images_dir / "Battle_of_Borodino" / "Battle_of_Borodino-960.webp"
+    variant.parent.mkdir(parents=True)
+    variant.write_bytes(b"webp")
+    (images_dir / "manifest.json").write_text(json.dumps({"historical_maps/story/Battle_of_Borodino.jpg": {
+        "webp": [{"width": 960, "height": 600, "url": "Battle_of_Borodino/Battle_of_Borodino-960.webp", "bytes": 4}],
+    }}), encoding='utf-8')
+    monkeypatch.setattr(story, "DEM_FILE", tmp_path / "missing.tif")
+
+    chapters = [{"id": "ch01", "order": 1, "date": "1812-09-07", "event_ids": ["evt_005"],
+                 "images": ["Battle_of_Borodino.jpg"]}]
+    output_dir = tmp_path / "story"
+    manifest = story.build_story_bundles(chapters, {"features": [feature("evt_005", "1812-09-07")]}, [],
+                                         output_dir, images_dir)
+
+    bundle = json.loads((output_dir / "ch01.json").read_text(encoding='utf-8'))
+    assert bundle['images'][0]['url'] == "../images/Battle_of_Borodino/Battle_of_Borodino-960.webp"
+    assert manifest['chapters'][0]['assets'][0]['bytes'] == 4
+    assert not list(output_dir.rglob("*.webp"))
@@ -0,0 +1,85 @@
+"""
+逐日气温场测试
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from generate_temperature_field import (FIELD_SCALE, build_temperature_field, extract_readings, field_cell,
+                                        reaumur_to_celsius, save_temperature_field)
+from src.config import Settings
+from src.main import create_app
+from src.services.data_loader import TemperatureField
+
+TIMELINE = {
+    "date_range": {"start": "1812-11-01", "end": "1812-11-03"},
+    "events": [{"id": "evt_x", "date": "1812-11-02", "location": {"lon": 30.3, "lat": 54.6},
+                "weather": {"temperature": -15}}],
+}
+
+
+def test_reaumur_to_celsius():
+    assert reaumur_to_celsius(0) == 0
+    assert reaumur_to_celsius(80) == 100
+    assert reaumur_to_celsius(-24) == -30
+
+
+def test_minard_readings_are_converted(tmp_path):
+    minard = tmp_path / "minard.csv"
+    minard.write_text("date,lon,lat,temperature_r,note\n1812-12-06,26.7,54.48,-30,\n", encoding='utf-8')
+    readings = extract_readings(TIMELINE, minard)
+    assert [(r['source'], r['temperature']) for r in readings] == [("evt_x", -15.0), ("minard", -37.5)]
+
+
+@pytest.fixture
+def field_dir(tmp_path):
+    statistics = tmp_path / "statistics"
+    metadata = build_temperature_field(TIMELINE, statistics / "temperature_field.npy", resolution=1.0)
+    save_temperature_field(metadata, statistics / "temperature_field.json")
+    return tmp_path, metadata
+
+
+def test_field_cell_and_sample(field_dir):
+    data_dir, metadata = field_dir
+    field = TemperatureField(metadata, data_dir / "statistics" / metadata['file'])
+    assert metadata['shape'] == [3, 10, 25]
+
+    assert field_cell(metadata, 20.0, 60.0) == (0, 0)
+    assert field_cell(metadata, 30.3, 54.6) == (5, 10)
+    assert field_cell(metadata, 44.99, 50.01) == (9, 24)
+    assert field_cell(metadata, 45.0, 55.0) is None and field_cell(metadata, 30.0, 50.0) is None
+
+    # 单格bbox的查询值与该格的数组值一致；读数所在格接近读数温度
+    sample = field.query(date(1812, 11, 2), (30.3, 54.6, 30.4, 54.7))
+    assert (sample['width'], sample['height']) == (1, 1)
+    assert sample['bounds'] == [30.0, 54.0, 31.0, 55.0]
+    assert sample['values'] == [[int(field.values[1, 5, 10])]]
+    assert sample['values'][0][0] * FIELD_SCALE == pytest.approx(-15, abs=3)
+
+
+def test_window_clamps_and_rejects_empty(field_dir):
+    data_dir, metadata = field_dir
+    field = TemperatureField(metadata, data_dir / "statistics" / metadata['file'])
+
+    assert field.window(None) == (0, 10, 0, 25)
+    assert field.window((10.0, 40.0, 70.0, 80.0)) == (0, 10, 0, 25)
+    assert field.window((43.5, 58.5, 60.0, 70.0)) == (0, 2, 23, 25)
+    for bbox in [(50.0, 52.0, 60.0, 58.0), (22.0, 61.0, 30.0, 62.0), (10.0, 40.0, 19.0, 45.0)]:
+        with pytest.raises(ValueError):
+            field.window(bbox)
+
+
+def test_temperature_endpoint(field_dir):
+    data_dir, _ = field_dir
+    with TestClient(create_app(Settings(data_dir=data_dir))) as client:
+        body = client.get("/api/statistics/temperature?date=1812-11-02&bbox=43.5,58.5,60,70").json()
+        assert (body['width'], body['height']) == (2, 2)
+        assert body['bounds'] == [43.0, 58.0, 45.0, 60.0]
+
+        assert client.get("/api/statistics/temperature?date=1812-11-02&bbox=50,52,60,58").status_code == 400
+        assert client.get("/api/statistics/temperature?date=1812-12-25").status_code == 404
+        full = client.get("/api/statistics/temperature?date=1812-11-01").json()
+        assert np.array(full['values']).shape == (10, 25)
@@ -0,0 +1,150 @@
+"""
+矢量瓦片编码与磁盘缓存测试
+"""
+
+import numpy as np
+import pytest
+
+from src.services import mvt
+from src.services.tiles import DiskTileCache, TileLayer, lonlat_to_world
+
+
+def read_varint(data: bytes, pos: int) -> tuple:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, pos
+
+
+def read_message(data: bytes) -> list:
+    """最小protobuf解码: [(field, value)]，varint为int，定长64位/长度前缀为bytes"""
+    fields, pos = [], 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        field, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = data[pos:pos + 8], pos + 8
+        elif wire_type == 2:
+            length, pos = read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        else:
+            raise ValueError(f"unexpected wire type {wire_type}")
+        fields.append((field, value))
+    return fields
+
+
+def read_packed(data: bytes) -> list:
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def decode_layers(tile: bytes) -> dict:
+    """{图层名: {"version", "extent", "keys", "features": [{"type", "commands"}]}}"""
+    layers = {}
+    for field, payload in read_message(tile):
+        assert field == 3
+        layer = {"features": [], "keys": []}
+        for f, value in read_message(payload):
+            if f == 1:
+                layer['name'] = value.decode('utf-8')
+            elif f == 2:
+                feature = dict(read_message(value))
+                layer['features'].append({"id": feature.get(1), "type": feature[3],
+                                          "commands": read_packed(feature[4])})
+            elif f == 3:
+                layer['keys'].append(value.decode('utf-8'))
+            elif f == 5:
+                layer['extent'] = value
+            elif f == 15:
+                layer['version'] = value
+        layers[layer['name']] = layer
+    return layers
+
+
+def test_zigzag_command_stream():
+    commands = mvt.encode_geometry(mvt.LINESTRING, [[(2, 3), (5, 1), (5, 4)]])
+    # MoveTo(1) +2 +3, LineTo(2) +3 -2, 0 +3
+    assert commands == [9, 4, 6, 18, 6, 3, 0, 6]
+    assert [unzigzag(v) for v in commands[1:3]] == [2, 3]
+    assert unzigzag(mvt._zigzag(-1)) == -1 and mvt._zigzag(-1) == 1
+
+
+def test_encoded_tile_layer_and_extent():
+    features = [
+        {"id": 1, "type": mvt.POINT, "geometry": [(10, 20)], "properties": {"name": "Borodino", "troops": 130000}},
+        {"id": 2, "type": mvt.LINESTRING, "geometry": [[(0, 0), (100, -50)]], "properties": {"elevation": -5}},
+    ]
+    tile = mvt.encode_tile({"events": features})
+    layer = decode_layers(tile)["events"]
+
+    assert layer['version'] == 2 and layer['extent'] == mvt.DEFAULT_EXTENT
+    assert layer['keys'] == ["name", "troops", "elevation"]
+    point, line = layer['features']
+    assert point['type'] == mvt.POINT and point['commands'] == [9, 20, 40]
+    assert line['type'] == mvt.LINESTRING
+    assert [unzigzag(v) for v in line['commands'][4:6]] == [100, -50]
+
+
+def test_encoded_tile_decodes_with_reference_library():
+    mapbox_vector_tile = pytest.importorskip("mapbox_vector_tile")
+    features = [{"id": 7, "type": mvt.POINT, "geometry": [(10, 20)], "properties": {"name": "Smolensk", "day": 1.5}}]
+    decoded = mapbox_vector_tile.decode(mvt.encode_tile({"events": features}), default_options={"y_coord_down": True})
+
+    layer = decoded["events"]
+    assert layer['extent'] == mvt.DEFAULT_EXTENT
+    feature = layer['features'][0]
+    assert feature['id'] == 7
+    assert feature['geometry'] == {"type": "Point", "coordinates": [10, 20]}
+    assert feature['properties'] == {"name": "Smolensk", "day": 1.5}
+
+
+def test_layer_render_clips_lines_to_buffer():
+    pytest.importorskip("shapely")
+    # 穿过z=4瓦片(8,5)的东西向长线，两端都远在瓦片之外
+    line = {"type": "Feature", "geometry": {"type": "LineString", "coordinates": [[-30.0, 55.0], [90.0, 55.0]]},
+            "properties": {"elevation": 200}}
+    layer = TileLayer("contours", [line], mvt.LINESTRING, '"test"')
+    z, x, y = 4, 8, 5
+    (world_y,) = lonlat_to_world(np.array([[0.0, 55.0]]))[:, 1]
+    assert int(world_y * 2 ** z) == y
+
+    features = layer.render(z, x, y)
+    assert len(features) == 1
+    (coords,) = features[0]['geometry']
+    xs = [p[0] for p in coords]
+    assert min(xs) == -64 and max(xs) == mvt.DEFAULT_EXTENT + 64
+
+    commands = decode_layers(mvt.encode_tile({"contours": features}))["contours"]['features'][0]['commands']
+    assert [unzigzag(v) for v in commands[1:3]] == list(coords[0])
+    assert layer.render(z, x, y + 3) == []
+
+
+def test_disk_cache_evicts_over_byte_limit(tmp_path):
+    cache = DiskTileCache(tmp_path, max_bytes=250)
+    paths = [tmp_path / "l" / "0" / f"{i}.mvt" for i in range(3)]
+    cache.put(paths[0], b"a" * 100)
+    cache.put(paths[1], b"b" * 100)
+    assert cache.get(paths[0]) == b"a" * 100
+    cache.put(paths[2], b"c" * 100)
+
+    assert cache.current_bytes == 200 and cache.evictions == 1
+    assert not paths[1].exists() and paths[0].exists() and paths[2].exists()
+    assert cache.get(paths[1]) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # 重启时按mtime重建并立即裁剪到新的上限
+    reopened = DiskTileCache(tmp_path, max_bytes=150)
+    assert reopened.current_bytes == 100 and len(list(tmp_path.rglob("*.mvt"))) == 1
@@ -0,0 +1,87 @@
+"""
+兵力序列测试: 采样点提取、线性插值与 TroopSeries 的日期切片
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from generate_troop_series import build_troop_series, extract_troop_samples, interpolate_troop_series
+from src.services.data_loader import TroopSeries
+
+TIMELINE = {
+    "date_range": {"start": "1812-06-24", "end": "1812-07-04"},
+    "events": [
+        {"date": "1812-06-24", "participants": {"french": {"troops": 1000}, "russian": {"troops": 500}}},
+        {"date": "1812-06-29", "participants": {"french": {"troops": 600}}},
+        # 同一天多条记录取靠后的一条；没有troops的参与方忽略
+        {"date": "1812-06-29", "participants": {"french": {"troops": 500}, "russian": {"commander": "x"}}},
+        {"date": "1812-07-02", "participants": {"russian": {"troops": 800}}},
+        {"participants": {"french": {"troops": 1}}},
+    ],
+    "schwarzenberg_operations": {"events": [
+        {"date": "1812-06-30", "participants": {"russian": {"troops": 40}, "coalition": {"troops": 30}}},
+    ]},
+}
+
+
+def test_extract_samples():
+    samples = extract_troop_samples(TIMELINE)
+    assert samples['french']['dates'] == ["1812-06-24", "1812-06-29"]
+    assert samples['french']['troops'].tolist() == [1000, 500]
+    assert samples['russian']['dates'] == ["1812-06-24", "1812-07-02"]
+    assert "coalition" not in samples
+
+    flank = extract_troop_samples(TIMELINE, include_flank=True)
+    assert flank['russian']['dates'] == ["1812-06-24", "1812-06-30", "1812-07-02"]
+    assert flank['coalition']['troops'].tolist() == [30]
+
+
+def test_interpolate_holds_endpoints():
+    series = interpolate_troop_series(extract_troop_samples(TIMELINE), "1812-06-24", "1812-07-04")
+    assert series['french'].tolist() == [1000, 900, 800, 700, 600, 500, 500, 500, 500, 500, 500]
+    assert series['russian'][0] == 500 and series['russian'][-1] == 800
+    assert series['russian'][4] == round(500 + 300 * 4 / 8)
+
+    coarse = interpolate_troop_series(extract_troop_samples(TIMELINE), "1812-06-24", "1812-07-04", 5)
+    assert coarse['french'].tolist() == [1000, 500, 500]
+    with pytest.raises(ValueError):
+        interpolate_troop_series({}, resolution_days=0)
+
+
+def test_artifact_is_deterministic():
+    artifact = build_troop_series(TIMELINE)
+    assert "generated_at" not in artifact
+    assert artifact == build_troop_series(TIMELINE)
+    assert artifact['length'] == 11
+
+
+@pytest.fixture
+def series():
+    return TroopSeries(build_troop_series(TIMELINE, resolution_days=2))
+
+
+def test_query_slices_by_date(series):
+    french = series.query(date(1812, 6, 26), date(1812, 6, 30), "french")['french']
+    assert [p['date'] for p in french] == ["1812-06-26", "1812-06-28", "1812-06-30"]
+    assert [p['count'] for p in series.query()['russian']] == [500, 575, 650, 725, 800, 800]
+
+
+@pytest.mark.parametrize("start, end", [
+    (date(1812, 7, 10), None),
+    (date(1812, 7, 10), date(1812, 7, 20)),
+    (None, date(1812, 6, 1)),
+    (date(1812, 5, 1), date(1812, 6, 1)),
+    (date(1812, 7, 1), date(1812, 6, 26)),
+])
+def test_query_outside_series_is_empty(series, start, end):
+    assert series.query(start, end) == {"french": [], "russian": []}
+
+
+def test_query_partially_overlapping_is_clipped(series):
+    dates = [p['date'] for p in series.query(date(1812, 6, 1), date(1812, 6, 26), "french")['french']]
+    assert dates == ["1812-06-24", "1812-06-26"]
+    dates = [p['date'] for p in series.query(date(1812, 7, 1), date(1812, 8, 1), "french")['french']]
+    assert dates == ["1812-06-30", "1812-07-02", "1812-07-04"]
+    assert np.all(np.diff([series.index(date(1812, 6, d)) for d in (20, 24, 30)]) > 0)
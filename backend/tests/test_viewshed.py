@@ -0,0 +1,93 @@
+"""
+径向视域测试（合成DEM）
+"""
+
+import numpy as np
+import pytest
+
+import compute_viewshed
+from compute_viewshed import EARTH_RADIUS, radial_viewshed
+
+CELL = 30.0
+
+
+def brute_force_viewshed(dem, row0, col0, cell, observer_height, target_height, refraction):
+    """逐像元视线判断: 沿观察点→目标的直线密集采样（最近邻），任一中间点仰角高于目标即遮挡"""
+    height, width = dem.shape
+    z0 = dem[row0, col0] + observer_height
+    mask = np.zeros(dem.shape, dtype=np.uint8)
+
+    def drop(d):
+        return d ** 2 * (1 - refraction) / (2 * EARTH_RADIUS)
+
+    for row in range(height):
+        for col in range(width):
+            d = np.hypot(row - row0, col - col0) * cell
+            if d == 0:
+                mask[row, col] = 1
+                continue
+            target = (dem[row, col] - drop(d) + target_height - z0) / d
+            t = np.linspace(0, 1, 4 * max(height, width))[1:-1]
+            rows = np.rint(row0 + (row - row0) * t).astype(int)
+            cols = np.rint(col0 + (col - col0) * t).astype(int)
+            inner = (rows != row) | (cols != col)
+            rows, cols = rows[inner], cols[inner]
+            dist = np.hypot(rows - row0, cols - col0) * cell
+            valid = dist > 0
+            angles = (dem[rows[valid], cols[valid]] - drop(dist[valid]) - z0) / dist[valid]
+            mask[row, col] = int(not len(angles) or target >= angles.max())
+    return mask
+
+
+def test_ridge_matches_brute_force():
+    dem = np.zeros((41, 41))
+    dem[:, 28:30] = 50.0
+    row0 = col0 = 20
+
+    fast = radial_viewshed(dem, row0, col0, CELL, CELL, observer_height=10.0, target_height=2.0, radius_m=1e6)
+    slow = brute_force_viewshed(dem, row0, col0, CELL, 10.0, 2.0, compute_viewshed.REFRACTION_COEFFICIENT)
+
+    # 光线最近邻采样只在阴影边缘有差异
+    assert (fast == slow).mean() > 0.98
+    assert fast[:, :28].all() and slow[:, :28].all()
+    assert fast[row0, 28] and slow[row0, 28]
+    assert not fast[row0, 30:].any() and not slow[row0, 30:].any()
+
+
+def test_nodata_does_not_block():
+    dem = np.zeros((21, 21))
+    dem[10, 12] = np.nan
+    mask = radial_viewshed(dem, 10, 5, CELL, CELL, radius_m=1e6)
+    assert mask[10, 13:].all()
+    assert not radial_viewshed(np.full((5, 5), np.nan), 2, 2, CELL, CELL).any()
+
+
+def test_radius_limits_mask():
+    dem = np.zeros((41, 41))
+    mask = radial_viewshed(dem, 20, 20, CELL, CELL, radius_m=10 * CELL)
+    rows, cols = np.nonzero(mask)
+    assert np.hypot(rows - 20, cols - 20).max() * CELL <= 10 * CELL
+    assert mask[20, 30] and not mask[20, 31]
+
+
+def visible_range(refraction):
+    """平地上沿一行的最远可见距离（地球曲率使远处地面低于视线）"""
+    dem = np.zeros((3, 801))
+    mask = radial_viewshed(dem, 1, 0, CELL, CELL, observer_height=10.0, target_height=2.0, radius_m=1e6)
+    assert mask[1, :400].all()
+    return np.flatnonzero(mask[1])[-1] * CELL
+
+
+@pytest.mark.parametrize("refraction", [compute_viewshed.REFRACTION_COEFFICIENT, 0.0])
+def test_curvature_and_refraction_horizon(monkeypatch, refraction):
+    monkeypatch.setattr(compute_viewshed, "REFRACTION_COEFFICIENT", refraction)
+    # 两个高度的地平线距离之和: sqrt(2R'h1) + sqrt(2R'h2)，R' = R / (1 - k)
+    effective_radius = EARTH_RADIUS / (1 - refraction)
+    expected = np.sqrt(2 * effective_radius * 10.0) + np.sqrt(2 * effective_radius * 2.0)
+    assert visible_range(refraction) == pytest.approx(expected, abs=2 * CELL)
+
+
+def test_refraction_extends_horizon(monkeypatch):
+    with_refraction = visible_range(compute_viewshed.REFRACTION_COEFFICIENT)
+    monkeypatch.setattr(compute_viewshed, "REFRACTION_COEFFICIENT", 0.0)
+    assert visible_range(0.0) < with_refraction - 500